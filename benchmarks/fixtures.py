@@ -0,0 +1,67 @@
+import os
+import random
+import datetime
+import subprocess
+import srt
+
+WORDS = (
+    "the quick brown fox jumps over a lazy dog while we talk about video translation "
+    "speech synthesis subtitles timing audio frames models and everything in between"
+).split()
+
+def make_video(path: str, duration: float, width: int, height: int, fps: int = 25) -> str:
+    """
+    Generate a test pattern video with a sine tone as its audio track, unless
+    `path` already exists.
+    """
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    partial = path + ".partial.mp4"
+    subprocess.run([
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}:duration={duration}",
+        "-f", "lavfi", "-i", f"sine=frequency=220:sample_rate=44100:duration={duration}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-shortest",
+        partial,
+    ], check=True)
+    os.replace(partial, path)
+    return path
+
+def make_srt(path: str, duration: float, cues: int, seed: int = 0) -> str:
+    """
+    Write an English SRT with `cues` evenly spaced cues of random words, unless
+    `path` already exists. Each cue fills 80% of its slot, with about as many
+    words as are spoken in that time (2.5 per second).
+    """
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    rng = random.Random(seed)
+    slot = duration / cues
+    words = max(1, round(0.8 * slot * 2.5))
+    subtitles = []
+    for i in range(cues):
+        start = i * slot
+        subtitles.append(srt.Subtitle(
+            index=i + 1,
+            start=datetime.timedelta(seconds=start),
+            end=datetime.timedelta(seconds=start + 0.8 * slot),
+            content=" ".join(rng.choice(WORDS) for _ in range(rng.randint(max(1, words - 2), words + 2))).capitalize() + ".",
+        ))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(srt.compose(subtitles))
+    return path
+
+def make_case(fixtures_dir: str, case: dict) -> tuple:
+    """
+    Create (or reuse) the video and transcript of a benchmark case.
+
+    Returns:
+        tuple[str, str]: Absolute paths of the video and the SRT.
+    """
+    name = f"{case['duration']:g}s_{case['width']}x{case['height']}_{case['cues']}cues"
+    video = make_video(os.path.join(fixtures_dir, name + ".mp4"), case["duration"], case["width"], case["height"])
+    transcript = make_srt(os.path.join(fixtures_dir, name + ".srt"), case["duration"], case["cues"])
+    return os.path.abspath(video), os.path.abspath(transcript)
@@ -0,0 +1,217 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import functools
+import statistics
+import subprocess
+import numpy as np
+from contextlib import contextmanager
+from unittest import mock
+
+from src import api
+from src.translate.translate import TranscriptTranslator
+from src.tts.tts import write_wav
+from src.utils.swap_audio import swap_audio
+from src.utils.burn_subtitles import burn_subtitles
+from src.utils.render import EncoderSettings, render_video
+
+from .fixtures import make_case
+from .stubs import StubTextToSpeech, StubTranslator
+
+# Synthetic inputs: duration (s), resolution and number of transcript cues
+CASES = {
+    "small": {"duration": 10, "width": 640, "height": 360, "cues": 10},
+    "medium": {"duration": 60, "width": 1280, "height": 720, "cues": 60},
+    "large": {"duration": 180, "width": 1920, "height": 1080, "cues": 200},
+}
+
+STAGES = ["translate_srt", "srt_to_audio", "swap_audio", "burn_subtitles", "render_video", "process_video"]
+
+@contextmanager
+def working_dir(path: str):
+    """
+    Run the block in `path`, so relative caches and workspaces start empty.
+    """
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(previous)
+
+def prepare_audio(transcript: str, work_dir: str) -> tuple:
+    """
+    German audio and subtitles for the rendering stages, made with the stubs.
+    """
+    reference = os.path.join(work_dir, "reference.wav")
+    write_wav(reference, np.zeros(24000, dtype=np.int16), 24000)
+    tts = StubTextToSpeech()
+    tts.set_voice(reference)
+    subs = TranscriptTranslator(translator=StubTranslator()).translate_srt(transcript)
+    return tts.srt_to_audio(subs, output_file=os.path.join(work_dir, "de_audio.wav"))
+
+def run_stage(stage: str, video: str, transcript: str, work_dir: str, encoder: EncoderSettings) -> dict:
+    """
+    Run one stage on a case's inputs in `work_dir` and time it.
+
+    Returns:
+        dict: "seconds" of the timed call, plus stage metrics if any.
+    """
+    extra = {}
+    if stage in ("srt_to_audio", "swap_audio", "burn_subtitles", "render_video"):
+        de_audio, de_srt = prepare_audio(transcript, work_dir)
+        subs = TranscriptTranslator(translator=StubTranslator()).translate_srt(transcript)
+
+    start = time.perf_counter()
+    if stage == "translate_srt":
+        TranscriptTranslator(translator=StubTranslator()).translate_srt(transcript)
+    elif stage == "srt_to_audio":
+        tts = StubTextToSpeech()
+        tts.set_voice(de_audio)
+        tts.srt_to_audio(subs, output_file=os.path.join(work_dir, "bench_audio.wav"))
+        extra["tts_attempts"] = len(tts.attempt_log)
+    elif stage == "swap_audio":
+        swap_audio(video, de_audio, "Dub", output_path=os.path.join(work_dir, "swapped.mp4"), encoder=encoder)
+    elif stage == "burn_subtitles":
+        burn_subtitles(video, de_srt, output_path=os.path.join(work_dir, "subtitled.mp4"), encoder=encoder)
+    elif stage == "render_video":
+        render_video(video, de_audio, "Dub", srt_path=de_srt, output_path=os.path.join(work_dir, "rendered.mp4"), encoder=encoder)
+    elif stage == "process_video":
+        metrics = {}
+        with mock.patch.object(api, "TranscriptTranslator", functools.partial(TranscriptTranslator, translator=StubTranslator())), \
+                mock.patch.object(api, "TextToSpeech", StubTextToSpeech):
+            api.process_video(True, "Dub", "Wav2Lip", "0,30,0,0", 1, 0, video, transcript, device="cpu", metrics=metrics)
+        extra["metrics"] = metrics
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+    return {"seconds": time.perf_counter() - start, **extra}
+
+def environment() -> dict:
+    """
+    Describe the machine and code version the results were measured on.
+    """
+    def output(cmd):
+        try:
+            return subprocess.run(cmd, capture_output=True, text=True, timeout=30).stdout.splitlines()[0].strip()
+        except (OSError, IndexError, subprocess.TimeoutExpired):
+            return None
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": output(["ffmpeg", "-version"]),
+        "commit": output(["git", "rev-parse", "HEAD"]),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "encoder": vars(EncoderSettings.from_env()),
+    }
+
+def run_benchmarks(cases: list, stages: list, repeat: int = 3, fixtures_dir: str = "benchmarks/fixtures") -> dict:
+    """
+    Time each stage on each case `repeat` times, on CPU with stub backends.
+
+    Every repetition runs in a fresh temporary directory, so translation,
+    speech and face caches are always cold.
+
+    Returns:
+        dict: "environment" and one result per (case, stage) with all timings,
+        their median and minimum.
+    """
+    fixtures_dir = os.path.abspath(fixtures_dir)
+    encoder = EncoderSettings.from_env()
+    results = []
+    for case_name in cases:
+        video, transcript = make_case(fixtures_dir, CASES[case_name])
+        for stage in stages:
+            runs = []
+            for _ in range(repeat):
+                work_dir = tempfile.mkdtemp(prefix="bench-")
+                try:
+                    with working_dir(work_dir):
+                        runs.append(run_stage(stage, video, transcript, work_dir, encoder))
+                finally:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+            seconds = [run.pop("seconds") for run in runs]
+            results.append({
+                "case": case_name,
+                **CASES[case_name],
+                "stage": stage,
+                "seconds": [round(s, 4) for s in seconds],
+                "median": round(statistics.median(seconds), 4),
+                "min": round(min(seconds), 4),
+                **runs[-1],
+            })
+            print(f"{case_name:>8} {stage:<15} median {results[-1]['median']:8.3f}s  min {results[-1]['min']:8.3f}s")
+    return {"environment": environment(), "results": results}
+
+def compare(results: dict, baseline: dict, threshold: float = 0.1) -> list:
+    """
+    Compare medians with a baseline run.
+
+    Returns:
+        list[dict]: (case, stage, baseline, current, ratio) for every pair in
+        both runs, with "regression" set when the ratio exceeds 1 + threshold.
+    """
+    previous = {(r["case"], r["stage"]): r["median"] for r in baseline["results"]}
+    rows = []
+    for r in results["results"]:
+        key = (r["case"], r["stage"])
+        if key in previous and previous[key] > 0:
+            ratio = r["median"] / previous[key]
+            rows.append({
+                "case": r["case"],
+                "stage": r["stage"],
+                "baseline": previous[key],
+                "current": r["median"],
+                "ratio": round(ratio, 3),
+                "regression": ratio > 1 + threshold,
+            })
+    return rows
+
+def main(argv=None):
+    """
+    Benchmark the pipeline stages on synthetic media:
+
+        python -m benchmarks.run --cases small,medium --output results.json --baseline main.json
+    """
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic media with stub models.")
+    parser.add_argument("--cases", default="small,medium", help=f"Comma-separated cases ({', '.join(CASES)})")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated stages")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case and stage")
+    parser.add_argument("--fixtures-dir", default="benchmarks/fixtures", help="Where generated media is kept")
+    parser.add_argument("--output", default="benchmarks/results.json", help="JSON results file")
+    parser.add_argument("--baseline", default=None, help="Earlier results file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Slowdown reported as a regression (0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    cases = args.cases.split(",")
+    stages = args.stages.split(",")
+    for name, known in (("case", CASES), ("stage", STAGES)):
+        unknown = [v for v in (cases if name == "case" else stages) if v not in known]
+        if unknown:
+            parser.error(f"unknown {name}(s): {', '.join(unknown)}")
+
+    results = run_benchmarks(cases, stages, args.repeat, args.fixtures_dir)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            results["comparison"] = compare(results, json.load(f), args.threshold)
+        for row in results["comparison"]:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['case']:>8} {row['stage']:<15} {row['baseline']:8.3f}s -> {row['current']:8.3f}s ({row['ratio']:.2f}x){flag}")
+        regressions = [row for row in results["comparison"] if row["regression"]]
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}.")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+import time
+import hashlib
+import numpy as np
+from typing import List
+
+from src.translate.backends.base import Translator
+from src.tts.tts import TextToSpeech, read_wav_clip
+
+class StubTranslator(Translator):
+    """
+    Translator that returns the input with its words reversed, so pipeline
+    overhead can be measured without loading a translation model.
+
+    An optional per-call delay simulates model cost.
+    """
+    model_name = "stub/reverse-words"
+
+    def __init__(self, seconds_per_batch: float = 0.0):
+        self.seconds_per_batch = seconds_per_batch
+
+    def translate(self, text: str) -> str:
+        return self.translate_batch([text])[0]
+
+    def translate_batch(self, texts: List[str], batch_size: int = 32) -> List[str]:
+        if self.seconds_per_batch:
+            time.sleep(self.seconds_per_batch * -(-len(texts) // batch_size))
+        return [" ".join(reversed(text.split())) for text in texts]
+
+class StubTextToSpeech(TextToSpeech):
+    """
+    TextToSpeech that "speaks" a quiet tone whose length follows the text
+    length and speed, instead of running XTTS.
+
+    Only `set_voice` and `synthesize` are replaced; retries, speed control,
+    caching, assembly and WAV writing are the real implementation. Output is
+    deterministic for a given (text, speed, seed).
+    """
+
+    def __init__(self, device: str = "cpu", cache=None, speaker_cache=None, inference=None, sample_rate: int = 24000, chars_per_second: float = 15.0):
+        self.device = device
+        self.model_name = "stub/tone"
+        self.cache_name = self.model_name
+        self.cache = cache
+        self.speaker_cache = speaker_cache
+        self.speaker_fingerprint = None
+        self.gpt_cond_latent = None
+        self.speaker_embedding = None
+        self.attempt_log = []
+        self.sample_rate = sample_rate
+        self.chars_per_second = chars_per_second
+
+    def set_voice(self, target_voice: str, max_seconds: float = 15.0):
+        frames, _ = read_wav_clip(target_voice, max_seconds)
+        self.speaker_fingerprint = hashlib.sha256(frames).hexdigest()
+        self.speaker_embedding = self.speaker_fingerprint
+
+    def synthesize(self, text: str, language: str, speed: float, seed: int) -> np.ndarray:
+        if self.speaker_embedding is None:
+            raise RuntimeError("No voice set. Call set_voice() before synthesizing.")
+        # Vary the length a little with the seed, like sampling would
+        jitter = 1.0 + (seed % 21 - 10) / 100
+        seconds = max(0.2, len(text) / self.chars_per_second / speed * jitter)
+        t = np.arange(int(seconds * self.sample_rate)) / self.sample_rate
+        return (np.sin(2 * np.pi * 220 * t) * 3000).astype(np.int16)
@@ -0,0 +1,577 @@
+import os
+import time
+import uuid
+import functools
+import ffmpeg
+import random
+import numpy as np
+from typing import Callable, Dict, List, Optional
+
+from .translate.translate import TranscriptTranslator, read_srt
+from .translate.cache import TranslationCache
+from .translate.languages import iso639_2
+from .translate.backends.base import Translator
+from .tts.tts import TextToSpeech, device_lock, seed_device
+from .tts.cache import SpeakerCache, SpeechCache
+from .utils.render import EncoderSettings, render_multitrack, render_video
+from .utils.inference import InferenceSettings
+from .utils.extract_audio import choose_reference_window, extract_reference_audio
+from .utils.model_registry import model_registry
+from .utils.workspace import Workspace
+from .utils.pipeline import Pipeline
+from .utils.startup import lazy_import
+from .utils.tracing import Tracer, span
+from .lipsync.loader import lipsync_available, load_warm_lipsync
+from .lipsync.face_cache import FaceBoxCache
+from .lipsync.spans import lipsync_spoken_segments, plan_render_segments, segment_boundaries, video_frame_rate
+from .jobs.manifest import JobManifest
+from .jobs.chunked import ChunkedJob
+from .jobs.result_cache import ResultCache
+
+def default_device() -> str:
+    return "cuda" if lazy_import("torch").cuda.is_available() else "cpu"
+
+def set_seed(seed: int = 0, device: str = "cpu"):
+    """
+    Seed Python, NumPy and the torch generator of `device`. Other devices are
+    left alone, so jobs running on them are not disturbed.
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    with device_lock(device):
+        seed_device(device, seed)
+
+def preload_models(device: str):
+    """
+    Load the translation, TTS and available Wav2Lip models into the registry so the
+    first request does not pay for them.
+    """
+    inference = InferenceSettings.from_env()
+    TranscriptTranslator(device, inference=inference)
+    TextToSpeech(device=device, inference=inference)
+    for lipsync_model in ["wav2lip", "wav2lip_gan"]:
+        checkpoint_path = f'weights/{lipsync_model}.pth'
+        if lipsync_available() and os.path.exists(checkpoint_path):
+            load_warm_lipsync()(model='wav2lip', checkpoint_path=checkpoint_path, device=device)._load_model_for_inference()
+    print(model_registry.report())
+
+def _no_progress(fraction, desc=None):
+    pass
+
+def result_options(subtitles, translation_type, lipsync_model, padding, resize_factor, seed, spoken_only, lipsync_margin, device) -> dict:
+    """
+    Every setting that affects the outputs of `process_video`, including
+    the model device and the deployment's encoder, precision, TTS worker and
+    chunking settings (the same seed draws different speech on another
+    device, or when cues are spread over worker processes). Lip-sync settings
+    are left out for dubbing, which ignores them.
+    """
+    options = {
+        "subtitles": bool(subtitles),
+        "translation_type": translation_type,
+        "seed": seed,
+        "device": device,
+        "encoder": vars(EncoderSettings.from_env()),
+        "precision": InferenceSettings.from_env().precision,
+        "tts_workers": int(os.environ.get("TTS_WORKERS", 1)),
+        "chunk_seconds": float(os.environ.get("CHUNK_SECONDS", 600)),
+    }
+    if translation_type == 'LipSync':
+        options.update(
+            lipsync_model=lipsync_model,
+            padding=[int(x.strip()) for x in padding.split(",")],
+            resize_factor=resize_factor,
+            spoken_only=bool(spoken_only),
+            lipsync_margin=lipsync_margin if spoken_only else None,
+        )
+    return options
+
+def process_video(
+    subtitles: bool,
+    translation_type: str,
+    lipsync_model: str,
+    padding: str,
+    resize_factor: int,
+    seed: int,
+    video: str,
+    transcript: str,
+    reuse_faces: bool = True,
+    spoken_only: bool = False,
+    lipsync_margin: float = 0.2,
+    progress: Optional[Callable] = None,
+    device: Optional[str] = None,
+    metrics: Optional[dict] = None,
+):
+    """
+    Translate a video from English to German: translate its transcript,
+    synthesize German speech in the speaker's voice, swap the audio and
+    optionally burn in subtitles and synchronize the lips.
+
+    Usable without the UI; importing this module does not start a server.
+
+    Args:
+        subtitles (bool): Burn the German subtitles into the video.
+        translation_type (str): 'Dub' or 'LipSync'.
+        lipsync_model (str): 'Wav2Lip' or 'Wav2Lip_GAN', used for LipSync.
+        padding (str): Lip padding "top,bottom,left,right", used for LipSync.
+        resize_factor (int): Frame downscaling for lip sync.
+        seed (int): Random seed.
+        video (str): Path to the source video.
+        transcript (str): Path to the English SRT transcript.
+        reuse_faces (bool, optional): Reuse face boxes detected in earlier runs
+            on the same frames, for LipSync. Defaults to True.
+        spoken_only (bool, optional): Lip sync only the frames around spoken
+            subtitles and stream-copy the rest. Defaults to False.
+        lipsync_margin (float, optional): Seconds lip synced before and after
+            each subtitle with `spoken_only`. Defaults to 0.2.
+        progress (Callable, optional): Called as `progress(fraction, desc=...)`,
+            e.g. a `gr.Progress`.
+        device (str, optional): Model device. Defaults to "cuda" if available.
+        metrics (dict, optional): Filled with the job's stage timings.
+
+    Returns:
+        tuple[str, str, str]: Paths of the output video, the German audio and
+        the German subtitles.
+    """
+    # Spans, counters and the process's peak memory during the job go to `metrics["trace"]`,
+    # the /metrics endpoint and, with TRACE_DIR set, a trace file per job
+    metrics = metrics if metrics is not None else {}
+    progress = progress or _no_progress
+    device = device or default_device()
+    tracer = Tracer("process_video")
+    try:
+        with tracer:
+            # Resubmitting the same inputs and settings returns the stored result
+            results = ResultCache.from_env()
+            if results is not None:
+                with span("result_cache"):
+                    key = results.make_key(video, transcript, result_options(
+                        subtitles, translation_type, lipsync_model, padding, resize_factor, seed, spoken_only, lipsync_margin, device,
+                    ))
+                    stored = results.get(key)
+                    cached = None
+                    if stored is not None:
+                        with Workspace.from_env() as ws:
+                            cached = results.restore(stored, ws.output_dir)
+                if cached is not None:
+                    print(f'Returning the stored result {key[:16]}.')
+                    metrics.update(mode="cached", result_key=key)
+                    progress(1.0, desc="Done!")
+                    return cached
+
+            outputs = _process_video(
+                subtitles, translation_type, lipsync_model, padding, resize_factor, seed, video, transcript,
+                reuse_faces, spoken_only, lipsync_margin, progress, device, metrics,
+            )
+            if results is not None:
+                results.put(key, outputs, {"video": os.path.basename(video), "metrics": {"mode": metrics.get("mode")}})
+                metrics["result_key"] = key
+            return outputs
+    finally:
+        _finish_trace(tracer, metrics)
+
+def _finish_trace(tracer: Tracer, metrics: dict):
+    """
+    Add the trace summary to the job metrics and, with TRACE_DIR set, write
+    the trace file.
+    """
+    metrics["trace"] = tracer.summary()
+    trace_dir = os.environ.get("TRACE_DIR")
+    if trace_dir:
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.trace.json"
+        metrics["trace_path"] = tracer.write(os.path.join(trace_dir, name))
+        print(f"Trace written to {metrics['trace_path']}.")
+
+def _render_output(
+    ws, video, audio, srt_path, output_mp4, subtitles, translation_type,
+    lipsync_model, padding, resize_factor, reuse_faces, spoken_only, lipsync_margin, device, metrics,
+    on_lipsync=None, tag="",
+) -> dict:
+    """
+    Swap the translated audio into the video, burn in subtitles if requested
+    and, for LipSync, synchronize the lips, writing `output_mp4`.
+
+    Scratch files are prefixed with `tag`, so several outputs can be made
+    in one workspace.
+
+    Returns:
+        dict: Wall seconds of the "render" and "lipsync" stages.
+    """
+    stages = {}
+
+    # Swap video with new audio and burn in subtitles, if requested, in one encode.
+    # For LipSync, subtitles are burned in after lip sync, so the frames the
+    # face detector sees (and its cache keys) do not depend on the translation,
+    # unless only spoken segments are lip synced and the rest is copied
+    burn_in_render = subtitles and (translation_type != 'LipSync' or spoken_only)
+    print('Swapping the audio sources in the video' + (' and burning in subtitles.' if burn_in_render else '.'))
+    encoder = EncoderSettings.from_env()
+
+    with span("render") as render_span:
+        # Keyframes at the segment boundaries let untouched segments be copied
+        segments = None
+        if translation_type == 'LipSync' and spoken_only:
+            frame_rate = video_frame_rate(video)
+            video_duration = float(ffmpeg.probe(video)['format']['duration'])
+            segments = plan_render_segments(srt_path, video_duration, audio, frame_rate, lipsync_margin)
+
+        swapped_mp4 = render_video(
+            video,
+            audio,
+            translation_type,
+            srt_path=srt_path if burn_in_render else None,
+            output_path=ws.scratch(f'{tag}swapped_audio.mp4') if translation_type == 'LipSync' else output_mp4,
+            encoder=encoder,
+            keyframes=segment_boundaries(segments, frame_rate) if segments else None,
+        )
+    stages["render"] = {"wall_seconds": round(render_span.seconds, 3)}
+
+    if translation_type == 'LipSync':
+        # Synchronize lips with new audio
+        print('Synchronizing the lip movements.')
+        if on_lipsync is not None:
+            on_lipsync()
+        with span("lipsync") as lipsync_span:
+            lip = load_warm_lipsync()(
+                model='wav2lip',
+                checkpoint_path=f'weights/{lipsync_model.lower()}.pth',
+                img_size=96,
+                pads=[int(x.strip()) for x in padding.split(",")],
+                resize_factor=resize_factor,
+                nosmooth=False,
+                device=device,
+                cache_dir='cache/',
+                save_cache=False,
+                temp_dir=ws.scratch_dir,
+                face_cache=FaceBoxCache('cache/faces.sqlite') if reuse_faces else None,
+                subtitles_path=srt_path if subtitles and not burn_in_render else None,
+                encoder=encoder,
+            )
+            if segments is not None:
+                lipsync_spoken_segments(lip, swapped_mp4, audio, segments, frame_rate, output_mp4, ws.scratch(f'{tag}segments'))
+            else:
+                lip.sync(
+                    swapped_mp4,
+                    audio,
+                    output_mp4,
+                )
+        stages["lipsync"] = {"wall_seconds": round(lipsync_span.seconds, 3)}
+        if lip.face_cache is not None:
+            metrics["face_cache"] = lip.face_cache.stats()
+
+    return stages
+
+def _process_video(
+    subtitles, translation_type, lipsync_model, padding, resize_factor, seed, video, transcript,
+    reuse_faces, spoken_only, lipsync_margin, progress, device, metrics,
+):
+    job_start = time.perf_counter()
+
+    # Set device
+    device = device or default_device()
+    metrics["device"] = device
+
+    # Set seed for reproducibility
+    set_seed(seed, device)
+
+    # Long videos are processed in chunks with checkpoints, so a failed job
+    # resumes where it stopped when it is submitted again
+    chunk_seconds = float(os.environ.get("CHUNK_SECONDS", 600))
+    if chunk_seconds > 0 and float(ffmpeg.probe(video)['format']['duration']) > chunk_seconds:
+        encoder = EncoderSettings.from_env()
+        inference = InferenceSettings.from_env()
+        options = {
+            "subtitles": bool(subtitles),
+            "translation_type": translation_type,
+            "lipsync_model": lipsync_model,
+            "padding": padding,
+            "resize_factor": resize_factor,
+            "seed": seed,
+            "spoken_only": bool(spoken_only),
+            "lipsync_margin": lipsync_margin,
+            "precision": inference.precision,
+            "encoder": vars(encoder),
+        }
+        jobs_root = os.environ.get("JOBS_ROOT", "jobs")
+        JobManifest.purge_stale(jobs_root, float(os.environ.get("JOBS_TTL_HOURS", 24)) * 3600)
+        manifest = JobManifest.create(jobs_root, video, transcript, options, chunk_seconds)
+        print(f'Processing job {manifest.job_id} in {len(manifest.chunks)} chunks.')
+        progress(manifest.progress(), desc="Processing video in chunks...")
+        job = ChunkedJob(
+            manifest,
+            device=device,
+            encoder=encoder,
+            tts_workers=int(os.environ.get("TTS_WORKERS", 1)),
+            reuse_faces=reuse_faces,
+            inference=inference,
+        )
+        output_mp4, de_audio, de_srt = job.run(progress=progress)
+        metrics.update(mode="chunked", job_id=manifest.job_id, chunks=len(manifest.chunks),
+                       wall_seconds=round(time.perf_counter() - job_start, 3))
+        print(model_registry.report())
+        print('Done.')
+        progress(1.0, desc="Done!")
+        return output_mp4, de_audio, de_srt
+
+    # Create a job-scoped workspace for intermediate saving and final output;
+    # scratch files are removed when the block exits, even on failure
+    with Workspace.from_env() as ws:
+        ws.purge_stale()
+
+        inference = InferenceSettings.from_env()
+        translator = TranscriptTranslator(device, cache=TranslationCache('cache/translations.sqlite'), inference=inference)
+        tts = TextToSpeech(
+            device=device,
+            cache=SpeechCache('cache/speech'),
+            speaker_cache=SpeakerCache('cache/speakers'),
+            inference=inference,
+        )
+        en_audio = ws.scratch('en_audio.wav')
+        total_cues = len(read_srt(transcript))
+
+        def on_cue(done):
+            progress(0.3 * done / max(total_cues, 1), desc=f"Generating audio: cue {done}/{total_cues}")
+
+        def extract_audio():
+            # Only the speech windows needed for voice cloning are decoded,
+            # chosen from the cues of the original transcript
+            windows = choose_reference_window(read_srt(transcript))
+            extract_reference_audio(video, windows, en_audio) # creates temp audio file
+
+        # Translate transcript, split the audio track and clone the voice as
+        # concurrent stages; each cue goes to TTS as soon as it is translated
+        print('Translating EN transcript to DE and generating new audio in DE. Fighting hallucinations, aligning the timing...')
+        progress(0, desc="Translating transcript and generating new audio…")
+        pipe = Pipeline()
+        de_cues = pipe.producer("translate", translator.iter_translate_srt, transcript)
+        extract = pipe.task("extract_audio", extract_audio)
+        voice = pipe.task("speaker_conditioning", tts.set_voice, en_audio, after=[extract])
+        speech = pipe.consumer(
+            "tts",
+            tts.srt_to_audio,
+            de_cues,
+            output_file=ws.output('de_audio.wav'),
+            seed=seed,
+            workers=int(os.environ.get("TTS_WORKERS", 1)),
+            on_cue=on_cue,
+            after=[voice],
+        )
+        pipe.run()
+        print(pipe.report())
+        de_audio, de_srt = speech.result
+        metrics.update(mode="single", stages=pipe.timings(), tts_attempts=len(tts.attempt_log))
+
+        progress(0.3, desc="Rendering video with new audio...")
+        output_mp4 = ws.output('output.mp4')
+        metrics["stages"].update(_render_output(
+            ws, video, de_audio, de_srt, output_mp4, subtitles, translation_type,
+            lipsync_model, padding, resize_factor, reuse_faces, spoken_only, lipsync_margin, device, metrics,
+            on_lipsync=lambda: progress(0.6, desc="Synchronizing the lip movements..."),
+        ))
+
+    metrics["wall_seconds"] = round(time.perf_counter() - job_start, 3)
+    print(model_registry.report())
+    print('Done.')
+    progress(1.0, desc="Done!")
+
+    return output_mp4, de_audio, de_srt
+
+def process_video_languages(
+    languages: List[str],
+    subtitles: bool,
+    translation_type: str,
+    lipsync_model: str,
+    padding: str,
+    resize_factor: int,
+    seed: int,
+    video: str,
+    transcript: str,
+    separate_outputs: bool = False,
+    translators: Optional[Dict[str, Translator]] = None,
+    reuse_faces: bool = True,
+    spoken_only: bool = False,
+    lipsync_margin: float = 0.2,
+    progress: Optional[Callable] = None,
+    device: Optional[str] = None,
+    metrics: Optional[dict] = None,
+) -> dict:
+    """
+    Translate a video from English into several languages in one job.
+
+    The language-independent work is done once: the speaker's reference audio
+    is extracted and their voice conditioned a single time. Every language
+    then has its own translate and TTS stages, and the results are muxed
+    into one MP4 with an audio track (and, with `subtitles`, a soft subtitle
+    stream) per language, so the video is rendered only once.
+
+    The languages share one XTTS model. Their translations run concurrently,
+    but with TTS_WORKERS=1 synthesis takes turns on the device, a cue at a
+    time, so TTS for several languages takes about as long as for each in
+    sequence. With more TTS_WORKERS, the cues of all languages are spread
+    over the same pool of worker processes.
+
+    With `separate_outputs`, or for LipSync (where the video itself differs
+    per language), one video per language is rendered instead, with burned-in
+    subtitles as in `process_video`. Lip-synced languages after the first
+    reuse its face boxes when `reuse_faces` is set.
+
+    Videos are not split into chunks and results are not stored in the
+    result cache, unlike with `process_video`.
+
+    Args:
+        languages (List[str]): XTTS codes of the target languages, e.g.
+            ["de", "fr", "es"]. The first is the default audio track.
+        subtitles (bool): Add the translated subtitles.
+        translation_type (str): 'Dub' or 'LipSync'.
+        lipsync_model (str): 'Wav2Lip' or 'Wav2Lip_GAN', used for LipSync.
+        padding (str): Lip padding "top,bottom,left,right", used for LipSync.
+        resize_factor (int): Frame downscaling for lip sync.
+        seed (int): Random seed.
+        video (str): Path to the source video.
+        transcript (str): Path to the English SRT transcript.
+        separate_outputs (bool, optional): Render one video per language
+            instead of one multi-track video. Defaults to False.
+        translators (Dict[str, Translator], optional): Translation backend per
+            language, replacing the default of `languages.translator_for`.
+        reuse_faces (bool, optional): Reuse detected face boxes, for LipSync.
+            Defaults to True.
+        spoken_only (bool, optional): Lip sync only the spoken segments.
+            Defaults to False.
+        lipsync_margin (float, optional): Seconds lip synced around each
+            subtitle with `spoken_only`. Defaults to 0.2.
+        progress (Callable, optional): Called as `progress(fraction, desc=...)`.
+        device (str, optional): Model device. Defaults to "cuda" if available.
+        metrics (dict, optional): Filled with the job's stage timings.
+
+    Returns:
+        dict: "video", the path of the multi-track video (None with separate
+        outputs), and "languages", mapping each language to the paths of its
+        "video" (None in a multi-track job), "audio" and "subtitles".
+    """
+    metrics = metrics if metrics is not None else {}
+    progress = progress or _no_progress
+    tracer = Tracer("process_video_languages")
+    try:
+        with tracer:
+            return _process_video_languages(
+                list(dict.fromkeys(languages)), subtitles, translation_type, lipsync_model, padding, resize_factor,
+                seed, video, transcript, separate_outputs, translators or {}, reuse_faces, spoken_only, lipsync_margin,
+                progress, device, metrics,
+            )
+    finally:
+        _finish_trace(tracer, metrics)
+
+def _process_video_languages(
+    languages, subtitles, translation_type, lipsync_model, padding, resize_factor, seed, video, transcript,
+    separate_outputs, translators, reuse_faces, spoken_only, lipsync_margin, progress, device, metrics,
+):
+    if not languages:
+        raise ValueError("No target languages given.")
+    if translation_type == 'LipSync' and not separate_outputs:
+        print('Lip-synced videos differ per language; rendering one video per language.')
+        separate_outputs = True
+
+    job_start = time.perf_counter()
+    device = device or default_device()
+    set_seed(seed, device)
+    metrics.update(device=device, languages=languages)
+
+    with Workspace.from_env() as ws:
+        ws.purge_stale()
+
+        inference = InferenceSettings.from_env()
+        translation_cache = TranslationCache('cache/translations.sqlite')
+        tts = TextToSpeech(
+            device=device,
+            cache=SpeechCache('cache/speech'),
+            speaker_cache=SpeakerCache('cache/speakers'),
+            inference=inference,
+        )
+        en_audio = ws.scratch('en_audio.wav')
+        total_cues = len(read_srt(transcript)) * len(languages)
+        cues_done = {language: 0 for language in languages}
+
+        def on_cue(language, done):
+            cues_done[language] = done
+            done = sum(cues_done.values())
+            progress(0.3 * done / max(total_cues, 1), desc=f"Generating audio: cue {done}/{total_cues}")
+
+        def extract_audio():
+            windows = choose_reference_window(read_srt(transcript))
+            extract_reference_audio(video, windows, en_audio)
+
+        # Each language gets its own view of the conditioned voice, so the
+        # attempt logs and speaking-rate fits of the languages stay apart
+        voices = {}
+        def synthesize(cues, language):
+            voices[language] = tts.fork()
+            return voices[language].srt_to_audio(
+                cues,
+                output_file=ws.output(f'{language}_audio.wav'),
+                language=language,
+                seed=seed,
+                workers=int(os.environ.get("TTS_WORKERS", 1)),
+                on_cue=functools.partial(on_cue, language),
+            )
+
+        # The audio is extracted and the voice conditioned once; every language
+        # has its own translate and TTS stages, and the TTS stages share the
+        # model (and its device lock) or the worker pool
+        print(f'Translating EN transcript to {", ".join(language.upper() for language in languages)} and generating new audio.')
+        progress(0, desc="Translating transcript and generating new audio…")
+        pipe = Pipeline()
+        extract = pipe.task("extract_audio", extract_audio)
+        voice = pipe.task("speaker_conditioning", tts.set_voice, en_audio, after=[extract])
+        speech = {}
+        for language in languages:
+            translator = TranscriptTranslator(
+                device, cache=translation_cache, translator=translators.get(language), inference=inference, language=language,
+            )
+            cues = pipe.producer(f"translate_{language}", translator.iter_translate_srt, transcript)
+            speech[language] = pipe.consumer(f"tts_{language}", synthesize, cues, language, after=[voice])
+        pipe.run()
+        print(pipe.report())
+        metrics.update(
+            mode="languages",
+            stages=pipe.timings(),
+            tts_attempts={language: len(voices[language].attempt_log) for language in languages},
+        )
+
+        outputs = {"video": None, "languages": {}}
+        for language in languages:
+            audio, srt_path = speech[language].result
+            outputs["languages"][language] = {"video": None, "audio": audio, "subtitles": srt_path}
+
+        if not separate_outputs:
+            # One render for all languages
+            print('Muxing the audio tracks' + (' and subtitle streams' if subtitles else '') + ' into the video.')
+            progress(0.3, desc="Rendering video with new audio tracks...")
+            with span("render") as render_span:
+                outputs["video"] = render_multitrack(
+                    video,
+                    [
+                        (iso639_2(language), paths["audio"], paths["subtitles"] if subtitles else None)
+                        for language, paths in outputs["languages"].items()
+                    ],
+                    output_path=ws.output('output.mp4'),
+                    encoder=EncoderSettings.from_env(),
+                )
+            metrics["stages"]["render"] = {"wall_seconds": round(render_span.seconds, 3)}
+        else:
+            for i, (language, paths) in enumerate(outputs["languages"].items()):
+                fraction = 0.3 + 0.7 * i / len(languages)
+                progress(fraction, desc=f"Rendering the {language.upper()} video...")
+                paths["video"] = ws.output(f'output_{language}.mp4')
+                stages = _render_output(
+                    ws, video, paths["audio"], paths["subtitles"], paths["video"], subtitles, translation_type,
+                    lipsync_model, padding, resize_factor, reuse_faces, spoken_only, lipsync_margin, device, metrics,
+                    tag=f"{language}_",
+                )
+                metrics["stages"].update({f"{name}_{language}": timing for name, timing in stages.items()})
+
+    metrics["wall_seconds"] = round(time.perf_counter() - job_start, 3)
+    print(model_registry.report())
+    print('Done.')
+    progress(1.0, desc="Done!")
+
+    return outputs
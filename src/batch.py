@@ -0,0 +1,268 @@
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import argparse
+import threading
+import traceback
+from typing import List, Optional
+
+from .utils.startup import lazy_import
+
+# Options of a job and their defaults, matching the UI
+DEFAULT_OPTIONS = {
+    "subtitles": True,
+    "translation_type": "Dub",
+    "lipsync_model": "Wav2Lip",
+    "padding": "0,30,0,0",
+    "resize_factor": 1,
+    "seed": 0,
+    "reuse_faces": True,
+    "spoken_only": False,
+    "lipsync_margin": 0.2,
+    # Target languages of a multi-language job (see `api.process_video_languages`);
+    # None translates to German only
+    "languages": None,
+    "separate_outputs": False,
+}
+
+def load_jobs(manifest_path: str) -> List[dict]:
+    """
+    Read a JSONL manifest of jobs, one JSON object per line.
+
+    Each job names its video ("video") and English transcript ("srt" or
+    "transcript"), and optionally an identifier ("id", "job_id" or
+    "request_id") and any of the `DEFAULT_OPTIONS`, either at the top level or
+    under "options". Relative paths are resolved against the manifest's
+    directory. Blank lines and lines starting with "#" are skipped.
+
+    Example line:
+        {"id": "talk-01", "video": "talk.mp4", "srt": "talk.srt", "options": {"translation_type": "LipSync"}}
+
+    Returns:
+        List[dict]: Jobs with "id", "video", "transcript" and "options".
+
+    Raises:
+        ValueError: If a line is not valid JSON or lacks a video or transcript.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{manifest_path}:{line_number}: invalid JSON ({e})") from e
+
+            video = entry.get("video")
+            transcript = entry.get("srt") or entry.get("transcript")
+            if not video or not transcript:
+                raise ValueError(f"{manifest_path}:{line_number}: a job needs 'video' and 'srt'")
+
+            options = dict(DEFAULT_OPTIONS)
+            options.update({key: entry[key] for key in DEFAULT_OPTIONS if key in entry})
+            options.update(entry.get("options", {}))
+            jobs.append({
+                "id": str(entry.get("id") or entry.get("job_id") or entry.get("request_id") or f"job-{line_number:05d}"),
+                "video": os.path.join(base_dir, video),
+                "transcript": os.path.join(base_dir, transcript),
+                "options": options,
+            })
+    return jobs
+
+def default_devices() -> List[str]:
+    """
+    One device per visible GPU, or the CPU if there is none.
+    """
+    torch = lazy_import("torch")
+    if torch.cuda.is_available():
+        return [f"cuda:{i}" for i in range(torch.cuda.device_count())]
+    return ["cpu"]
+
+def _completed_jobs(metrics_path: str) -> set:
+    completed = set()
+    if os.path.exists(metrics_path):
+        with open(metrics_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    if record.get("status") == "ok":
+                        completed.add(record["id"])
+    return completed
+
+def run_batch(
+    jobs: List[dict],
+    output_dir: str = "batch_outputs",
+    devices: Optional[List[str]] = None,
+    jobs_per_device: int = 1,
+    resume: bool = True,
+) -> List[dict]:
+    """
+    Run jobs through a local work queue, without the UI.
+
+    One worker thread is started per job slot, `jobs_per_device` for each
+    device, and each worker takes the next job from the queue once its
+    previous job is done. Models are loaded once per device and shared by the
+    workers of that device. A failed job is recorded and does not stop the
+    others.
+
+    Outputs of each job are copied to `<output_dir>/<id>/`, and a metrics
+    record per job (status, device, stage timings, errors) is appended to
+    `<output_dir>/metrics.jsonl` as soon as the job finishes. A summary of the
+    run is written to `<output_dir>/summary.json`.
+
+    Args:
+        jobs (List[dict]): Jobs as returned by `load_jobs`.
+        output_dir (str, optional): Directory for outputs and metrics.
+        devices (List[str], optional): Devices to schedule jobs on. Defaults to
+            `default_devices()`.
+        jobs_per_device (int, optional): Jobs run at the same time on each device.
+            Defaults to 1.
+        resume (bool, optional): Skip jobs recorded as successful in an
+            existing metrics file. Defaults to True.
+
+    Returns:
+        List[dict]: Metrics records of the jobs run.
+    """
+    from .api import process_video, process_video_languages
+
+    os.makedirs(output_dir, exist_ok=True)
+    metrics_path = os.path.join(output_dir, "metrics.jsonl")
+    devices = devices or default_devices()
+
+    completed = _completed_jobs(metrics_path) if resume else set()
+    pending = queue.Queue()
+    for job in jobs:
+        if job["id"] in completed:
+            print(f"Skipping {job['id']}: already done.")
+        else:
+            pending.put(job)
+    total = pending.qsize()
+
+    records = []
+    lock = threading.Lock()
+
+    def run_job(job: dict, device: str) -> dict:
+        record = {"id": job["id"], "video": job["video"], "transcript": job["transcript"], "options": job["options"], "device": device}
+        metrics = {}
+        start = time.perf_counter()
+        try:
+            options = job["options"]
+            if options["languages"]:
+                result = process_video_languages(
+                    options["languages"],
+                    options["subtitles"],
+                    options["translation_type"],
+                    options["lipsync_model"],
+                    options["padding"],
+                    options["resize_factor"],
+                    options["seed"],
+                    job["video"],
+                    job["transcript"],
+                    separate_outputs=options["separate_outputs"],
+                    reuse_faces=options["reuse_faces"],
+                    spoken_only=options["spoken_only"],
+                    lipsync_margin=options["lipsync_margin"],
+                    device=device,
+                    metrics=metrics,
+                )
+                outputs = [result["video"]] if result["video"] else []
+                outputs += [path for paths in result["languages"].values() for path in paths.values() if path]
+            else:
+                outputs = process_video(
+                    options["subtitles"],
+                    options["translation_type"],
+                    options["lipsync_model"],
+                    options["padding"],
+                    options["resize_factor"],
+                    options["seed"],
+                    job["video"],
+                    job["transcript"],
+                    reuse_faces=options["reuse_faces"],
+                    spoken_only=options["spoken_only"],
+                    lipsync_margin=options["lipsync_margin"],
+                    device=device,
+                    metrics=metrics,
+                )
+            job_dir = os.path.join(output_dir, job["id"])
+            os.makedirs(job_dir, exist_ok=True)
+            record["outputs"] = [shutil.copy2(path, job_dir) for path in outputs]
+            record["status"] = "ok"
+        except Exception as e:
+            traceback.print_exc()
+            record["status"] = "failed"
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["metrics"] = metrics
+        record["wall_seconds"] = round(time.perf_counter() - start, 3)
+        return record
+
+    def worker(device: str):
+        while True:
+            try:
+                job = pending.get_nowait()
+            except queue.Empty:
+                return
+            record = run_job(job, device)
+            with lock:
+                records.append(record)
+                with open(metrics_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+                print(f"[{len(records)}/{total}] {record['id']} on {device}: {record['status']} in {record['wall_seconds']:.1f}s")
+
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=worker, args=(device,), name=f"batch-{device}-{slot}")
+        for device in devices
+        for slot in range(jobs_per_device)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    summary = {
+        "jobs": len(records),
+        "succeeded": sum(record["status"] == "ok" for record in records),
+        "failed": [record["id"] for record in records if record["status"] != "ok"],
+        "skipped": len(jobs) - total,
+        "devices": devices,
+        "jobs_per_device": jobs_per_device,
+        "wall_seconds": round(time.perf_counter() - start, 3),
+        "job_seconds": {record["id"]: record["wall_seconds"] for record in records},
+    }
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    print(f"Batch done: {summary['succeeded']}/{summary['jobs']} jobs succeeded in {summary['wall_seconds']:.1f}s.")
+
+    return records
+
+def main(argv=None):
+    """
+    Process a manifest of jobs without the UI:
+
+        python -m src.batch jobs.jsonl --output-dir batch_outputs --devices cuda:0,cuda:1
+    """
+    parser = argparse.ArgumentParser(description="Translate a batch of videos without the UI.")
+    parser.add_argument("manifest", help="JSONL file with one job (video, srt, options) per line")
+    parser.add_argument("--output-dir", default="batch_outputs", help="Directory for outputs and metrics")
+    parser.add_argument("--devices", default=None, help="Comma-separated devices (default: all GPUs, else cpu)")
+    parser.add_argument("--jobs-per-device", type=int, default=1, help="Jobs run at the same time on each device")
+    parser.add_argument("--no-resume", action="store_true", help="Rerun jobs that already succeeded")
+    args = parser.parse_args(argv)
+
+    records = run_batch(
+        load_jobs(args.manifest),
+        output_dir=args.output_dir,
+        devices=args.devices.split(",") if args.devices else None,
+        jobs_per_device=args.jobs_per_device,
+        resume=not args.no_resume,
+    )
+    return 0 if all(record["status"] == "ok" for record in records) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+import os
+import sys
+import json
+import time
+import wave
+import socket
+import argparse
+import datetime
+import ffmpeg
+from fractions import Fraction
+import srt
+from typing import Callable, Optional
+
+from .manifest import JobManifest
+from ..translate.translate import TranscriptTranslator, read_srt
+from ..translate.cache import TranslationCache
+from ..tts.tts import TextToSpeech
+from ..tts.cache import SpeakerCache, SpeechCache
+from ..utils.render import EncoderSettings, render_video
+from ..utils.inference import InferenceSettings
+from ..utils.extract_audio import choose_reference_window, extract_reference_audio
+from ..utils.tracing import run_subprocess, span
+from ..lipsync.loader import load_warm_lipsync
+from ..lipsync.face_cache import FaceBoxCache
+from ..lipsync.spans import lipsync_spoken_segments, plan_render_segments, segment_boundaries, video_frame_rate
+
+class ChunkedJob:
+    """
+    Runs a job chunk by chunk, checkpointing every stage of every chunk.
+
+    Each chunk is translated, synthesized, rendered and (for LipSync) lip synced
+    on its own, and the finished chunks are joined with a stream copy. Stages
+    whose checkpoint exists are skipped, so a failed or interrupted job resumes
+    where it stopped. Several workers, in one process or on several machines
+    sharing the job directory, can run the same job: each chunk is leased to
+    one worker at a time and the last worker to finish assembles the outputs.
+
+    Like the whole video in a single pass, each chunk's video is extended to
+    the length of its dubbed audio. When the speech of a chunk runs past the
+    chunk's end, the overrun is absorbed at that chunk boundary (a frozen
+    frame for Dub, the last segment played in reverse for LipSync) instead of
+    shifting the following cues, so long jobs may show such a pause mid-video.
+
+    Example:
+        >>> manifest = JobManifest.create("jobs", "input.mp4", "input.srt", options)
+        >>> output_mp4, de_audio, de_srt = ChunkedJob(manifest, device="cuda").run()
+    """
+
+    def __init__(
+        self,
+        manifest: JobManifest,
+        device: str = "cpu",
+        worker_id: Optional[str] = None,
+        encoder: Optional[EncoderSettings] = None,
+        tts_workers: int = 1,
+        reuse_faces: bool = True,
+        inference: Optional[InferenceSettings] = None,
+    ):
+        """
+        Args:
+            manifest (JobManifest): The job to run.
+            device (str, optional): Device for the models. Defaults to "cpu".
+            worker_id (str, optional): Name of this worker in chunk leases.
+                Defaults to host name and process id.
+            encoder (EncoderSettings, optional): Video encoder settings. All
+                workers of a job must use the same settings, or the chunks
+                cannot be joined with a stream copy.
+            tts_workers (int, optional): TTS worker processes per chunk. Defaults to 1.
+            reuse_faces (bool, optional): Reuse cached face boxes for LipSync.
+                Defaults to True.
+            inference (InferenceSettings, optional): Precision and threads of
+                the translation and TTS models. Defaults to fp32.
+        """
+        self.manifest = manifest
+        self.device = device
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.encoder = encoder or EncoderSettings()
+        self.tts_workers = tts_workers
+        self.reuse_faces = reuse_faces
+        self.inference = inference
+        self.options = manifest.options
+        self._translator = None
+        self._tts = None
+
+    @property
+    def translator(self) -> TranscriptTranslator:
+        if self._translator is None:
+            self._translator = TranscriptTranslator(
+                self.device,
+                cache=TranslationCache('cache/translations.sqlite'),
+                inference=self.inference,
+            )
+        return self._translator
+
+    @property
+    def tts(self) -> TextToSpeech:
+        if self._tts is None:
+            self._tts = TextToSpeech(
+                device=self.device,
+                cache=SpeechCache('cache/speech'),
+                speaker_cache=SpeakerCache('cache/speakers'),
+                inference=self.inference,
+            )
+            self._tts.set_voice(self.reference_audio())
+        return self._tts
+
+    def reference_audio(self) -> str:
+        """
+        Voice-cloning reference for the whole job, extracted once.
+        """
+        path = os.path.join(self.manifest.path, "reference.wav")
+        if not os.path.exists(path):
+            partial = f"{path}.{os.getpid()}.partial.wav"
+            windows = choose_reference_window(read_srt(self.manifest.transcript_path))
+            extract_reference_audio(self.manifest.video_path, windows, partial)
+            os.replace(partial, path)
+        return path
+
+    def run(self, progress: Optional[Callable] = None, wait: bool = True, poll_seconds: float = 5.0):
+        """
+        Process every chunk this worker can lease, then assemble the outputs.
+
+        Args:
+            progress (Callable, optional): Called as `progress(fraction, desc=...)`
+                after every stage, e.g. a `gr.Progress`.
+            wait (bool, optional): Wait for chunks leased by other workers to
+                finish. Defaults to True.
+            poll_seconds (float, optional): Interval between checks while waiting.
+
+        Returns:
+            tuple[str, str, str] or None: Paths of the output video, audio and
+            subtitles, or None if `wait` is False and other workers still hold chunks.
+        """
+        while not self.manifest.finished():
+            for index in self.manifest.remaining():
+                with self.manifest.lease(JobManifest.chunk_name(index), self.worker_id) as claimed:
+                    # Another worker may have finished the job (and removed its chunks) meanwhile
+                    if claimed and not self.manifest.finished():
+                        self.process_chunk(index, progress)
+
+            if not self.manifest.remaining():
+                with self.manifest.lease("finalize", self.worker_id) as claimed:
+                    if claimed and not self.manifest.finished():
+                        with span("finalize"):
+                            self.finalize()
+                if self.manifest.finished():
+                    break
+            if not wait:
+                return None
+            time.sleep(poll_seconds)
+
+        return (
+            self.manifest.output("output.mp4"),
+            self.manifest.output("de_audio.wav"),
+            self.manifest.output("de_audio.srt"),
+        )
+
+    def process_chunk(self, index: int, progress: Optional[Callable] = None):
+        """
+        Run the stages of chunk `index` that have no checkpoint yet.
+        """
+        manifest = self.manifest
+        chunk = manifest.chunks[index]
+        stages = {
+            "translate": self._translate,
+            "tts": self._synthesize,
+            "render": self._render,
+            "lipsync": self._lipsync,
+        }
+        for stage in manifest.stages:
+            if manifest.is_done(index, stage):
+                continue
+            print(f"Chunk {index + 1}/{len(manifest.chunks)}: {stage} "
+                  f"({chunk['start']:.1f}s - {chunk['end']:.1f}s)")
+            with span(stage, chunk=index):
+                artifacts = stages[stage](index, chunk)
+            manifest.mark_done(index, stage, **artifacts)
+            if progress is not None:
+                progress(manifest.progress(), desc=f"Chunk {index + 1}/{len(manifest.chunks)}: {stage} done")
+
+    def _translate(self, index: int, chunk: dict) -> dict:
+        first, last = chunk["cues"]
+        subtitles = read_srt(self.manifest.transcript_path)[first:last]
+
+        # Cue times are kept relative to the start of the chunk
+        offset = datetime.timedelta(seconds=chunk["start"])
+        zero = datetime.timedelta(0)
+        de_contents = self.translator.translate_texts([sub.content for sub in subtitles])
+        de_subs = [
+            srt.Subtitle(index=i + 1, start=max(sub.start - offset, zero), end=max(sub.end - offset, zero), content=content)
+            for i, (sub, content) in enumerate(zip(subtitles, de_contents))
+        ]
+        with open(self.manifest.artifact(index, "de_source.srt"), "w", encoding="utf-8") as f:
+            f.write(srt.compose(de_subs))
+        return {"srt": "de_source.srt"}
+
+    def _synthesize(self, index: int, chunk: dict) -> dict:
+        self.tts.srt_to_audio(
+            read_srt(self.manifest.artifact(index, "de_source.srt")),
+            output_file=self.manifest.artifact(index, "de_audio.wav"),
+            seed=self.options.get("seed", 0),
+            workers=self.tts_workers,
+        )
+        return {"audio": "de_audio.wav", "srt": "de_audio.srt"}
+
+    @property
+    def spoken_only(self) -> bool:
+        return self.options["translation_type"] == "LipSync" and self.options.get("spoken_only", False)
+
+    def _render(self, index: int, chunk: dict) -> dict:
+        artifacts = {"video": "render.mp4"}
+        keyframes = None
+        if self.spoken_only:
+            # Keyframes at the segment boundaries let untouched segments be copied
+            frame_rate = video_frame_rate(self.manifest.video_path)
+            segments = plan_render_segments(
+                self.manifest.artifact(index, "de_audio.srt"),
+                chunk["end"] - chunk["start"],
+                self.manifest.artifact(index, "de_audio.wav"),
+                frame_rate,
+                self.options.get("lipsync_margin", 0.2),
+            )
+            keyframes = segment_boundaries(segments, frame_rate)
+            with open(self.manifest.artifact(index, "segments.json"), "w", encoding="utf-8") as f:
+                json.dump({"frame_rate": str(frame_rate), "segments": segments}, f)
+            artifacts["segments"] = "segments.json"
+
+        render_video(
+            self.manifest.video_path,
+            self.manifest.artifact(index, "de_audio.wav"),
+            self.options["translation_type"],
+            srt_path=self._subtitles(index) if self.options["translation_type"] != "LipSync" or self.spoken_only else None,
+            output_path=self.manifest.artifact(index, "render.mp4"),
+            encoder=self.encoder,
+            start=chunk["start"],
+            duration=chunk["end"] - chunk["start"],
+            keyframes=keyframes,
+        )
+        return artifacts
+
+    def _subtitles(self, index: int) -> Optional[str]:
+        # Burned in by the last full encode: lip sync for LipSync, render otherwise
+        return self.manifest.artifact(index, "de_audio.srt") if self.options.get("subtitles") else None
+
+    def _lipsync(self, index: int, chunk: dict) -> dict:
+        lip = load_warm_lipsync()(
+            model='wav2lip',
+            checkpoint_path=f"weights/{self.options['lipsync_model'].lower()}.pth",
+            img_size=96,
+            pads=[int(x.strip()) for x in self.options['padding'].split(",")],
+            resize_factor=self.options['resize_factor'],
+            nosmooth=False,
+            device=self.device,
+            cache_dir='cache/',
+            save_cache=False,
+            temp_dir=os.path.dirname(self.manifest.artifact(index, "lipsync.mp4")),
+            face_cache=FaceBoxCache('cache/faces.sqlite') if self.reuse_faces else None,
+            subtitles_path=None if self.spoken_only else self._subtitles(index),
+            encoder=self.encoder,
+        )
+        if self.spoken_only:
+            with open(self.manifest.artifact(index, "segments.json"), "r", encoding="utf-8") as f:
+                plan = json.load(f)
+            lipsync_spoken_segments(
+                lip,
+                self.manifest.artifact(index, "render.mp4"),
+                self.manifest.artifact(index, "de_audio.wav"),
+                [tuple(segment) for segment in plan["segments"]],
+                Fraction(plan["frame_rate"]),
+                self.manifest.artifact(index, "lipsync.mp4"),
+                self.manifest.artifact(index, "segments"),
+            )
+        else:
+            lip.sync(
+                self.manifest.artifact(index, "render.mp4"),
+                self.manifest.artifact(index, "de_audio.wav"),
+                self.manifest.artifact(index, "lipsync.mp4"),
+            )
+        return {"video": "lipsync.mp4"}
+
+    def finalize(self):
+        """
+        Join the finished chunks into the final video, audio and subtitles.
+
+        The chunk videos are concatenated with a stream copy, each placed at the
+        end of the video stream before it. The chunk audio is padded or cut to
+        the length of its video and joined into one track, which is
+        encoded once for the output video; joining per-chunk AAC streams instead
+        would leave an encoder priming gap at every seam. The subtitles are
+        shifted by the chunk offsets, so both stay aligned with the joined video.
+        Once the outputs exist, the chunk artifacts are removed.
+        """
+        manifest = self.manifest
+        last_stage = manifest.stages[-1]
+        videos = [manifest.artifact(chunk["index"], manifest.state(chunk["index"])[last_stage]["video"]) for chunk in manifest.chunks]
+        durations = [self._video_duration(path) for path in videos]
+
+        print(f"Joining {len(videos)} chunks.")
+        self._merge_audio(durations, manifest.output("de_audio.wav"))
+        self._merge_subtitles(durations, manifest.output("de_audio.srt"))
+
+        list_path = os.path.join(manifest.path, "concat.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            for path, duration in zip(videos, durations):
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\nduration {duration:.6f}\n")
+
+        partial = manifest.output("output.partial.mp4")
+        run_subprocess("concat_chunks", [
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-i", manifest.output("de_audio.wav"),
+            "-map", "0:v", "-map", "1:a",
+            "-c:v", "copy",
+            "-c:a", "aac", "-b:a", "192k",
+            "-movflags", "+faststart",
+            partial,
+        ], partial)
+        os.replace(partial, manifest.output("output.mp4"))
+        manifest.remove_chunks()
+
+    @staticmethod
+    def _video_duration(path: str) -> float:
+        # The length of the video stream, which the chunk's audio may outlast slightly
+        probe = ffmpeg.probe(path)
+        stream = next(s for s in probe['streams'] if s['codec_type'] == 'video')
+        return float(stream.get('duration') or probe['format']['duration'])
+
+    def _merge_audio(self, durations: list, output_path: str, block_frames: int = 65536):
+        partial = f"{output_path}.partial.wav"
+        with wave.open(partial, "wb") as out:
+            for chunk, duration in zip(self.manifest.chunks, durations):
+                with wave.open(self.manifest.artifact(chunk["index"], "de_audio.wav"), "rb") as part:
+                    if chunk["index"] == 0:
+                        out.setparams(part.getparams())
+                    frame_bytes = part.getsampwidth() * part.getnchannels()
+                    remaining = round(duration * part.getframerate())
+                    while remaining > 0:
+                        block = part.readframes(min(block_frames, remaining))
+                        if not block:
+                            break
+                        out.writeframes(block)
+                        remaining -= len(block) // frame_bytes
+                    # Silence up to the end of the chunk's video
+                    while remaining > 0:
+                        frames = min(block_frames, remaining)
+                        out.writeframes(b"\0" * frames * frame_bytes)
+                        remaining -= frames
+        os.replace(partial, output_path)
+
+    def _merge_subtitles(self, durations: list, output_path: str):
+        subtitles = []
+        offset = datetime.timedelta(0)
+        for chunk, duration in zip(self.manifest.chunks, durations):
+            for sub in read_srt(self.manifest.artifact(chunk["index"], "de_audio.srt")):
+                subtitles.append(srt.Subtitle(index=0, start=sub.start + offset, end=sub.end + offset, content=sub.content))
+            offset += datetime.timedelta(seconds=duration)
+
+        partial = f"{output_path}.partial"
+        with open(partial, "w", encoding="utf-8") as f:
+            f.write(srt.compose(subtitles))
+        os.replace(partial, output_path)
+
+def main(argv=None):
+    """
+    Join an existing job as an additional worker:
+
+        python -m src.jobs.chunked jobs/<job_id>
+    """
+    parser = argparse.ArgumentParser(description="Process the chunks of a video translation job.")
+    parser.add_argument("job_dir", help="Job directory containing manifest.json")
+    parser.add_argument("--worker-id", default=None, help="Name of this worker in chunk leases")
+    parser.add_argument("--device", default=None, help="Model device (default: cuda if available)")
+    parser.add_argument("--no-wait", action="store_true", help="Exit once no chunk is left to lease")
+    args = parser.parse_args(argv)
+
+    device = args.device
+    if device is None:
+        from ..api import default_device
+        device = default_device()
+
+    # Chunks must be encoded and synthesized as the job was submitted, whatever
+    # this machine's settings; thread counts stay local
+    manifest = JobManifest(args.job_dir)
+    options = manifest.options
+    encoder = EncoderSettings(**options["encoder"]) if "encoder" in options else EncoderSettings.from_env()
+    inference = InferenceSettings.from_env()
+    inference = InferenceSettings(options.get("precision", inference.precision), inference.threads, inference.interop_threads)
+
+    job = ChunkedJob(
+        manifest,
+        device=device,
+        worker_id=args.worker_id,
+        encoder=encoder,
+        tts_workers=int(os.environ.get("TTS_WORKERS", 1)),
+        inference=inference,
+    )
+    outputs = job.run(wait=not args.no_wait)
+    if outputs is not None:
+        print("\n".join(outputs))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
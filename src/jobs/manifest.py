@@ -0,0 +1,366 @@
+import os
+import json
+import time
+import shutil
+import socket
+import hashlib
+import threading
+import contextlib
+import ffmpeg
+import srt
+from typing import List
+
+from ..utils.hashing import file_sha256
+
+# Seconds between lock refreshes while a worker holds a chunk, and the age after
+# which a lock that is no longer refreshed is considered abandoned
+HEARTBEAT_SECONDS = 30
+STALE_LOCK_SECONDS = 120
+
+def plan_chunks(subtitles: List[srt.Subtitle], video_duration: float, chunk_seconds: float = 600.0) -> List[dict]:
+    """
+    Split a video into time chunks along subtitle cue boundaries.
+
+    A new chunk starts at the first cue that begins at least `chunk_seconds`
+    after the start of the current chunk, so no cue is ever cut in two and
+    every chunk holds at least one cue. The first chunk starts at 0 and the last
+    one ends with the video, so the chunks cover the whole timeline.
+
+    Args:
+        subtitles (List[srt.Subtitle]): Cues of the source transcript, in order.
+        video_duration (float): Duration of the video in seconds.
+        chunk_seconds (float, optional): Target chunk length. Defaults to 10 minutes.
+
+    Returns:
+        List[dict]: Chunks with `index`, `start` and `end` (seconds) and `cues`,
+        the [first, last) cue indices.
+    """
+    chunks = []
+    start = 0.0
+    first = 0
+    for i, sub in enumerate(subtitles):
+        cue_start = sub.start.total_seconds()
+        if i > first and cue_start - start >= chunk_seconds:
+            chunks.append({"index": len(chunks), "start": start, "end": cue_start, "cues": [first, i]})
+            start, first = cue_start, i
+    chunks.append({"index": len(chunks), "start": start, "end": max(video_duration, start), "cues": [first, len(subtitles)]})
+    return chunks
+
+def job_key(video_path: str, transcript_path: str, options: dict) -> str:
+    """
+    Identifier of a job, derived from the contents of its inputs and its
+    options, so that resubmitting the same job finds its earlier state.
+    """
+    payload = json.dumps({
+        "video": file_sha256(video_path),
+        "transcript": file_sha256(transcript_path),
+        "options": options,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def _write_json(path: str, data: dict):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _link_or_copy(src: str, dst: str):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+class JobManifest:
+    """
+    On-disk plan and progress of a chunked job.
+
+    The manifest is written once when the job is created and lists the inputs,
+    the options and the chunks. Progress is checkpointed per chunk and stage in
+    the chunk's own `state.json`, so only the worker holding a chunk ever
+    writes to it, and any number of workers sharing the job directory (e.g. on
+    a network file system) can process chunks side by side.
+
+    Layout:
+        <job>/manifest.json        inputs, options and chunk plan
+        <job>/inputs/              the source video and transcript
+        <job>/chunk-0000/          artifacts and state.json of each chunk
+        <job>/locks/               leases held by workers
+        <job>/outputs/             final outputs
+
+    Example:
+        >>> manifest = JobManifest.create("jobs", "input.mp4", "input.srt", options)
+        >>> with manifest.lease("chunk-0000", "worker-1") as claimed:
+        ...     if claimed and not manifest.is_done(0, "translate"):
+        ...         manifest.mark_done(0, "translate", srt="de_source.srt")
+    """
+
+    def __init__(self, path: str):
+        """
+        Open an existing job.
+
+        Args:
+            path (str): Job directory containing manifest.json.
+        """
+        self.path = path
+        with open(os.path.join(path, "manifest.json"), "r", encoding="utf-8") as f:
+            self.data = json.load(f)
+        self.job_id = self.data["job_id"]
+        self.options = self.data["options"]
+        self.chunks = self.data["chunks"]
+        self.video_path = os.path.join(path, self.data["video"])
+        self.transcript_path = os.path.join(path, self.data["transcript"])
+        self.output_dir = os.path.join(path, "outputs")
+
+    @classmethod
+    def create(
+        cls,
+        root: str,
+        video_path: str,
+        transcript_path: str,
+        options: dict,
+        chunk_seconds: float = 600.0,
+    ) -> "JobManifest":
+        """
+        Create a job, or open it if the same inputs and options were submitted
+        before, in which case its completed work is kept.
+
+        Args:
+            root (str): Directory holding the job directories.
+            video_path (str): Source video.
+            transcript_path (str): Source SRT transcript.
+            options (dict): JSON-serializable job options; part of the job key.
+            chunk_seconds (float, optional): Target chunk length. Defaults to 10 minutes.
+
+        Returns:
+            JobManifest: The job.
+        """
+        job_id = job_key(video_path, transcript_path, dict(options, chunk_seconds=chunk_seconds))
+        path = os.path.join(root, job_id)
+        if os.path.exists(os.path.join(path, "manifest.json")):
+            return cls(path)
+
+        # Keep the inputs with the job, so it can be resumed (or joined by other
+        # workers) after the original upload is gone
+        for name in ["inputs", "locks", "outputs"]:
+            os.makedirs(os.path.join(path, name), exist_ok=True)
+        video = os.path.join("inputs", "video" + os.path.splitext(video_path)[1])
+        transcript = os.path.join("inputs", "transcript.srt")
+        _link_or_copy(video_path, os.path.join(path, video))
+        _link_or_copy(transcript_path, os.path.join(path, transcript))
+
+        with open(transcript_path, "r", encoding="utf-8") as f:
+            subtitles = list(srt.parse(f.read()))
+        video_duration = float(ffmpeg.probe(video_path)['format']['duration'])
+        chunks = plan_chunks(subtitles, video_duration, chunk_seconds)
+        for chunk in chunks:
+            os.makedirs(os.path.join(path, cls.chunk_name(chunk["index"])), exist_ok=True)
+
+        _write_json(os.path.join(path, "manifest.json"), {
+            "job_id": job_id,
+            "created": time.time(),
+            "video": video,
+            "transcript": transcript,
+            "duration": video_duration,
+            "chunk_seconds": chunk_seconds,
+            "options": options,
+            "chunks": chunks,
+        })
+        return cls(path)
+
+    @staticmethod
+    def chunk_name(index: int) -> str:
+        return f"chunk-{index:04d}"
+
+    @property
+    def stages(self) -> List[str]:
+        """
+        Stages every chunk goes through, in order.
+        """
+        stages = ["translate", "tts", "render"]
+        if self.options.get("translation_type") == "LipSync":
+            stages.append("lipsync")
+        return stages
+
+    def artifact(self, index: int, name: str) -> str:
+        """
+        Path of a file belonging to chunk `index`.
+        """
+        return os.path.join(self.path, self.chunk_name(index), name)
+
+    def output(self, name: str) -> str:
+        """
+        Path of a final output of the job.
+        """
+        return os.path.join(self.output_dir, name)
+
+    def state(self, index: int) -> dict:
+        """
+        Completed stages of chunk `index`, mapped to their artifact file names.
+        """
+        try:
+            with open(self.artifact(index, "state.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def is_done(self, index: int, stage: str) -> bool:
+        """
+        Whether `stage` of chunk `index` finished and its artifacts still exist.
+        """
+        artifacts = self.state(index).get(stage)
+        if artifacts is None:
+            return False
+        return all(os.path.exists(self.artifact(index, name)) for name in artifacts.values())
+
+    def mark_done(self, index: int, stage: str, **artifacts: str):
+        """
+        Checkpoint `stage` of chunk `index`, recording the artifact file names
+        (relative to the chunk directory) it produced.
+        """
+        state = self.state(index)
+        state[stage] = artifacts
+        _write_json(self.artifact(index, "state.json"), state)
+
+    def chunk_complete(self, index: int) -> bool:
+        return all(self.is_done(index, stage) for stage in self.stages)
+
+    def remaining(self) -> List[int]:
+        """
+        Indices of chunks with stages left to run.
+        """
+        return [chunk["index"] for chunk in self.chunks if not self.chunk_complete(chunk["index"])]
+
+    def finished(self) -> bool:
+        """
+        Whether the final outputs have been assembled.
+        """
+        return all(os.path.exists(self.output(name)) for name in ["output.mp4", "de_audio.wav", "de_audio.srt"])
+
+    def _lock_path(self, name: str) -> str:
+        return os.path.join(self.path, "locks", f"{name}.lock")
+
+    def _lock_is_stale(self, lock_path: str) -> bool:
+        try:
+            with open(lock_path, "r", encoding="utf-8") as f:
+                owner = json.load(f)
+            age = time.time() - os.path.getmtime(lock_path)
+        except FileNotFoundError:
+            return True
+        except ValueError:
+            # Being written right now
+            return False
+
+        # A lock left behind by a dead process on this machine is stale right away
+        if owner.get("host") == socket.gethostname() and owner.get("pid") != os.getpid():
+            try:
+                os.kill(owner["pid"], 0)
+            except ProcessLookupError:
+                return True
+            except (OSError, KeyError, TypeError):
+                pass
+        return age > STALE_LOCK_SECONDS
+
+    def claim(self, name: str, worker_id: str) -> bool:
+        """
+        Try to take the lock `name` (e.g. a chunk name) for `worker_id`.
+
+        Locks are created atomically, so at most one worker holds each one.
+        Locks of crashed workers are taken over once stale.
+
+        Returns:
+            bool: True if the lock was acquired.
+        """
+        lock_path = self._lock_path(name)
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._lock_is_stale(lock_path):
+                    return False
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(lock_path)
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"worker": worker_id, "host": socket.gethostname(), "pid": os.getpid()}, f)
+            return True
+
+    def release(self, name: str):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._lock_path(name))
+
+    @contextlib.contextmanager
+    def lease(self, name: str, worker_id: str):
+        """
+        Hold the lock `name` for the duration of a `with` block, refreshing it
+        in the background so long-running stages do not look abandoned.
+
+        Yields:
+            bool: True if the lock was acquired; the block should skip the work
+            otherwise.
+        """
+        if not self.claim(name, worker_id):
+            yield False
+            return
+
+        stop = threading.Event()
+        def heartbeat():
+            while not stop.wait(HEARTBEAT_SECONDS):
+                with contextlib.suppress(FileNotFoundError):
+                    os.utime(self._lock_path(name))
+
+        thread = threading.Thread(target=heartbeat, name=f"lease-{name}", daemon=True)
+        thread.start()
+        try:
+            yield True
+        finally:
+            stop.set()
+            thread.join()
+            self.release(name)
+
+    def remove_chunks(self):
+        """
+        Remove the chunk directories and other intermediate files of a
+        finished job, keeping the manifest, inputs and outputs.
+        """
+        for chunk in self.chunks:
+            shutil.rmtree(os.path.join(self.path, self.chunk_name(chunk["index"])), ignore_errors=True)
+        for name in ["reference.wav", "concat.txt"]:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(self.path, name))
+
+    @staticmethod
+    def purge_stale(root: str, ttl_seconds: float = 24 * 3600):
+        """
+        Remove job directories under `root` without activity for `ttl_seconds`.
+
+        A job's last activity is the newest change to its directory, its locks
+        (refreshed while a worker holds them) or its outputs, so jobs that are
+        still running are never removed.
+        """
+        if not os.path.isdir(root):
+            return
+        cutoff = time.time() - ttl_seconds
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if not os.path.isdir(path):
+                continue
+            locks = os.path.join(path, "locks")
+            try:
+                paths = [path, locks, os.path.join(path, "outputs")]
+                if os.path.isdir(locks):
+                    paths += [entry.path for entry in os.scandir(locks)]
+                last_activity = max(os.path.getmtime(p) for p in paths if os.path.exists(p))
+            except FileNotFoundError:
+                continue
+            if last_activity < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def progress(self) -> float:
+        """
+        Fraction of chunk stages completed.
+        """
+        if self.finished():
+            return 1.0
+        total = len(self.chunks) * len(self.stages)
+        done = sum(self.is_done(chunk["index"], stage) for chunk in self.chunks for stage in self.stages)
+        return done / total if total else 1.0
@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from typing import Optional, Tuple
+
+from .manifest import _link_or_copy
+from ..utils.hashing import file_sha256
+
+# Bump when a change to the pipeline makes earlier results stale
+RESULT_FORMAT_VERSION = 1
+
+OUTPUT_NAMES = ("output.mp4", "de_audio.wav", "de_audio.srt")
+
+class ResultCache:
+    """
+    On-disk store of finished jobs, so resubmitting the same video and
+    transcript with the same settings returns the earlier outputs at once.
+
+    Each result is a directory named by a hash of the input contents and
+    every option that affects the output, holding `output.mp4`,
+    `de_audio.wav`, `de_audio.srt` and a `result.json` written last, so a
+    directory without it is incomplete and ignored. The modification time of
+    `result.json` tracks recency, and the least recently used results are
+    deleted once the store grows past `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str = "cache/results", max_bytes: int = 20 * 1024**3):
+        """
+        Open (or create) a result store.
+
+        Args:
+            cache_dir (str, optional): Directory holding the results. Defaults to "cache/results".
+            max_bytes (int, optional): Size bound for the directory. Defaults to 20 GB.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> Optional["ResultCache"]:
+        """
+        Store configured by RESULT_CACHE_GB (default 20), or None if it is 0.
+        """
+        max_gb = float(os.environ.get("RESULT_CACHE_GB", 20))
+        return cls("cache/results", int(max_gb * 1024**3)) if max_gb > 0 else None
+
+    @staticmethod
+    def make_key(video_path: str, transcript_path: str, options: dict) -> str:
+        """
+        Hash of the input contents (streamed from disk) and the options.
+        """
+        payload = json.dumps({
+            "version": RESULT_FORMAT_VERSION,
+            "video": file_sha256(video_path),
+            "transcript": file_sha256(transcript_path),
+            "options": options,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key: str) -> Optional[Tuple[str, str, str]]:
+        """
+        Paths of the stored outputs for `key`, or None on a miss.
+        """
+        path = self._path(key)
+        marker = os.path.join(path, "result.json")
+        outputs = tuple(os.path.join(path, name) for name in OUTPUT_NAMES)
+        try:
+            if not all(os.path.exists(output) for output in outputs):
+                raise FileNotFoundError(path)
+            os.utime(marker)  # mark as recently used
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return outputs
+
+    @staticmethod
+    def restore(stored: Tuple[str, str, str], output_dir: str) -> Optional[Tuple[str, str, str]]:
+        """
+        Link (or copy) outputs returned by `get` into `output_dir`, so they
+        outlive a later eviction, and return their paths. None if they were
+        evicted in the meantime.
+        """
+        restored = tuple(os.path.join(output_dir, name) for name in OUTPUT_NAMES)
+        try:
+            for src, dst in zip(stored, restored):
+                _link_or_copy(src, dst)
+        except FileNotFoundError:
+            # Evicted by another process in the meantime
+            return None
+        return restored
+
+    def put(self, key: str, outputs: Tuple[str, str, str], metadata: Optional[dict] = None):
+        """
+        Store a job's outputs (video, audio, subtitles) under `key` and evict
+        old results if over budget.
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(tmp_path)
+        try:
+            for src, name in zip(outputs, OUTPUT_NAMES):
+                _link_or_copy(src, os.path.join(tmp_path, name))
+            with open(os.path.join(tmp_path, "result.json"), "w", encoding="utf-8") as f:
+                json.dump({"created": time.time(), **(metadata or {})}, f, indent=2)
+            if os.path.isdir(path) and not os.path.exists(os.path.join(path, "result.json")):
+                # Left behind by an interrupted eviction
+                shutil.rmtree(path, ignore_errors=True)
+            try:
+                os.rename(tmp_path, path)  # atomic, so readers never see partial results
+            except OSError:
+                # Stored concurrently by another job
+                pass
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+        with self._lock:
+            self._evict()
+
+    def _entries(self) -> list:
+        """
+        (last used, size, name) for every complete result.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".tmp"):
+                continue
+            path = self._path(name)
+            try:
+                last_used = os.stat(os.path.join(path, "result.json")).st_mtime
+                size = sum(entry.stat().st_size for entry in os.scandir(path))
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            entries.append((last_used, size, name))
+        return entries
+
+    def _evict(self):
+        """
+        Delete least recently used results until the store fits `max_bytes`.
+        Caller holds the lock.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                # Unmark first, so a half-deleted result is never served
+                os.remove(os.path.join(self._path(name), "result.json"))
+            except FileNotFoundError:
+                continue
+            shutil.rmtree(self._path(name), ignore_errors=True)
+            total -= size
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters for this store object and its current size.
+        """
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
@@ -0,0 +1,142 @@
+import os
+import time
+import json
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+class FaceBoxCache:
+    """
+    Persistent cache of face boxes detected in video frames.
+
+    Face detection runs on every frame and dominates LipSync time, but its
+    result only depends on the frame itself. Boxes are stored in a single
+    SQLite file keyed by a hash of the decoded frame and the resize factor, so
+    re-running LipSync on the same video (with another seed, padding or Wav2Lip
+    model) skips detection for every frame seen before, and frames repeated
+    within a video (e.g. the reversed tail added to extend it) are detected
+    once. Boxes are stored before padding and smoothing, which are applied
+    afterwards. The least recently used entries are evicted once the cache
+    grows past `max_entries`.
+    """
+
+    def __init__(self, path: str = "cache/faces.sqlite", max_entries: int = 1_000_000):
+        """
+        Open (or create) a face-box cache.
+
+        Args:
+            path (str, optional): Path to the SQLite file. Defaults to "cache/faces.sqlite".
+            max_entries (int, optional): Maximum number of cached frames before LRU
+                eviction. Defaults to 1,000,000 (about 10 hours of 25 fps video).
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS faces (
+                    key TEXT PRIMARY KEY,
+                    box TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_faces_last_used ON faces(last_used)")
+
+    @staticmethod
+    def make_key(frame, resize_factor: int = 1, detector: str = "sfd") -> str:
+        """
+        Content hash identifying a decoded frame (numpy array) for a detector
+        and resize factor.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{detector}\0{resize_factor}\0{frame.shape}\0{frame.dtype}\0".encode("utf-8"))
+        digest.update(memoryview(frame).cast("B") if frame.flags.c_contiguous else frame.tobytes())
+        return digest.hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Tuple[int, int, int, int]]:
+        """
+        Look up several frames at once.
+
+        Returns:
+            Dict[str, Tuple[int, int, int, int]]: Maps each key found to its
+            (x1, y1, x2, y2) face box.
+        """
+        key_list = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, box FROM faces WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, box in rows:
+                    found[key] = tuple(json.loads(box))
+
+            if found:
+                now = time.time()
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE faces SET last_used = ? WHERE key = ?",
+                        [(now, key) for key in found],
+                    )
+            self.hits += len(found)
+            self.misses += len(key_list) - len(found)
+
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, Optional[Tuple[int, int, int, int]]]]):
+        """
+        Store several (key, face box) pairs in one transaction. Frames without
+        a detected face (box None) are not cached.
+        """
+        now = time.time()
+        rows = [(key, json.dumps([int(v) for v in box]), now) for key, box in items if box is not None]
+        if not rows:
+            return
+
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO faces (key, box, last_used) VALUES (?, ?, ?)", rows)
+            self._evict()
+
+    def _evict(self):
+        """
+        Delete the least recently used entries beyond `max_entries`. Caller holds the lock.
+        """
+        count = self._conn.execute("SELECT COUNT(*) FROM faces").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM faces WHERE key IN (SELECT key FROM faces ORDER BY last_used ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters for this cache object and the number of stored frames.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM faces").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def close(self):
+        """
+        Close the underlying SQLite connection.
+        """
+        self._conn.close()
@@ -0,0 +1,155 @@
+import os
+import tempfile
+import face_alignment
+from fractions import Fraction
+from lipsync import LipSync
+from lipsync.helpers import get_face_box
+from lipsync.models import load_model
+from tqdm import tqdm
+
+from .face_cache import FaceBoxCache
+from ..utils.model_registry import model_registry
+from ..utils.render import EncoderSettings, escape_filter_path
+from ..utils.tracing import count, run_subprocess
+
+class WarmLipSync(LipSync):
+    """
+    LipSync variant that takes its Wav2Lip network and face detector from the
+    process-wide model registry.
+
+    The upstream `LipSync.sync` reloads the checkpoint and constructs a new
+    face_alignment detector on every call. Here both are loaded once per
+    (model, device, checkpoint) and shared across requests, so constructing a
+    `WarmLipSync` per job with job-specific padding and resize factor is cheap.
+
+    Intermediate files are written to `temp_dir` (e.g. a job workspace) when
+    set, instead of the system temp directory. With a `face_cache`, face boxes
+    are looked up per frame before running the detector. Subtitles given as
+    `subtitles_path` are burned in by the final encode, so the frames Wav2Lip
+    and the face detector see do not depend on the translation.
+
+    For lip syncing parts of a video (see `spans.lipsync_spoken_segments`),
+    `match_frames` makes the output exactly as long as the input video,
+    `output_fps` keeps its exact (possibly fractional) frame rate, and
+    `mux_audio=False` writes the video stream only.
+    """
+
+    temp_dir: str = None
+    face_cache: FaceBoxCache = None
+    subtitles_path: str = None
+    encoder: EncoderSettings = None
+    match_frames: bool = False
+    output_fps: str = None
+    mux_audio: bool = True
+    _frame_count: int = 0
+
+    def create_temp_file(self, ext: str) -> str:
+        """
+        Create a temporary file with a specific extension in `temp_dir`.
+        """
+        if self.temp_dir is None:
+            return LipSync.create_temp_file(ext)
+        fd, filename = tempfile.mkstemp(suffix=f'.{ext}', dir=self.temp_dir)
+        os.close(fd)
+        return filename
+
+    def _load_model_for_inference(self):
+        """
+        Return the registry-cached Wav2Lip network.
+        """
+        return model_registry.get(
+            self.model, self.device, self.checkpoint_path,
+            lambda: load_model(self.model, self.device, self.checkpoint_path),
+        )
+
+    def detect_faces_in_frames(self, images):
+        """
+        Detect faces in the given frames with a registry-cached face_alignment
+        detector, skipping frames found in the face cache.
+        """
+        boxes, cached = self._find_faces(images)
+        if self.face_cache is not None:
+            print(f"Face detection: {cached}/{len(images)} frames from cache.")
+        return boxes
+
+    def _find_faces(self, images, show_progress: bool = True):
+        """
+        Face boxes of `images` and the number of them found in the face cache.
+        """
+        if self.face_cache is None:
+            return self._detect_faces(images, show_progress), 0
+
+        keys = [FaceBoxCache.make_key(image, self.resize_factor) for image in images]
+        boxes = self.face_cache.get_many(keys)
+
+        # Detect each distinct uncached frame once
+        missing = {}
+        for key, image in zip(keys, images):
+            if key not in boxes:
+                missing.setdefault(key, image)
+        if missing:
+            detected = dict(zip(missing, self._detect_faces(list(missing.values()), show_progress)))
+            self.face_cache.put_many(detected.items())
+            boxes.update(detected)
+
+        count("face_cache_hits", len(images) - len(missing))
+        count("face_detections", len(missing))
+        return [boxes[key] for key in keys], len(images) - len(missing)
+
+    def _detect_faces(self, images, show_progress: bool = True):
+        detector = model_registry.get(
+            "face_alignment/sfd", self.device, None,
+            lambda: face_alignment.FaceAlignment(
+                landmarks_type=face_alignment.LandmarksType.TWO_D,
+                face_detector='sfd',
+                device=self.device
+            ),
+        )
+
+        predictions = []
+        for image in tqdm(images, desc="Face Detection", disable=not show_progress):
+            landmarks = detector.get_landmarks_from_image(image, return_bboxes=True)
+            predictions.append(get_face_box(landmarks))
+
+        return predictions
+
+    def _load_input_face(self, face: str):
+        full_frames, fps = LipSync._load_input_face(self, face)
+        self._frame_count = len(full_frames)
+        return full_frames, fps
+
+    def _split_mel_chunks(self, mel, fps):
+        """
+        Split the mel spectrogram into one chunk per output frame, at the exact
+        `output_fps` when set. With `match_frames`, the chunks are trimmed or
+        padded to the number of input frames.
+        """
+        if self.output_fps is not None:
+            fps = float(Fraction(self.output_fps))
+        chunks = LipSync._split_mel_chunks(self, mel, fps)
+        if self.match_frames and self._frame_count:
+            chunks = chunks[:self._frame_count]
+            chunks += [chunks[-1]] * (self._frame_count - len(chunks))
+        return chunks
+
+    def _merge_audio_video(self, audio_file: str, temp_video: str, outfile: str):
+        """
+        Mux the generated video with the audio, encoding it with `encoder` and
+        burning in `subtitles_path`, if set, in the same pass.
+        """
+        cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
+        if self.mux_audio:
+            cmd += ["-i", audio_file]
+        if self.output_fps is not None:
+            # The intermediate AVI is written at an integer frame rate
+            cmd += ["-r", self.output_fps]
+        cmd += ["-i", temp_video, "-map", f"{int(self.mux_audio)}:v:0"]
+        if self.mux_audio:
+            cmd += ["-map", "0:a:0"]
+        if self.subtitles_path is not None:
+            cmd += ["-vf", f"subtitles=filename='{escape_filter_path(self.subtitles_path)}':charenc=UTF-8"]
+        cmd += (self.encoder or EncoderSettings()).ffmpeg_args()
+        if self.mux_audio:
+            cmd += ["-c:a", "aac", "-b:a", "192k"]
+        cmd += [outfile]
+        run_subprocess("lipsync_encode", cmd, outfile)
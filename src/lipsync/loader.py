@@ -0,0 +1,35 @@
+import os
+import functools
+import importlib.util
+
+from ..utils.startup import lazy_import
+
+def lipsync_available() -> bool:
+    """
+    Whether the optional `lipsync` package (Wav2Lip) is installed. Only the
+    LipSync translation type needs it; dubbing works without it.
+    """
+    return importlib.util.find_spec("lipsync") is not None
+
+def load_warm_lipsync():
+    """
+    Import the lip-sync stage on first use, so the lipsync package and its
+    face detector are only loaded by deployments that lip sync.
+
+    Videos are streamed through Wav2Lip in windows of LIPSYNC_WINDOW_FRAMES
+    frames (default 32, see `StreamingLipSync`); 0 loads whole videos into
+    memory as upstream `LipSync` does.
+
+    Returns:
+        Callable: `StreamingLipSync` (with the window size set) or `WarmLipSync`,
+        called with the lip-sync settings.
+
+    Raises:
+        RuntimeError: If the lipsync package is not installed.
+    """
+    if not lipsync_available():
+        raise RuntimeError("LipSync requires the optional `lipsync` package: pip install lipsync")
+    window_frames = int(os.environ.get("LIPSYNC_WINDOW_FRAMES", 32))
+    if window_frames > 0:
+        return functools.partial(lazy_import(f"{__package__}.streaming").StreamingLipSync, window_frames=window_frames)
+    return lazy_import(f"{__package__}.lipsync").WarmLipSync
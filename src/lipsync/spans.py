@@ -0,0 +1,215 @@
+import os
+import math
+import wave
+from fractions import Fraction
+from typing import List, Tuple
+
+import ffmpeg
+import srt
+
+from ..utils.render import video_frame_rate
+from ..utils.tracing import run_subprocess, span
+
+def plan_spoken_segments(
+    subtitles: List[srt.Subtitle],
+    duration: float,
+    frame_rate: Fraction,
+    margin: float = 0.2,
+    min_gap: float = 1.0,
+) -> List[Tuple[int, int, bool]]:
+    """
+    Split a video's frames into ranges with and without speech.
+
+    Each subtitle cue, widened by `margin` seconds on both sides, is a spoken
+    range. Spoken ranges closer than `min_gap` seconds to each other (or to the
+    start or end of the video) are merged, since very short untouched ranges
+    are not worth an extra keyframe.
+
+    Args:
+        subtitles (List[srt.Subtitle]): Cues timed against the video.
+        duration (float): Video duration in seconds.
+        frame_rate (Fraction): Video frame rate.
+        margin (float, optional): Seconds added before and after each cue. Defaults to 0.2.
+        min_gap (float, optional): Shortest untouched range kept. Defaults to 1 second.
+
+    Returns:
+        List[Tuple[int, int, bool]]: Consecutive (first frame, end frame, spoken)
+        ranges covering the whole video; end frames are exclusive.
+    """
+    total_frames = max(1, round(duration * frame_rate))
+    intervals = sorted(
+        (max(0.0, sub.start.total_seconds() - margin), min(duration, sub.end.total_seconds() + margin))
+        for sub in subtitles
+    )
+
+    spoken = []
+    for start, end in intervals:
+        if end <= start:
+            continue
+        if spoken and start - spoken[-1][1] < min_gap:
+            spoken[-1][1] = max(spoken[-1][1], end)
+        else:
+            spoken.append([start, end])
+    if spoken and spoken[0][0] < min_gap:
+        spoken[0][0] = 0.0
+    if spoken and duration - spoken[-1][1] < min_gap:
+        spoken[-1][1] = duration
+
+    segments = []
+    cursor = 0
+    for start, end in spoken:
+        first = min(total_frames, math.floor(start * frame_rate))
+        last = min(total_frames, math.ceil(end * frame_rate))
+        if first > cursor:
+            segments.append((cursor, first, False))
+        if last > first:
+            segments.append((first, last, True))
+        cursor = max(cursor, last)
+    if cursor < total_frames:
+        segments.append((cursor, total_frames, False))
+    return segments
+
+def segment_boundaries(segments: List[Tuple[int, int, bool]], frame_rate: Fraction) -> List[float]:
+    """
+    Times (in seconds) at which the segments after the first one start.
+
+    Each time lies half a frame before the first frame of its segment, so both
+    `-force_key_frames` and the segment muxer (which act on the first frame at
+    or after a time) pick exactly that frame.
+    """
+    return [float((first - Fraction(1, 2)) / frame_rate) for first, _, _ in segments[1:]]
+
+def slice_wav(input_path: str, start: float, duration: float, output_path: str) -> str:
+    """
+    Copy `duration` seconds of a WAV file from `start`, padding with silence
+    past its end.
+    """
+    with wave.open(input_path, "rb") as src:
+        rate = src.getframerate()
+        frame_bytes = src.getsampwidth() * src.getnchannels()
+        first = min(round(start * rate), src.getnframes())
+        count = round(duration * rate)
+        src.setpos(first)
+        frames = src.readframes(count)
+        with wave.open(output_path, "wb") as dst:
+            dst.setparams(src.getparams())
+            dst.writeframes(frames + b"\0" * (count * frame_bytes - len(frames)))
+    return output_path
+
+def lipsync_spoken_segments(
+    lip,
+    video_path: str,
+    audio_path: str,
+    segments: List[Tuple[int, int, bool]],
+    frame_rate: Fraction,
+    output_path: str,
+    work_dir: str,
+) -> str:
+    """
+    Run Wav2Lip only on the spoken segments of a video and stream-copy the rest.
+
+    The video must have keyframes at the segment boundaries (see
+    `segment_boundaries` and the `keyframes` option of `render_video`). It is
+    split into Matroska segments without re-encoding; spoken segments are lip
+    synced against the matching slice of the audio, and all segments are
+    joined again with a stream copy. The audio track of `video_path` is muxed
+    in once at the end.
+
+    Args:
+        lip (WarmLipSync): Configured lip-sync instance. Its output must use the
+            same encoder settings as the video, so segments can be joined.
+        video_path (str): Video with the new audio track and forced keyframes.
+        audio_path (str): Speech audio (WAV) the lips are synchronized to.
+        segments (List[Tuple[int, int, bool]]): From `plan_spoken_segments`.
+        frame_rate (Fraction): Frame rate the segments were planned at; must
+            be the rate of `video_path`.
+        output_path (str): Path of the final video.
+        work_dir (str): Directory for intermediate segments.
+
+    Returns:
+        str: `output_path`.
+
+    Raises:
+        ValueError: If `video_path` does not run at `frame_rate`.
+    """
+    # The segments are planned in frames of the source video before rendering
+    video_rate = video_frame_rate(video_path)
+    if video_rate != frame_rate:
+        raise ValueError(f"The video runs at {video_rate} fps, but its segments were planned at {frame_rate} fps.")
+
+    os.makedirs(work_dir, exist_ok=True)
+    pattern = os.path.join(work_dir, "segment_%05d.mkv")
+    cmd = [
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-i", video_path,
+        "-map", "0:v:0", "-c", "copy",
+        "-f", "segment", "-segment_format", "matroska", "-reset_timestamps", "1",
+    ]
+    boundaries = segment_boundaries(segments, frame_rate)
+    if boundaries:
+        cmd += ["-segment_times", ",".join(f"{t:.6f}" for t in boundaries)]
+    run_subprocess("split_segments", cmd + [pattern])
+
+    parts = [pattern % i for i in range(len(segments))]
+    if not all(os.path.exists(part) for part in parts) or os.path.exists(pattern % len(segments)):
+        raise RuntimeError("Video was not split at the expected frames; are keyframes forced at the segment boundaries?")
+
+    spoken_frames = sum(last - first for first, last, spoken in segments if spoken)
+    total_frames = segments[-1][1] if segments else 0
+    print(f"Lip syncing {spoken_frames}/{total_frames} frames in {sum(s for _, _, s in segments)} spoken segments.")
+
+    # Lip-synced segments are written without audio, at the source frame rate
+    lip.mux_audio = False
+    lip.match_frames = True
+    lip.output_fps = str(frame_rate)
+    for i, (first, last, spoken) in enumerate(segments):
+        if not spoken:
+            continue
+        audio_slice = slice_wav(
+            audio_path,
+            float(first / frame_rate),
+            float((last - first) / frame_rate),
+            os.path.join(work_dir, f"segment_{i:05d}.wav"),
+        )
+        synced = os.path.join(work_dir, f"synced_{i:05d}.mkv")
+        with span("lipsync.segment", segment=i, frames=last - first):
+            lip.sync(parts[i], audio_slice, synced)
+        parts[i] = synced
+
+    # Segment durations are given explicitly: Matroska segments may start a
+    # few frames late (the encoder delay), and the concat demuxer would
+    # otherwise add that delay to the offset of every following segment
+    list_path = os.path.join(work_dir, "segments.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        for part, (first, last, _) in zip(parts, segments):
+            escaped = os.path.abspath(part).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\nduration {float((last - first) / frame_rate):.6f}\n")
+
+    run_subprocess("join_segments", [
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-f", "concat", "-safe", "0", "-i", list_path,
+        "-i", video_path,
+        "-map", "0:v:0", "-map", "1:a:0",
+        "-c", "copy",
+        "-movflags", "+faststart",
+        output_path,
+    ], output_path)
+    return output_path
+
+def plan_render_segments(
+    srt_path: str,
+    video_duration: float,
+    audio_path: str,
+    frame_rate: Fraction,
+    margin: float = 0.2,
+) -> List[Tuple[int, int, bool]]:
+    """
+    Plan the spoken segments of the video `render_video` produces from a video
+    of `video_duration` seconds and the speech in `audio_path`, whose cues are
+    in `srt_path`. Called before rendering, so keyframes can be forced at the
+    segment boundaries.
+    """
+    audio_duration = float(ffmpeg.probe(audio_path)['format']['duration'])
+    with open(srt_path, "r", encoding="utf-8") as f:
+        subtitles = list(srt.parse(f.read()))
+    return plan_spoken_segments(subtitles, max(video_duration, audio_duration), frame_rate, margin)
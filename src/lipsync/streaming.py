@@ -0,0 +1,331 @@
+import os
+import cv2
+import queue
+import ffmpeg
+import threading
+import contextvars
+import subprocess
+import numpy as np
+from collections import deque
+from fractions import Fraction
+from lipsync import LipSync
+from tqdm import tqdm
+
+from .lipsync import WarmLipSync
+from ..utils.render import EncoderSettings, escape_filter_path
+from ..utils.startup import lazy_import
+from ..utils.tracing import count, span
+
+# Marks the end of a frame queue
+_END = object()
+
+class _Aborted(Exception):
+    pass
+
+class _FrameSink:
+    """
+    Stands in for the `cv2.VideoWriter` of `LipSync._write_predicted_frames`,
+    handing each finished frame to the encoder thread.
+    """
+
+    def __init__(self, put):
+        self.put = put
+        self.frames = 0
+
+    def write(self, frame):
+        self.put(frame)
+        self.frames += 1
+
+class StreamingLipSync(WarmLipSync):
+    """
+    WarmLipSync that streams the video through Wav2Lip instead of loading all
+    of its frames, so memory stays bounded on long or high-resolution inputs.
+
+    An ffmpeg process decodes the video into a pipe, read in windows of
+    `window_frames` frames. Faces are found per window (through the face
+    cache), the mouth crops are run through Wav2Lip in batches of at most
+    `window_frames`, and finished frames are piped into a second ffmpeg
+    process that encodes the output, muxing the audio and burning in
+    subtitles in the same pass. Decoding, inference and encoding run on their
+    own threads, connected by bounded queues, so the frames held at any time
+    depend on the window size, not on the length of the video. Only the
+    audio features (a small fraction of the frame data) cover the whole clip.
+
+    Unlike `LipSync.sync`, frames are timed at the exact frame rate of the
+    video, and if the audio is longer than the video the last frame is
+    repeated rather than looping back to the first (videos are extended to
+    the audio length before lip sync). Still images and fixed face boxes are
+    lip synced by `WarmLipSync.sync`.
+    """
+
+    window_frames: int = 32
+
+    def sync(self, face: str, audio_file: str, outfile: str) -> str:
+        """
+        Lip sync the video `face` to `audio_file`, writing `outfile`.
+        """
+        if self.box[0] != -1 or face.split('.')[-1].lower() in ['jpg', 'png', 'jpeg']:
+            return WarmLipSync.sync(self, face, audio_file, outfile)
+        if not os.path.isfile(face):
+            raise ValueError('face argument must be a valid file path.')
+
+        self._filepath = face
+        stream = next(s for s in ffmpeg.probe(face)['streams'] if s['codec_type'] == 'video')
+        width, height = int(stream['width']), int(stream['height'])
+        frame_rate = Fraction(self.output_fps or stream['r_frame_rate'])
+
+        audio_file = self._prepare_audio(audio_file)
+        mel_chunks = LipSync._split_mel_chunks(self, self._generate_mel_spectrogram(audio_file), float(frame_rate))
+        model = self._load_model_for_inference()
+
+        windows = queue.Queue(maxsize=2)
+        finished = queue.Queue(maxsize=self.window_frames)
+        stop = threading.Event()
+        # Set when no more frames are needed, e.g. when the audio ends first
+        decoded = threading.Event()
+        decoder_killed = threading.Event()
+        errors = []
+
+        def put(q, item, abort=stop):
+            # Give up once another thread failed, instead of blocking forever
+            while not abort.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+            raise _Aborted()
+
+        def get(q):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            raise _Aborted()
+
+        def run_thread(fn, *args):
+            try:
+                fn(*args)
+            except _Aborted:
+                pass
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+                decoded.set()
+
+        decoder = subprocess.Popen(self._decode_command(face), stdout=subprocess.PIPE)
+        encoder = subprocess.Popen(
+            self._encode_command(audio_file, outfile, width, height, frame_rate),
+            stdin=subprocess.PIPE,
+        )
+        threads = [
+            threading.Thread(
+                target=contextvars.copy_context().run, args=(run_thread, fn, *args),
+                name=f"lipsync-{name}", daemon=True,
+            )
+            for name, fn, args in [
+                ("decode", self._read_windows, (decoder, width, height, lambda window: put(windows, window, decoded), decoder_killed)),
+                ("encode", self._write_frames, (encoder, lambda: get(finished))),
+            ]
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            with span("lipsync.inference", window_frames=self.window_frames) as inference_span:
+                sink = _FrameSink(lambda frame: put(finished, frame))
+                self._perform_streaming_inference(model, self._iter_windows(lambda: get(windows)), mel_chunks, sink)
+                inference_span.attrs["frames"] = sink.frames
+                count("lipsync_frames", sink.frames)
+            decoded.set()
+            put(finished, _END)
+        except _Aborted:
+            pass
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            decoded.set()
+            if stop.is_set() or errors:
+                encoder.kill()
+            if threads[0].is_alive():
+                # Still decoding, e.g. if the audio ended first
+                decoder_killed.set()
+                decoder.kill()
+            for thread in threads:
+                thread.join()
+            decoder.stdout.close()
+            decoder.wait()
+            encoder.wait()
+
+        if errors:
+            raise errors[0]
+        if encoder.returncode != 0:
+            raise subprocess.CalledProcessError(encoder.returncode, "ffmpeg")
+        if os.path.exists(outfile):
+            count("bytes_written", os.path.getsize(outfile))
+        return outfile
+
+    def _decode_command(self, face: str) -> list:
+        return [
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-i", face,
+            "-map", "0:v:0", "-vsync", "passthrough",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1",
+        ]
+
+    def _encode_command(self, audio_file: str, outfile: str, width: int, height: int, frame_rate: Fraction) -> list:
+        cmd = [
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(frame_rate),
+            "-i", "pipe:0",
+        ]
+        if self.mux_audio:
+            cmd += ["-i", audio_file]
+        cmd += ["-map", "0:v:0"]
+        if self.mux_audio:
+            cmd += ["-map", "1:a:0"]
+        if self.subtitles_path is not None:
+            cmd += ["-vf", f"subtitles=filename='{escape_filter_path(self.subtitles_path)}':charenc=UTF-8"]
+        cmd += (self.encoder or EncoderSettings()).ffmpeg_args()
+        if self.mux_audio:
+            cmd += ["-c:a", "aac", "-b:a", "192k"]
+        return cmd + [outfile]
+
+    def _read_windows(self, decoder: subprocess.Popen, width: int, height: int, put, killed: threading.Event):
+        """
+        Decoder thread: read raw frames from the ffmpeg pipe and pass them on
+        `window_frames` at a time.
+        """
+        frame_bytes = width * height * 3
+        with span("subprocess", step="lipsync_decode", program="ffmpeg"):
+            window = []
+            while True:
+                data = decoder.stdout.read(frame_bytes)
+                if len(data) < frame_bytes:
+                    break
+                window.append(np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3).copy())
+                if len(window) == self.window_frames:
+                    put(window)
+                    window = []
+            if window:
+                put(window)
+            put(_END)
+            if decoder.wait() != 0 and not killed.is_set():
+                raise subprocess.CalledProcessError(decoder.returncode, "ffmpeg")
+
+    def _write_frames(self, encoder: subprocess.Popen, get):
+        """
+        Encoder thread: pipe finished frames into ffmpeg until the end marker.
+        """
+        with span("subprocess", step="lipsync_encode", program="ffmpeg"):
+            try:
+                while True:
+                    frame = get()
+                    if frame is _END:
+                        break
+                    encoder.stdin.write(np.ascontiguousarray(frame).tobytes())
+            finally:
+                encoder.stdin.close()
+
+    @staticmethod
+    def _iter_windows(get):
+        while True:
+            window = get()
+            if window is _END:
+                return
+            yield window
+
+    def _iter_face_crops(self, windows):
+        """
+        Yield (frame, (y1, y2, x1, x2)) for every frame, with the detected face
+        boxes padded and smoothed as by `LipSync.process_face_boxes`: each box
+        is the mean of its own and the next four, so a frame is held back
+        until the four after it have been detected.
+        """
+        pady1, pady2, padx1, padx2 = self.pads
+        lookahead = 0 if self.nosmooth else 4
+        frames, boxes = deque(), deque()
+        total, cached = 0, 0
+
+        def crop():
+            window = list(boxes)[:lookahead + 1]
+            x1, y1, x2, y2 = np.mean(window, axis=0) if len(window) > 1 else window[0]
+            boxes.popleft()
+            return frames.popleft(), (int(y1), int(y2), int(x1), int(x2))
+
+        for window in windows:
+            img_h, img_w = window[0].shape[:2]
+            window_boxes, window_cached = self._find_faces(window, show_progress=False)
+            total += len(window)
+            cached += window_cached
+            for rect in window_boxes:
+                if rect is None:
+                    raise ValueError('Face not detected! Ensure all frames contain a face.')
+                boxes.append([
+                    max(0, rect[0] - padx1),
+                    max(0, rect[1] - pady1),
+                    min(img_w, rect[2] + padx2),
+                    min(img_h, rect[3] + pady2),
+                ])
+            frames.extend(window)
+            while len(frames) > lookahead:
+                yield crop()
+        while frames:
+            yield crop()
+        if self.face_cache is not None:
+            print(f"Face detection: {cached}/{total} frames from cache.")
+
+    def _perform_streaming_inference(self, model, windows, mel_chunks, sink: _FrameSink):
+        """
+        Pair each frame with its mel chunk, run Wav2Lip on batches of mouth
+        crops and write the results to `sink`.
+
+        One frame is produced per mel chunk, repeating the last frame if the
+        video ends first; with `match_frames`, one per video frame instead,
+        repeating the last mel chunk if the audio ends first.
+        """
+        torch = lazy_import("torch")
+        batch_size = max(1, min(self.wav2lip_batch_size, self.window_frames))
+        steps = tqdm(total=None if self.match_frames else len(mel_chunks), desc="Lip-sync Inference", unit="frame")
+        img_batch, mel_batch, frame_batch, coords_batch = [], [], [], []
+
+        def add(frame, coords, mel):
+            y1, y2, x1, x2 = coords
+            img_batch.append(cv2.resize(frame[y1:y2, x1:x2], (self.img_size, self.img_size)))
+            mel_batch.append(mel)
+            frame_batch.append(frame)
+            coords_batch.append(coords)
+            if len(img_batch) >= batch_size:
+                flush()
+
+        def flush():
+            img_np, mel_np, frames, coords = self._prepare_batch(img_batch, mel_batch, frame_batch, coords_batch)
+            img_t = torch.FloatTensor(np.transpose(img_np, (0, 3, 1, 2))).to(self.device)
+            mel_t = torch.FloatTensor(np.transpose(mel_np, (0, 3, 1, 2))).to(self.device)
+            with torch.no_grad():
+                pred = model(mel_t, img_t)
+            self._write_predicted_frames(pred, frames, coords, sink)
+            steps.update(len(frames))
+            img_batch.clear()
+            mel_batch.clear()
+            frame_batch.clear()
+            coords_batch.clear()
+
+        produced = 0
+        last = None
+        for frame, coords in self._iter_face_crops(windows):
+            if not self.match_frames and produced >= len(mel_chunks):
+                break
+            add(frame, coords, mel_chunks[min(produced, len(mel_chunks) - 1)])
+            last = (frame, coords)
+            produced += 1
+        if last is None:
+            raise ValueError("The video contains no frames.")
+        if not self.match_frames:
+            for i in range(produced, len(mel_chunks)):
+                add(last[0].copy(), last[1], mel_chunks[i])
+        if img_batch:
+            flush()
+        steps.close()
@@ -0,0 +1,167 @@
+import io
+import sys
+import json
+import time
+import difflib
+import argparse
+import numpy as np
+from typing import List
+
+from .translate.translate import read_srt
+from .translate.backends.helsinki import HelsinkiTranslator
+from .tts.tts import TextToSpeech, derive_seed
+from .utils.inference import PRECISIONS, InferenceSettings
+from .utils.startup import lazy_import
+
+def module_bytes(module) -> int:
+    """
+    Size of a network's serialized state dict. Unlike counting parameters,
+    this includes the packed weights of quantized layers.
+    """
+    buffer = io.BytesIO()
+    lazy_import("torch").save(module.state_dict(), buffer)
+    return buffer.tell()
+
+def text_similarity(a: str, b: str) -> float:
+    """
+    Character-level similarity of two strings, from 0 (disjoint) to 1 (equal).
+    """
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+def spectral_similarity(a: np.ndarray, b: np.ndarray, frame: int = 1024) -> float:
+    """
+    Cosine similarity of the average log-magnitude spectra of two waveforms.
+
+    Sampling makes the waveforms of two precisions differ even for the same
+    text, so only their overall spectral envelope (voice, loudness) is compared.
+    """
+    def envelope(samples):
+        samples = samples.astype(np.float32) / 32768
+        frames = len(samples) // frame
+        if frames == 0:
+            samples = np.pad(samples, (0, frame - len(samples)))
+            frames = 1
+        spectra = np.abs(np.fft.rfft(samples[:frames * frame].reshape(frames, frame) * np.hanning(frame), axis=1))
+        return np.log1p(spectra).mean(axis=0)
+
+    ea, eb = envelope(a), envelope(b)
+    return float(np.dot(ea, eb) / (np.linalg.norm(ea) * np.linalg.norm(eb) or 1.0))
+
+def check_translation(texts: List[str], device: str, candidate: InferenceSettings, batch_size: int = 32) -> dict:
+    """
+    Translate `texts` with fp32 and `candidate` settings and compare the results.
+    """
+    results = {}
+    for name, settings in (("fp32", InferenceSettings(threads=candidate.threads, interop_threads=candidate.interop_threads)), (candidate.precision, candidate)):
+        start = time.perf_counter()
+        translator = HelsinkiTranslator(device=device, inference=settings)
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        translations = translator.translate_batch(texts, batch_size)
+        results[name] = {
+            "precision": settings.resolve(device),
+            "load_seconds": round(load_seconds, 3),
+            "translate_seconds": round(time.perf_counter() - start, 3),
+            "model_bytes": module_bytes(translator.translator.model),
+            "translations": translations,
+        }
+
+    reference, output = results["fp32"]["translations"], results[candidate.precision]["translations"]
+    similarities = [text_similarity(a, b) for a, b in zip(reference, output)]
+    return {
+        "cues": len(texts),
+        "exact_match_rate": round(sum(a == b for a, b in zip(reference, output)) / max(len(texts), 1), 4),
+        "mean_similarity": round(float(np.mean(similarities)) if similarities else 1.0, 4),
+        "min_similarity": round(min(similarities, default=1.0), 4),
+        "speedup": round(results["fp32"]["translate_seconds"] / max(results[candidate.precision]["translate_seconds"], 1e-9), 3),
+        "memory_ratio": round(results[candidate.precision]["model_bytes"] / max(results["fp32"]["model_bytes"], 1), 3),
+        "runs": results,
+        "differences": [
+            {"cue": i, "fp32": a, candidate.precision: b, "similarity": round(s, 4)}
+            for i, (a, b, s) in enumerate(zip(reference, output, similarities)) if a != b
+        ],
+    }
+
+def check_tts(texts: List[str], voice: str, device: str, candidate: InferenceSettings, seed: int = 0) -> dict:
+    """
+    Synthesize `texts` in the voice of `voice` with fp32 and `candidate`
+    settings and compare durations and spectral envelopes.
+    """
+    results = {}
+    for name, settings in (("fp32", InferenceSettings(threads=candidate.threads, interop_threads=candidate.interop_threads)), (candidate.precision, candidate)):
+        start = time.perf_counter()
+        tts = TextToSpeech(device=device, inference=settings)
+        load_seconds = time.perf_counter() - start
+        tts.set_voice(voice)
+
+        start = time.perf_counter()
+        samples = [tts.synthesize(text, "de", 1.0, derive_seed(seed, text, 0)) for text in texts]
+        results[name] = {
+            "precision": settings.resolve(device),
+            "load_seconds": round(load_seconds, 3),
+            "synthesize_seconds": round(time.perf_counter() - start, 3),
+            "audio_seconds": round(sum(len(s) for s in samples) / tts.sample_rate, 3),
+            "model_bytes": module_bytes(tts.tts.synthesizer.tts_model),
+            "samples": samples,
+        }
+
+    reference, output = results["fp32"].pop("samples"), results[candidate.precision].pop("samples")
+    duration_ratios = [len(b) / max(len(a), 1) for a, b in zip(reference, output)]
+    similarities = [spectral_similarity(a, b) for a, b in zip(reference, output)]
+    return {
+        "cues": len(texts),
+        "mean_duration_ratio": round(float(np.mean(duration_ratios)) if duration_ratios else 1.0, 4),
+        "mean_spectral_similarity": round(float(np.mean(similarities)) if similarities else 1.0, 4),
+        "speedup": round(results["fp32"]["synthesize_seconds"] / max(results[candidate.precision]["synthesize_seconds"], 1e-9), 3),
+        "memory_ratio": round(results[candidate.precision]["model_bytes"] / max(results["fp32"]["model_bytes"], 1), 3),
+        "runs": results,
+    }
+
+def main(argv=None):
+    """
+    Compare a reduced inference precision against fp32 on a sample transcript:
+
+        python -m src.precision_check sample.srt --precision int8 --voice speaker.wav
+    """
+    parser = argparse.ArgumentParser(description="Compare translation and TTS outputs of a reduced precision against fp32.")
+    parser.add_argument("srt", help="Sample English SRT transcript")
+    parser.add_argument("--precision", default="int8", choices=[p for p in PRECISIONS if p != "fp32"], help="Precision to check")
+    parser.add_argument("--device", default="cpu", help="Model device")
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0: torch default)")
+    parser.add_argument("--cues", type=int, default=50, help="Cues of the transcript to translate")
+    parser.add_argument("--voice", default=None, help="Reference WAV of the speaker; enables the TTS check")
+    parser.add_argument("--tts-cues", type=int, default=5, help="Cues to synthesize for the TTS check")
+    parser.add_argument("--output", default=None, help="Write the full report as JSON")
+    parser.add_argument("--min-similarity", type=float, default=0.9, help="Fail below this mean translation similarity")
+    args = parser.parse_args(argv)
+
+    candidate = InferenceSettings(args.precision, threads=args.threads)
+    texts = [sub.content for sub in read_srt(args.srt)[:args.cues]]
+
+    report = {"precision": args.precision, "device": args.device, "translation": check_translation(texts, args.device, candidate)}
+    translation = report["translation"]
+    print(f"Translation ({translation['cues']} cues, {args.precision} vs fp32): "
+          f"{translation['exact_match_rate']:.0%} identical, mean similarity {translation['mean_similarity']:.3f}, "
+          f"{translation['speedup']:.2f}x speed, {translation['memory_ratio']:.2f}x model size")
+    for difference in translation["differences"][:5]:
+        print(f"  cue {difference['cue'] + 1}: {difference['fp32']!r} -> {difference[args.precision]!r}")
+
+    if args.voice:
+        # Both precisions speak the fp32 translations, so only TTS differs
+        tts_texts = translation["runs"]["fp32"]["translations"][:args.tts_cues]
+        report["tts"] = check_tts(tts_texts, args.voice, args.device, candidate)
+        tts = report["tts"]
+        print(f"TTS ({tts['cues']} cues, {args.precision} vs fp32): duration ratio {tts['mean_duration_ratio']:.3f}, "
+              f"spectral similarity {tts['mean_spectral_similarity']:.3f}, "
+              f"{tts['speedup']:.2f}x speed, {tts['memory_ratio']:.2f}x model size")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Report written to {args.output}.")
+
+    return 0 if translation["mean_similarity"] >= args.min_similarity else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
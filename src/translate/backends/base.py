@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List
 
 class Translator(ABC):
     """
@@ -10,4 +11,13 @@ class Translator(ABC):
         """
         Translate input text and return translated text.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def translate_batch(self, texts: List[str], batch_size: int = 32) -> List[str]:
+        """
+        Translate a list of texts and return the translations in the same order.
+
+        Backends that can run several inputs per forward pass should override
+        this; the default simply translates one text at a time.
+        """
+        return [self.translate(text) for text in texts]
@@ -1,13 +1,78 @@
-from transformers import pipeline
+from typing import List
+from tqdm import tqdm
 from .base import Translator
+from ...utils.model_registry import model_registry
+from ...utils.startup import lazy_import
+from ...utils.inference import InferenceSettings
 
 class HelsinkiTranslator(Translator):
     """
     Pre-trained Helsinki-NLP translation model wrapper. Uses Hugging Face transformers pipeline.
     CPU/GPU compatible, but runs efficiently on CPU for more lightweight environments.
+    The underlying pipeline is shared process-wide through the model registry.
+
+    With `inference` settings, the network can be quantized to int8 or run in
+    bf16; each precision is a separate registry entry, and `model_name` (used
+    in translation cache keys) carries the precision, e.g.
+    "Helsinki-NLP/opus-mt-en-de@int8".
+
+    Multi-target models (e.g. opus-mt-en-ar) need a `target_token` such as
+    ">>ara<<" in front of every input to select the output language; it is
+    part of `model_name` as well, e.g. "Helsinki-NLP/opus-mt-en-ar>>ara<<".
     """
-    def __init__(self, model_name: str = "Helsinki-NLP/opus-mt-en-de", device="cpu"):
-        self.translator = pipeline("translation", model=model_name, device=device)
+    def __init__(
+        self,
+        model_name: str = "Helsinki-NLP/opus-mt-en-de",
+        device="cpu",
+        inference: InferenceSettings = None,
+        target_token: str = None,
+    ):
+        self.device = device
+        self.inference = inference or InferenceSettings()
+        self.target_token = target_token
+        variant = self.inference.variant(device)
+        self.model_name = model_name + variant + (target_token or "")
+        self.translator = model_registry.get(
+            model_name, str(device), variant or None,
+            lambda: self._load(model_name, device),
+        )
+
+    def _load(self, model_name: str, device):
+        translator = lazy_import("transformers").pipeline("translation", model=model_name, device=device)
+        self.inference.prepare(translator.model, device)
+        return translator
+
+    def _source(self, text: str) -> str:
+        return f"{self.target_token} {text}" if self.target_token else text
 
     def translate(self, text: str) -> str:
-        return self.translator(text, max_length=512)[0]['translation_text']
\ No newline at end of file
+        with self.inference.context(self.device):
+            return self.translator(self._source(text), max_length=512)[0]['translation_text']
+
+    def translate_batch(self, texts: List[str], batch_size: int = 32) -> List[str]:
+        """
+        Translate texts in batches through the pipeline.
+
+        Inputs are sorted by token length so each batch pads to a similar length,
+        then the translations are restored to the original order.
+        """
+        if not texts:
+            return []
+        texts = [self._source(text) for text in texts]
+
+        lengths = [len(ids) for ids in self.translator.tokenizer(texts)["input_ids"]]
+        order = sorted(range(len(texts)), key=lambda i: lengths[i])
+
+        translations = [None] * len(texts)
+        for start in tqdm(range(0, len(order), batch_size), desc="Translating subtitle batches"):
+            batch_idx = order[start:start + batch_size]
+            with self.inference.context(self.device):
+                outputs = self.translator(
+                    [texts[i] for i in batch_idx],
+                    max_length=512,
+                    batch_size=len(batch_idx),
+                )
+            for i, output in zip(batch_idx, outputs):
+                translations[i] = output['translation_text']
+
+        return translations
@@ -0,0 +1,171 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Iterable, Tuple
+
+from ..utils.tracing import count
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize subtitle text for cache lookups by collapsing whitespace.
+
+    Case and punctuation are kept, since both change the translation.
+    """
+    return re.sub(r"\s+", " ", text).strip()
+
+class TranslationCache:
+    """
+    Persistent, content-addressed cache of translated subtitle lines.
+
+    Entries live in a single SQLite file and are keyed by a hash of the model
+    name and the normalized source text, so repeated lines (intros, outros,
+    sponsor reads) are translated once across jobs and processes. Lookups and
+    writes are batched, and the least recently used entries are evicted once
+    the cache grows past `max_entries`.
+    """
+
+    def __init__(self, path: str = "cache/translations.sqlite", max_entries: int = 200_000):
+        """
+        Open (or create) a translation cache.
+
+        Args:
+            path (str, optional): Path to the SQLite file. Defaults to
+                "cache/translations.sqlite".
+            max_entries (int, optional): Maximum number of cached translations
+                before LRU eviction. Defaults to 200,000.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS translations (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON translations(last_used)")
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        """
+        Content hash identifying a (model, normalized source text) pair.
+        """
+        return hashlib.sha256(f"{model_name}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def get_many(self, model_name: str, texts: Iterable[str]) -> Dict[str, str]:
+        """
+        Look up several source texts at once.
+
+        Args:
+            model_name (str): Name of the translation model.
+            texts (Iterable[str]): Source texts (normalized internally).
+
+        Returns:
+            Dict[str, str]: Maps each source text that was found to its translation.
+        """
+        keys = {}
+        for text in texts:
+            keys.setdefault(self.make_key(model_name, text), []).append(text)
+        if not keys:
+            return {}
+
+        found = {}
+        key_list = list(keys)
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, translation FROM translations WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, translation in rows:
+                    found[key] = translation
+
+            if found:
+                now = time.time()
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE translations SET last_used = ? WHERE key = ?",
+                        [(now, key) for key in found],
+                    )
+
+            hit_texts = sum(len(keys[key]) for key in found)
+            self.hits += hit_texts
+            self.misses += sum(len(group) for group in keys.values()) - hit_texts
+        count("translation_cache_hits", hit_texts)
+        count("translation_cache_misses", sum(len(group) for group in keys.values()) - hit_texts)
+
+        return {text: found[key] for key in found for text in keys[key]}
+
+    def put_many(self, model_name: str, pairs: Iterable[Tuple[str, str]]):
+        """
+        Store several (source text, translation) pairs in one transaction.
+
+        Args:
+            model_name (str): Name of the translation model.
+            pairs (Iterable[Tuple[str, str]]): Source texts and their translations.
+        """
+        now = time.time()
+        rows = [
+            (self.make_key(model_name, source), model_name, normalize_text(source), translation, now)
+            for source, translation in pairs
+        ]
+        if not rows:
+            return
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (key, model, source, translation, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+
+    def _evict(self):
+        """
+        Delete the least recently used entries beyond `max_entries`. Caller holds the lock.
+        """
+        count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM translations WHERE key IN "
+                "(SELECT key FROM translations ORDER BY last_used ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters for this cache object and the number of stored entries.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def close(self):
+        """
+        Close the underlying SQLite connection.
+        """
+        self._conn.close()
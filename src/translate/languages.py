@@ -0,0 +1,65 @@
+from typing import Callable, Dict, Optional
+
+from .backends.base import Translator
+from .backends.helsinki import HelsinkiTranslator
+from ..utils.inference import InferenceSettings
+
+# Target languages by XTTS language code: (ISO 639-2 code for stream
+# metadata, Helsinki-NLP model from English or None if no default backend is
+# verified, target language token that multi-target models expect before
+# every input, or None)
+LANGUAGES = {
+    "de": ("deu", "Helsinki-NLP/opus-mt-en-de", None),
+    "fr": ("fra", "Helsinki-NLP/opus-mt-en-fr", None),
+    "es": ("spa", "Helsinki-NLP/opus-mt-en-es", None),
+    "it": ("ita", "Helsinki-NLP/opus-mt-en-it", None),
+    "nl": ("nld", "Helsinki-NLP/opus-mt-en-nl", None),
+    "ru": ("rus", "Helsinki-NLP/opus-mt-en-ru", None),
+    "cs": ("ces", "Helsinki-NLP/opus-mt-en-cs", None),
+    "ar": ("ara", "Helsinki-NLP/opus-mt-en-ar", ">>ara<<"),
+    "hu": ("hun", "Helsinki-NLP/opus-mt-en-hu", None),
+    "hi": ("hin", "Helsinki-NLP/opus-mt-en-hi", None),
+    "zh-cn": ("zho", "Helsinki-NLP/opus-mt-en-zh", ">>cmn_Hans<<"),
+    # opus-mt-en-jap is trained on Bible text only; register a backend to use Japanese
+    "ja": ("jpn", None, None),
+}
+
+# Backends registered for a language, replacing the Helsinki default
+_backends: Dict[str, Callable[[str, Optional[InferenceSettings]], Translator]] = {}
+
+def register_translator(language: str, factory: Callable[[str, Optional[InferenceSettings]], Translator]):
+    """
+    Use another translation backend for a target language, e.g. one for a
+    language without a Helsinki-NLP model, or a larger model.
+
+    Args:
+        language (str): XTTS language code (e.g. "pt").
+        factory (Callable): Called as `factory(device, inference)` and returns
+            a `Translator` from English to `language`.
+    """
+    _backends[language] = factory
+
+def translator_for(language: str, device: str = "cpu", inference: Optional[InferenceSettings] = None) -> Translator:
+    """
+    The backend translating English to `language`: the registered one, if
+    any, otherwise the language's Helsinki-NLP model.
+
+    Raises:
+        ValueError: If the language has no backend.
+    """
+    if language in _backends:
+        return _backends[language](device, inference)
+    if language not in LANGUAGES or LANGUAGES[language][1] is None:
+        supported = {code for code, (_, model, _) in LANGUAGES.items() if model is not None} | set(_backends)
+        raise ValueError(
+            f"No translation backend for {language!r}. Supported: {', '.join(sorted(supported))}; "
+            "others can be added with register_translator()."
+        )
+    _, model_name, target_token = LANGUAGES[language]
+    return HelsinkiTranslator(model_name, device, inference, target_token=target_token)
+
+def iso639_2(language: str) -> str:
+    """
+    Three-letter code of a language for MP4 stream metadata ("und" if unknown).
+    """
+    return LANGUAGES[language][0] if language in LANGUAGES else "und"
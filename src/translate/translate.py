@@ -1,9 +1,25 @@
 import srt
 from pathlib import Path
-from typing import List
-from tqdm import tqdm
+from typing import Iterator, List, Optional
 
-from .backends.helsinki import HelsinkiTranslator
+from .backends.base import Translator
+from .cache import TranslationCache, normalize_text
+from .languages import translator_for
+from ..utils.inference import InferenceSettings
+
+def read_srt(input_srt: str) -> List[srt.Subtitle]:
+    """
+    Parse an SRT file into a list of `srt.Subtitle` objects.
+
+    Raises:
+        FileNotFoundError: If the provided SRT file path does not exist.
+    """
+    srt_path = Path(input_srt)
+    if not srt_path.exists():
+        raise FileNotFoundError(f"SRT file not found: {srt_path}")
+
+    with open(srt_path, "r", encoding="utf-8") as f:
+        return list(srt.parse(f.read()))
 
 class TranscriptTranslator:
     """
@@ -12,21 +28,75 @@ class TranscriptTranslator:
 
     Supported backends:
         - "helsinki": Uses the Hugging Face Helsinki-NLP translation models.
+        - Any backend registered for the target language with
+          `languages.register_translator`.
     """
 
-    def __init__(self, device="cpu"):
+    def __init__(
+        self,
+        device="cpu",
+        cache: Optional[TranslationCache] = None,
+        translator: Optional[Translator] = None,
+        inference: Optional[InferenceSettings] = None,
+        language: str = "de",
+    ):
         """
         Initialize a TranscriptTranslator on a specified device
+
+        Args:
+            device (str, optional): Device for the backend model. Defaults to "cpu".
+            cache (TranslationCache, optional): Persistent cache checked before
+                calling the backend. If not provided, every cue is translated.
+            translator (Translator, optional): Backend to use instead of the
+                default one for `language` (e.g. a stub in benchmarks).
+            inference (InferenceSettings, optional): Precision and threads of
+                the Helsinki model. Defaults to fp32.
+            language (str, optional): XTTS code of the target language, which
+                selects the default backend (see `languages.translator_for`).
+                Defaults to "de".
         """
-        self.translator = HelsinkiTranslator("Helsinki-NLP/opus-mt-en-de", device)
+        self.language = language
+        self.translator = translator or translator_for(language, device, inference)
+        self.cache = cache
 
-    def translate_srt(self, input_srt: str) -> List[srt.Subtitle]:
+    def translate_texts(self, texts: List[str], batch_size: int = 32) -> List[str]:
         """
-        Translate the contents of an SRT subtitle file from English into German
+        Translate a list of texts, consulting the cache first.
+
+        Identical lines (after whitespace normalization) are sent to the backend
+        only once, and new translations are written back to the cache.
+
+        Args:
+            texts (List[str]): Source texts.
+            batch_size (int, optional): Number of texts translated per model call.
+
+        Returns:
+            List[str]: Translations in the same order as `texts`.
+        """
+        model_name = getattr(self.translator, "model_name", type(self.translator).__name__)
+        cached = self.cache.get_many(model_name, texts) if self.cache else {}
+
+        # Translate each distinct missing line once
+        pending = {}
+        for text in texts:
+            if text not in cached:
+                pending.setdefault(normalize_text(text), text)
+
+        translated = dict(zip(pending, self.translator.translate_batch(list(pending.values()), batch_size)))
+        if self.cache:
+            self.cache.put_many(model_name, translated.items())
+
+        return [cached[text] if text in cached else translated[normalize_text(text)] for text in texts]
+
+    def translate_srt(self, input_srt: str, batch_size: int = 32) -> List[srt.Subtitle]:
+        """
+        Translate the contents of an SRT subtitle file from English into the target language
         while preserving original subtitle timings.
 
         Args:
             input_srt (str): Path to the input SRT file containing English subtitles.
+            batch_size (int, optional): Number of cues translated per model call.
+                Defaults to 32.
 
         Returns:
             List[srt.Subtitle]: A list of `srt.Subtitle` objects with translated text
@@ -35,17 +105,55 @@ class TranscriptTranslator:
         Raises:
             FileNotFoundError: If the provided SRT file path does not exist.
         """
-        srt_path = Path(input_srt)
-        if not srt_path.exists():
-            raise FileNotFoundError(f"SRT file not found: {srt_path}")
-
-        # Parse the SRT file
-        with open(srt_path, "r", encoding="utf-8") as f:
-            subtitles = list(srt.parse(f.read()))
+        subtitles = read_srt(input_srt)
 
-        # Translate subtitle content line by line
-        for sub in tqdm(subtitles, desc="Translating subtitles"):
-            de_content = self.translator.translate(sub.content)
+        # Translate subtitle content in batches, skipping cached lines
+        de_contents = self.translate_texts([sub.content for sub in subtitles], batch_size)
+        for sub, de_content in zip(subtitles, de_contents):
             sub.content = de_content
 
+        self._report_cache()
         return subtitles
+
+    def iter_translate_srt(self, input_srt: str, batch_size: int = 32, read_ahead: int = 4) -> Iterator[srt.Subtitle]:
+        """
+        Translate an SRT file like `translate_srt`, but yield each subtitle as
+        soon as its window is translated, so downstream stages (e.g. TTS) can
+        start before the whole transcript is done.
+
+        Cues are translated in windows of `read_ahead` batches, which the
+        backend sorts by length so each batch pads to similar lengths, as
+        `translate_srt` does for the whole file. The first window is a single
+        batch, so the first subtitles are ready as early as possible.
+
+        Args:
+            input_srt (str): Path to the input SRT file containing English subtitles.
+            batch_size (int, optional): Number of cues translated per model call.
+                Defaults to 32.
+            read_ahead (int, optional): Batches per window after the first.
+                Defaults to 4.
+
+        Yields:
+            srt.Subtitle: Translated subtitles in their original order.
+
+        Raises:
+            FileNotFoundError: If the provided SRT file path does not exist.
+        """
+        subtitles = read_srt(input_srt)
+
+        start, window = 0, batch_size
+        while start < len(subtitles):
+            cues = subtitles[start:start + window]
+            for sub, de_content in zip(cues, self.translate_texts([sub.content for sub in cues], batch_size)):
+                sub.content = de_content
+                yield sub
+            start += window
+            window = batch_size * max(1, read_ahead)
+
+        self._report_cache()
+
+    def _report_cache(self):
+        if self.cache:
+            stats = self.cache.stats()
+            print(f"Translation cache: {stats['hits']} hits, {stats['misses']} misses "
+                  f"({stats['hit_rate']:.0%} hit rate, {stats['entries']} entries).")
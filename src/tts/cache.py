@@ -0,0 +1,176 @@
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from ..utils.startup import lazy_import
+from ..utils.tracing import count
+
+if TYPE_CHECKING:
+    import torch
+
+class SpeechCache:
+    """
+    On-disk cache of synthesized speech segments.
+
+    Each segment is stored as a mono int16 `.npy` file named by a hash of
+    everything that determines the synthesis output (model, text, speaker
+    fingerprint, language, speed and seed). File modification times track
+    recency, and the least recently used segments are deleted once the
+    directory grows past `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str = "cache/speech", max_bytes: int = 2 * 1024**3):
+        """
+        Open (or create) a speech cache directory.
+
+        Args:
+            cache_dir (str, optional): Directory holding the cached segments.
+                Defaults to "cache/speech".
+            max_bytes (int, optional): Size bound for the directory. Defaults to 2 GB.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._entries())
+
+    @staticmethod
+    def make_key(model_name: str, text: str, speaker: str, language: str, speed: float, seed: int) -> str:
+        """
+        Hash identifying one synthesis call.
+        """
+        payload = json.dumps([model_name, text, speaker, language, round(speed, 4), seed])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Return the cached int16 samples for `key`, or None on a miss.
+        """
+        path = self._path(key)
+        try:
+            samples = np.load(path)
+            os.utime(path)  # mark as recently used
+        except (FileNotFoundError, ValueError, OSError):
+            with self._lock:
+                self.misses += 1
+            count("speech_cache_misses")
+            return None
+
+        with self._lock:
+            self.hits += 1
+        count("speech_cache_hits")
+        return samples
+
+    def put(self, key: str, samples: np.ndarray):
+        """
+        Store int16 samples under `key` and evict old segments if over budget.
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, samples.astype(np.int16, copy=False))
+        os.replace(tmp_path, path)  # atomic, so concurrent readers never see partial files
+
+        with self._lock:
+            self._size += os.path.getsize(path)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> list:
+        """
+        (mtime, size, filename) for every cached segment.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".npy"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def _evict(self):
+        """
+        Delete least recently used segments until the directory fits `max_bytes`.
+        Caller holds the lock.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters for this cache object.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+class SpeakerCache:
+    """
+    On-disk store of XTTS speaker conditioning.
+
+    The GPT conditioning latents and speaker embedding extracted from a
+    reference clip are saved under a hash of that clip, so the same speaker
+    is conditioned once and reused across jobs and processes.
+    """
+
+    def __init__(self, cache_dir: str = "cache/speakers"):
+        """
+        Open (or create) a speaker cache directory.
+
+        Args:
+            cache_dir (str, optional): Directory holding the saved conditioning.
+                Defaults to "cache/speakers".
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pt")
+
+    def get(self, key: str) -> Optional[Tuple["torch.Tensor", "torch.Tensor"]]:
+        """
+        Return (gpt_cond_latent, speaker_embedding) for `key`, or None on a miss.
+        """
+        try:
+            saved = lazy_import("torch").load(self._path(key), map_location="cpu")
+        except (FileNotFoundError, RuntimeError, EOFError):
+            return None
+        return saved["gpt_cond_latent"], saved["speaker_embedding"]
+
+    def put(self, key: str, gpt_cond_latent: "torch.Tensor", speaker_embedding: "torch.Tensor"):
+        """
+        Save conditioning tensors under `key`.
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        lazy_import("torch").save(
+            {
+                "gpt_cond_latent": gpt_cond_latent.detach().cpu(),
+                "speaker_embedding": speaker_embedding.detach().cpu(),
+            },
+            tmp_path,
+        )
+        os.replace(tmp_path, path)
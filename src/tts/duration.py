@@ -0,0 +1,138 @@
+import re
+import math
+from typing import List, Tuple
+
+# Vowel groups are a cheap, language-agnostic stand-in for syllables
+_VOWEL_GROUPS = re.compile(r"[aeiouyäöüáàâéèêíìîóòôúùûæøå]+", re.IGNORECASE)
+
+def count_syllables(text: str) -> int:
+    """
+    Approximate the number of syllables in a text by counting vowel groups.
+    """
+    return max(1, len(_VOWEL_GROUPS.findall(text)))
+
+class FixedStepSpeed:
+    """
+    Original retry schedule: start at the base speed, then jump to 1.25 and
+    increase by 0.025 on every further attempt.
+    """
+
+    def __init__(self, speed: float = 1.0):
+        self.speed = speed
+
+    def initial_speed(self, text: str, target_ms: float) -> float:
+        return self.speed
+
+    def next_speed(self, text: str, target_ms: float, attempts: List[Tuple[float, float]]) -> float:
+        return max(1.25, attempts[-1][0] + 0.025)
+
+    def observe(self, text: str, speed: float, duration_ms: float):
+        pass
+
+class PredictiveSpeed:
+    """
+    Choose XTTS speeds from a speaking-rate model fitted online.
+
+    Speech duration is modelled as `syllables / (rate * speed)`, where `rate`
+    (syllables per second at speed 1.0) is a least-squares fit over every
+    attempt synthesized so far in the job, starting from a prior. The first
+    attempt for a cue uses the speed predicted to fit its subtitle slot. When an
+    attempt is still too long, the next speed is interpolated from the
+    attempts already made for that cue instead of stepping by a fixed amount.
+
+    Attempts far longer than predicted are treated as hallucinations: they are
+    left out of the fit and retried once at the same speed with a fresh seed.
+
+    Speeds are rounded up to a 0.025 grid, so small changes in the fitted rate
+    map to the same speeds and keep cached segments reusable.
+    """
+
+    def __init__(
+        self,
+        speed: float = 1.0,
+        max_speed: float = 1.6,
+        prior_rate: float = 4.5,
+        prior_weight: float = 5.0,
+        margin: float = 0.03,
+        hallucination_ratio: float = 1.6,
+    ):
+        """
+        Initialize the predictor.
+
+        Args:
+            speed (float, optional): Slowest speed ever used. Defaults to 1.0.
+            max_speed (float, optional): Fastest speed ever used. Defaults to 1.6.
+            prior_rate (float, optional): Syllables per second assumed before any
+                observation. Defaults to 4.5.
+            prior_weight (float, optional): Weight of the prior in seconds of
+                speech. Defaults to 5.0.
+            margin (float, optional): Fraction by which to aim under the target
+                duration. Defaults to 0.03.
+            hallucination_ratio (float, optional): Observed/predicted duration
+                above which an attempt is considered a hallucination. Defaults to 1.6.
+        """
+        self.speed = speed
+        self.max_speed = max_speed
+        self.margin = margin
+        self.hallucination_ratio = hallucination_ratio
+        # Least-squares accumulators for syllables ≈ rate * (duration * speed)
+        self._sxy = prior_rate * prior_weight ** 2
+        self._sxx = prior_weight ** 2
+
+    @property
+    def rate(self) -> float:
+        """
+        Current estimate of syllables per second at speed 1.0.
+        """
+        return self._sxy / self._sxx
+
+    def predict_ms(self, text: str, speed: float) -> float:
+        """
+        Predicted duration in ms of `text` spoken at `speed`.
+        """
+        return 1000 * count_syllables(text) / (self.rate * speed)
+
+    def _clamp(self, speed: float) -> float:
+        speed = math.ceil(speed * 40 - 1e-9) / 40
+        return min(self.max_speed, max(self.speed, speed))
+
+    def initial_speed(self, text: str, target_ms: float) -> float:
+        goal_ms = target_ms * (1 - self.margin)
+        return self._clamp(self.predict_ms(text, 1.0) / max(goal_ms, 1.0))
+
+    def next_speed(self, text: str, target_ms: float, attempts: List[Tuple[float, float]]) -> float:
+        goal_ms = target_ms * (1 - self.margin)
+        speed, duration_ms = attempts[-1]
+
+        # Retry a hallucinated attempt once at the same speed; the seed changes per
+        # attempt. Repeated outliers more likely mean the rate estimate is off.
+        hallucinated = [self.is_hallucination(text, s, d) for s, d in attempts]
+        if hallucinated[-1] and not (len(hallucinated) > 1 and hallucinated[-2]):
+            return speed
+
+        clean = [attempt for attempt, flagged in zip(attempts, hallucinated) if not flagged]
+        distinct = {s: d for s, d in clean}
+        if len(distinct) >= 2:
+            # Interpolate duration linearly in 1/speed through the two fastest attempts
+            (s1, d1), (s2, d2) = sorted(distinct.items())[-2:]
+            slope = (d1 - d2) / (1 / s1 - 1 / s2)
+            if slope > 0:
+                inverse = 1 / s2 + (goal_ms - d2) / slope
+                if inverse > 0:
+                    return max(self._clamp(1 / inverse), self._clamp(speed + 0.025))
+
+        # Otherwise assume duration scales with 1/speed
+        return max(self._clamp(speed * duration_ms / max(goal_ms, 1.0)), self._clamp(speed + 0.025))
+
+    def is_hallucination(self, text: str, speed: float, duration_ms: float) -> bool:
+        return duration_ms > self.hallucination_ratio * self.predict_ms(text, speed)
+
+    def observe(self, text: str, speed: float, duration_ms: float):
+        """
+        Add a synthesized attempt to the rate fit, unless it looks hallucinated.
+        """
+        if duration_ms <= 0 or self.is_hallucination(text, speed, duration_ms):
+            return
+        x = duration_ms / 1000 * speed
+        self._sxy += count_syllables(text) * x
+        self._sxx += x * x
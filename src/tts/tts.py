@@ -1,10 +1,98 @@
 import os
 import srt
+import copy
+import time
+import wave
+import hashlib
+import tempfile
 import datetime
-from pydub import AudioSegment
-from TTS.api import TTS
+import threading
+import numpy as np
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterable, Optional
 from tqdm import tqdm
 
+from .cache import SpeakerCache, SpeechCache
+from .duration import FixedStepSpeed, PredictiveSpeed
+from ..utils.model_registry import model_registry
+from ..utils.startup import lazy_import
+from ..utils.inference import InferenceSettings
+from ..utils.tracing import count, record_span, span
+
+# One lock per device: jobs sharing a device take turns, since each synthesis
+# reseeds that device's generator, while different devices run in parallel
+_device_locks = {}
+_device_locks_guard = threading.Lock()
+
+def _device_key(device: str) -> str:
+    torch = lazy_import("torch")
+    device = torch.device(device)
+    if device.type == "cuda" and device.index is None:
+        device = torch.device("cuda", torch.cuda.current_device())
+    return str(device)
+
+def device_lock(device: str) -> threading.Lock:
+    """
+    Lock held while sampling on `device` ("cuda" and "cuda:0" share one).
+    """
+    key = _device_key(device)
+    with _device_locks_guard:
+        return _device_locks.setdefault(key, threading.Lock())
+
+def seed_device(device: str, seed: int):
+    """
+    Seed only the random generator of `device`. `torch.manual_seed` would
+    also reseed every GPU, disturbing sampling running there.
+    """
+    torch = lazy_import("torch")
+    device = torch.device(_device_key(device))
+    if device.type == "cuda":
+        with torch.cuda.device(device):
+            torch.cuda.manual_seed(seed)
+    else:
+        torch.default_generator.manual_seed(seed)
+
+def derive_seed(seed: int, *parts) -> int:
+    """
+    Derive a deterministic 32-bit seed from a global seed and any extra parts
+    (e.g. cue text and attempt number).
+    """
+    payload = "\0".join(str(part) for part in (seed, *parts))
+    return int(hashlib.sha256(payload.encode("utf-8")).hexdigest()[:8], 16)
+
+def to_int16(wav) -> np.ndarray:
+    """
+    Peak-normalize a float waveform and convert it to int16 PCM, matching what
+    Coqui's `save_wav` writes to disk.
+    """
+    wav = np.asarray(wav, dtype=np.float32)
+    wav = wav * (32767 / max(0.01, float(np.max(np.abs(wav))) if wav.size else 0.01))
+    return wav.astype(np.int16)
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int):
+    """
+    Write mono int16 samples to a WAV file.
+    """
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.astype(np.int16, copy=False).tobytes())
+    count("bytes_written", os.path.getsize(path))
+
+def read_wav_clip(path: str, max_seconds: float) -> tuple:
+    """
+    Read at most the first `max_seconds` of a WAV file without loading the rest.
+
+    Returns:
+        tuple: Raw frames (bytes) and the file's WAV parameters.
+    """
+    with wave.open(path, "rb") as wav_file:
+        params = wav_file.getparams()
+        frames = wav_file.readframes(int(max_seconds * params.framerate))
+    return frames, params
+
 class TextToSpeech:
     """
     A text-to-speech (TTS) utility using Coqui XTTS for generating speech
@@ -15,53 +103,362 @@ class TextToSpeech:
     subtitle objects with adjusted timestamps.
     """
 
-    def __init__(self, model_name: str = "tts_models/multilingual/multi-dataset/xtts_v2", device: str = "cpu"):
+    def __init__(
+        self,
+        model_name: str = "tts_models/multilingual/multi-dataset/xtts_v2",
+        device: str = "cpu",
+        cache: Optional[SpeechCache] = None,
+        speaker_cache: Optional[SpeakerCache] = None,
+        inference: Optional[InferenceSettings] = None,
+    ):
         """
-        Initialize the TextToSpeech engine with a Coqui XTTS model.
+        Initialize the TextToSpeech engine with a Coqui XTTS model. The model is
+        loaded once per process and shared through the model registry.
 
         Args:
             model_name (str, optional): Name of the Coqui TTS model to load.
                 Defaults to "tts_models/multilingual/multi-dataset/xtts_v2".
             device (str, optional): The device on which to run the model
                 ("cpu" or "cuda"). If not provided, defaults to "cpu".
+            cache (SpeechCache, optional): Cache of previously synthesized segments.
+                If not provided, every segment is synthesized.
+            speaker_cache (SpeakerCache, optional): Store of speaker conditioning
+                reused across jobs. If not provided, conditioning is recomputed
+                on every `set_voice` call.
+            inference (InferenceSettings, optional): Precision and threads of the
+                XTTS model. Each precision is loaded separately and cached
+                under its own keys. Defaults to fp32.
         """
         self.device = device
-        self.tts = TTS(model_name).to(self.device)
+        self.model_name = model_name
+        self.inference = inference or InferenceSettings()
+        variant = self.inference.variant(device)
+        # Identifies the weights in cache keys, e.g. "...xtts_v2@int8"
+        self.cache_name = model_name + variant
+        self.cache = cache
+        self.speaker_cache = speaker_cache
+        self.speaker_fingerprint = None
+        self.gpt_cond_latent = None
+        self.speaker_embedding = None
+        self.attempt_log = []
+        self.tts = model_registry.get(model_name, device, variant or None, self._load)
+        self.sample_rate = self.tts.synthesizer.output_sample_rate
 
-    def set_voice(self, target_voice: str):
+    def _load(self):
+        tts = lazy_import("TTS.api").TTS(self.model_name).to(self.device)
+        self.inference.prepare(tts.synthesizer.tts_model, self.device)
+        return tts
+
+    def set_voice(self, target_voice: str, max_seconds: float = 15.0):
         """
         Set the target speaker's voice using a reference audio sample.
 
-        A short "hello world" clip is synthesized and saved to disk to
-        initialize and confirm the chosen voice.
+        XTTS speaker conditioning (GPT latents and speaker embedding) is
+        extracted from at most the first `max_seconds` of the reference clip,
+        and persisted under a hash of that clip when a speaker cache is set.
+        Later jobs with the same reference skip the extraction entirely.
 
         Args:
             target_voice (str): Path to a reference WAV file of the target speaker.
+            max_seconds (float, optional): Maximum reference length read from
+                the file. Defaults to 15 seconds.
+        """
+        frames, params = read_wav_clip(target_voice, max_seconds)
+        digest = hashlib.sha256()
+        digest.update(f"{self.cache_name}\0{params.framerate}\0{params.nchannels}\0{params.sampwidth}\0".encode("utf-8"))
+        digest.update(frames)
+        self.speaker_fingerprint = digest.hexdigest()
+
+        cached = self.speaker_cache.get(self.speaker_fingerprint) if self.speaker_cache else None
+        if cached is None:
+            # XTTS reads its reference from disk, so hand it only the bounded clip
+            fd, clip_path = tempfile.mkstemp(suffix=".wav")
+            os.close(fd)
+            try:
+                with wave.open(clip_path, "wb") as clip:
+                    clip.setparams(params)
+                    clip.writeframes(frames)
+                with self.inference.context(self.device):
+                    cached = self.tts.synthesizer.tts_model.get_conditioning_latents(audio_path=[clip_path])
+            finally:
+                os.remove(clip_path)
+
+            if self.speaker_cache:
+                self.speaker_cache.put(self.speaker_fingerprint, *cached)
+
+        gpt_cond_latent, speaker_embedding = cached
+        self.gpt_cond_latent = gpt_cond_latent.to(self.device)
+        self.speaker_embedding = speaker_embedding.to(self.device)
+
+    def fork(self) -> "TextToSpeech":
+        """
+        A TextToSpeech sharing this one's model, caches and voice, with its own
+        attempt log, so several transcripts (e.g. one per target language) can
+        be synthesized after a single `set_voice`. Forks may be used from
+        different threads, but since they share the model, their cues take
+        turns on the device lock; only worker pools (`workers` > 1) synthesize
+        cues in parallel.
+        """
+        forked = copy.copy(self)
+        forked.attempt_log = []
+        return forked
+
+    def synthesize(self, text: str, language: str, speed: float, seed: int) -> np.ndarray:
+        """
+        Synthesize one segment as int16 PCM, reusing a cached result when possible.
+
+        The generator is seeded right before inference, so the output depends
+        only on the arguments and the current voice, which is what makes the
+        result safe to cache.
+
+        Args:
+            text (str): Text to speak.
+            language (str): XTTS language code (e.g. "de").
+            speed (float): Speech speed factor.
+            seed (int): Seed for the sampling step.
+
+        Returns:
+            np.ndarray: Mono int16 samples at `self.sample_rate`.
+        """
+        if self.speaker_embedding is None:
+            raise RuntimeError("No voice set. Call set_voice() before synthesizing.")
+
+        key = None
+        if self.cache is not None:
+            key = SpeechCache.make_key(self.cache_name, text, self.speaker_fingerprint, language, speed, seed)
+            samples = self.cache.get(key)
+            if samples is not None:
+                return samples
+
+        model = self.tts.synthesizer.tts_model
+        # Jobs sharing this device take turns, so the seed applies to this
+        # synthesis only; other devices are not blocked
+        with device_lock(self.device), self.inference.context(self.device):
+            seed_device(self.device, seed)
+            output = model.inference(
+                text,
+                language,
+                self.gpt_cond_latent,
+                self.speaker_embedding,
+                temperature=model.config.temperature,
+                length_penalty=model.config.length_penalty,
+                repetition_penalty=model.config.repetition_penalty,
+                top_k=model.config.top_k,
+                top_p=model.config.top_p,
+                speed=speed,
+                enable_text_splitting=True,
+            )
+        samples = to_int16(output["wav"])
+
+        if self.cache is not None:
+            self.cache.put(key, samples)
+        return samples
+
+    def synthesize_cue(
+        self,
+        index: int,
+        text: str,
+        target_ms: float,
+        language: str,
+        seed: int,
+        controller,
+        max_attempts: int = 16,
+    ) -> np.ndarray:
+        """
+        Synthesize one cue, regenerating until it fits its subtitle slot.
+
+        We find hallucinations can be detected by abnormally long audio, and we
+        want the audio and video to stay synchronized, so a cue is regenerated
+        at the speed chosen by `controller` until it is no longer than the
+        slot. If no attempt fits, the shortest one is kept.
+
+        Args:
+            index (int): Cue index, used for logging.
+            text (str): Cue text.
+            target_ms (float): Duration of the cue's subtitle slot in ms.
+            language (str): XTTS language code.
+            seed (int): Global seed.
+            controller (PredictiveSpeed | FixedStepSpeed): Speed schedule.
+            max_attempts (int, optional): Maximum generations. Defaults to 16.
+
+        Returns:
+            np.ndarray: Selected int16 samples.
+        """
+        sub_speed = controller.initial_speed(text, target_ms)
+        speech_attempts = [] # In case of timeout, we take minimum
+        attempts = []
+
+        for tries in range(max_attempts):
+            samples = self.synthesize(text, language, sub_speed, derive_seed(seed, text, tries))
+            duration_ms = len(samples) * 1000 / self.sample_rate
+            accepted = duration_ms <= target_ms
+
+            self.attempt_log.append({
+                "cue": index,
+                "attempt": tries,
+                "speed": sub_speed,
+                "duration_ms": round(duration_ms, 1),
+                "target_ms": round(target_ms, 1),
+                "accepted": accepted,
+            })
+            controller.observe(text, sub_speed, duration_ms)
+            speech_attempts.append(samples)
+            attempts.append((sub_speed, duration_ms))
+
+            if accepted:
+                break
+            sub_speed = controller.next_speed(text, target_ms, attempts)
+        else:
+            print(f"Warning: Could not generate suitable audio for subtitle {index+1} after {max_attempts} attempts.")
+
+        return min(speech_attempts, key=len)
+
+    def assemble(self, subs: list[srt.Subtitle], segments: list[np.ndarray]) -> tuple[np.ndarray, list[srt.Subtitle]]:
         """
-        self.tts.tts_to_file(
-            text="Hello world",
-            speaker_wav=target_voice,
-            speaker="MySpeaker1",
-            language="en",
-            file_path="temp/hello_world.wav",
-        )
+        Place synthesized cues back to back on a new timeline.
+
+        Each cue occupies at least its original subtitle duration (shorter
+        speech is padded with silence) and cues are separated by 1 ms. The
+        output buffer is allocated once from the resulting timeline and every
+        segment is copied to its offset, so the cost is linear in audio length.
 
-    def srt_to_audio(self, subs: list[srt.Subtitle], output_file: str = "temp/de_audio.wav", speed: float = 1.0):
+        Args:
+            subs (list[srt.Subtitle]): Subtitles the segments were generated from.
+            segments (list[np.ndarray]): int16 samples for each subtitle.
+
+        Returns:
+            tuple[np.ndarray, list[srt.Subtitle]]:
+                - Combined int16 samples.
+                - Subtitles re-timed to the combined audio.
+        """
+        samples_per_ms = self.sample_rate / 1000
+        gap = round(samples_per_ms)
+
+        slots = []
+        for sub, samples in zip(subs, segments):
+            subtitle_samples = round((sub.end.total_seconds() - sub.start.total_seconds()) * self.sample_rate)
+            slots.append(max(len(samples), subtitle_samples))
+
+        audio = np.zeros(sum(slots) + gap * max(len(slots) - 1, 0), dtype=np.int16)
+        new_subs = []
+        offset = 0
+        for i, (sub, samples, slot) in enumerate(zip(subs, segments, slots)):
+            audio[offset:offset + len(samples)] = samples
+
+            start = datetime.timedelta(milliseconds=offset / samples_per_ms)
+            end = datetime.timedelta(milliseconds=(offset + slot) / samples_per_ms)
+            new_subs.append(srt.Subtitle(index=i + 1, start=start, end=end, content=sub.content))
+
+            # Move cursor forward
+            offset += slot + gap
+
+        return audio, new_subs
+
+    def _synthesize_parallel(
+        self,
+        subs: Iterable[srt.Subtitle],
+        language: str,
+        seed: int,
+        speed: float,
+        predict_speed: bool,
+        max_attempts: int,
+        workers: int,
+        on_cue: Optional[Callable[[int], None]] = None,
+    ) -> tuple[list[srt.Subtitle], list[np.ndarray]]:
+        """
+        Synthesize every cue on a pool of worker processes.
+
+        Cues are independent apart from their final offsets, which `assemble`
+        assigns afterwards in cue order. Each attempt is seeded from the global
+        seed, cue text and attempt number, so the output is the same however
+        the cues are scheduled. Cues are submitted as `subs` yields them.
+
+        Returns:
+            tuple[list[srt.Subtitle], list[np.ndarray]]: The consumed subtitles
+            and the selected int16 samples for each, in order.
+        """
+        if self.speaker_embedding is None:
+            raise RuntimeError("No voice set. Call set_voice() before synthesizing.")
+
+        pool = get_worker_pool(self.model_name, self.device, workers, self.inference)
+        conditioning = (self.speaker_fingerprint, self.gpt_cond_latent.cpu(), self.speaker_embedding.cpu())
+        cache_config = (self.cache.cache_dir, self.cache.max_bytes) if self.cache is not None else None
+
+        futures = {}
+        submitted = []
+        received = []
+        for i, sub in enumerate(subs):
+            received.append(sub)
+            subtitle_duration_ms = (sub.end.total_seconds() - sub.start.total_seconds()) * 1000
+            future = pool.submit(
+                _synthesize_cue_in_worker, conditioning, cache_config,
+                i, sub.content, subtitle_duration_ms, language, seed, speed, predict_speed, max_attempts,
+            )
+            futures[future] = i
+            submitted.append(time.perf_counter())
+
+        segments = [None] * len(received)
+        logs = [None] * len(received)
+        for done, future in enumerate(tqdm(as_completed(futures), total=len(futures), desc="Generating audio from subtitles"), start=1):
+            i = futures[future]
+            segments[i], logs[i], hits, misses = future.result()
+            record_span("tts.cue", submitted[i], time.perf_counter(), cue=i, attempts=len(logs[i]), worker=True)
+            count("speech_cache_hits", hits)
+            count("speech_cache_misses", misses)
+            if self.cache is not None:
+                self.cache.hits += hits
+                self.cache.misses += misses
+            if on_cue is not None:
+                on_cue(done)
+
+        self.attempt_log = [entry for log in logs for entry in log]
+        return received, segments
+
+    def srt_to_audio(
+        self,
+        subs: Iterable[srt.Subtitle],
+        output_file: str = "temp/de_audio.wav",
+        speed: float = 1.0,
+        language: str = "de",
+        seed: int = 0,
+        predict_speed: bool = True,
+        max_attempts: int = 16,
+        workers: int = 1,
+        on_cue: Optional[Callable[[int], None]] = None,
+    ):
         """
         Convert SRT subtitles into synthesized speech audio, aligning subtitle
         timings to the generated audio duration.
 
         Each subtitle is synthesized in sequence, concatenated into a single
         audio file, and new subtitle timings are computed based on actual speech
-        lengths. We iterate 
+        lengths. Cues whose speech overruns their slot are regenerated faster
+        (or with a new seed, for hallucinations); every attempt is recorded in
+        `self.attempt_log`.
 
         Args:
-            subs (list[srt.Subtitle]): List of subtitle objects containing text
-                to synthesize.
+            subs (Iterable[srt.Subtitle]): Subtitle objects containing text
+                to synthesize. May be a stream (e.g. a generator fed by the
+                translation stage); cues are synthesized as they arrive.
             output_file (str, optional): Path to save the combined audio file.
                 Defaults to "temp/de_audio.wav".
             speed (float, optional): Playback speed factor for synthesized speech.
                 Defaults to 1.0.
+            language (str, optional): XTTS language code of the subtitles.
+                Defaults to "de".
+            seed (int, optional): Global seed. Each attempt is seeded from this,
+                the cue text and the attempt number, so unchanged cues produce
+                identical (and cacheable) audio across runs. Defaults to 0.
+            predict_speed (bool, optional): Choose speeds from a speaking-rate
+                model fitted on the cues synthesized so far (`PredictiveSpeed`)
+                instead of the fixed retry schedule. Defaults to True.
+            max_attempts (int, optional): Maximum generations per cue. Defaults to 16.
+            workers (int, optional): Number of worker processes synthesizing cues
+                concurrently, each with its own XTTS instance. With more than one
+                worker, the speaking-rate fit is per cue rather than per job, so
+                the result does not depend on scheduling order. Defaults to 1.
+            on_cue (Callable, optional): Called with the number of cues done
+                after each cue, e.g. to report progress.
 
         Returns:
             tuple[str, list[srt.Subtitle]]:
@@ -69,73 +466,119 @@ class TextToSpeech:
                 - List of updated `srt.Subtitle` objects with adjusted start/end
                   timestamps.
         """
-        full_audio = AudioSegment.silent(duration=0)
-        current_time_ms = 0
-        new_subs = []
+        self.attempt_log = []
 
-        for i, sub in tqdm(enumerate(subs), total=len(subs), desc="Generating audio from subtitles"):
-            # Generate temporary audio file
-            temp_path = f"temp_{i}.wav"
-
-            # We find hallucinations can be detected by abnormally long audio
-            # We also want to ensure the audio and video are synchronized
-            # So, we do multiple generations, if needed to achieve this
-
-            tries = 0 # Timeout variable
-            factor = 2.0  # Initialize factor to enter the loop
-            sub_speed = speed # Assist in generating proper length audio segments 
-            speech_attempts = [] # In case of timeout, we take minimum
-
-            while factor > 1: # We want audio segments that are same length as original
-                self.tts.tts_to_file(
-                    text=sub.content,
-                    speaker="MySpeaker1",
-                    language="de",
-                    file_path=temp_path,
-                    speed=sub_speed,
-                )
-
-                # Load generated speech
-                speech = AudioSegment.from_wav(temp_path)
-                os.remove(temp_path)
-
-                # Check if generated audio is a good length
+        # First pass: pick one waveform per cue, kept in memory
+        if workers > 1:
+            subs, segments = self._synthesize_parallel(subs, language, seed, speed, predict_speed, max_attempts, workers, on_cue)
+        else:
+            controller = PredictiveSpeed(speed) if predict_speed else FixedStepSpeed(speed)
+            total = len(subs) if hasattr(subs, "__len__") else None
+            received = []
+            segments = []
+            for i, sub in tqdm(enumerate(subs), total=total, desc="Generating audio from subtitles"):
+                received.append(sub)
                 subtitle_duration_ms = (sub.end.total_seconds() - sub.start.total_seconds()) * 1000
-                factor = len(speech) / subtitle_duration_ms
+                attempts_before = len(self.attempt_log)
+                with span("tts.cue", cue=i, chars=len(sub.content)) as cue_span:
+                    segments.append(self.synthesize_cue(i, sub.content, subtitle_duration_ms, language, seed, controller, max_attempts))
+                    cue_span.attrs["attempts"] = len(self.attempt_log) - attempts_before
+                if on_cue is not None:
+                    on_cue(i + 1)
+            subs = received
+
+        count("tts_cues", len(subs))
+        count("tts_attempts", len(self.attempt_log))
+        count("tts_retries", len(self.attempt_log) - len(subs))
 
-                # Update loop variables
-                tries += 1
-                sub_speed = max(1.25, sub_speed+0.025)
-                speech_attempts.append(speech)
+        # Second pass: lay the cues out on the new timeline and write the audio once
+        audio, new_subs = self.assemble(subs, segments)
+        write_wav(output_file, audio, self.sample_rate)
 
-                if tries > 15:
-                    print(f"Warning: Could not generate suitable audio for subtitle {i+1} after 15 attempts.")
-                    break
+        if subs:
+            print(f"Average synthesis attempts per cue: {len(self.attempt_log) / len(subs):.2f}")
+        if self.cache is not None:
+            stats = self.cache.stats()
+            print(f"Speech cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate).")
 
-            speech = min(speech_attempts, key=len)
+        # After you build new_subs and export the audio:
+        srt_path = output_file.replace(".wav", ".srt")
+        with open(srt_path, "w", encoding="utf-8") as f:
+            f.write(srt.compose(new_subs))
 
-            # If speech is too short, pad with silence
-            if len(speech) < subtitle_duration_ms:
-                silence = AudioSegment.silent(duration=subtitle_duration_ms - len(speech))
-                speech += silence
+        return output_file, srt_path
 
-            # Append speech at the current cursor
-            full_audio += speech
+# Worker pools are kept alive between jobs so each worker loads XTTS only once
+_worker_pools = {}
+_worker_pools_lock = threading.Lock()
 
-            # Update subtitle timings
-            start = datetime.timedelta(milliseconds=current_time_ms)
-            end = datetime.timedelta(milliseconds=current_time_ms + len(speech))
-            new_subs.append(srt.Subtitle(index=i + 1, start=start, end=end, content=sub.content))
+# Per-process state of a pool worker
+_worker_tts = None
+_worker_caches = {}
 
-            # Move cursor forward
-            current_time_ms += len(speech)+1
+def get_worker_pool(model_name: str, device: str, workers: int, inference: Optional[InferenceSettings] = None) -> ProcessPoolExecutor:
+    """
+    Return the shared pool of `workers` processes for a model and device,
+    creating it on first use.
 
-        # Export combined audio and transcript
-        full_audio.export(output_file, format="wav")
+    Workers are started with "spawn", since forking a process that already
+    holds torch threads or a CUDA context is unsafe. Each worker's intra-op
+    thread count is set so the pool as a whole does not oversubscribe the CPU,
+    unless `inference` sets it explicitly.
+    """
+    inference = inference or InferenceSettings()
+    key = (model_name, device, workers, inference.precision, inference.threads, inference.interop_threads)
+    with _worker_pools_lock:
+        if key not in _worker_pools:
+            num_threads = inference.threads or max(1, (os.cpu_count() or 1) // workers)
+            _worker_pools[key] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model_name, device, num_threads, inference),
+            )
+        return _worker_pools[key]
 
-        # After you build new_subs and export the audio:
-        srt_path = output_file.replace(".wav", ".srt")
-        with open(srt_path, "w", encoding="utf-8") as f:
-            f.write(srt.compose(new_subs))
+def _init_worker(model_name: str, device: str, num_threads: int, inference: InferenceSettings):
+    global _worker_tts
+    lazy_import("torch").set_num_threads(num_threads)
+    _worker_tts = TextToSpeech(model_name=model_name, device=device, inference=inference)
+
+def _synthesize_cue_in_worker(
+    conditioning: tuple,
+    cache_config: Optional[tuple],
+    index: int,
+    text: str,
+    target_ms: float,
+    language: str,
+    seed: int,
+    speed: float,
+    predict_speed: bool,
+    max_attempts: int,
+) -> tuple:
+    """
+    Synthesize one cue in a pool worker.
+
+    Returns:
+        tuple: (samples, attempt log, cache hits, cache misses) for the cue.
+    """
+    tts = _worker_tts
+    fingerprint, gpt_cond_latent, speaker_embedding = conditioning
+    tts.speaker_fingerprint = fingerprint
+    tts.gpt_cond_latent = gpt_cond_latent.to(tts.device)
+    tts.speaker_embedding = speaker_embedding.to(tts.device)
+
+    tts.cache = None
+    if cache_config is not None:
+        if cache_config not in _worker_caches:
+            _worker_caches[cache_config] = SpeechCache(*cache_config)
+        tts.cache = _worker_caches[cache_config]
+    hits, misses = (tts.cache.hits, tts.cache.misses) if tts.cache else (0, 0)
+
+    tts.attempt_log = []
+    controller = PredictiveSpeed(speed) if predict_speed else FixedStepSpeed(speed)
+    samples = tts.synthesize_cue(index, text, target_ms, language, seed, controller, max_attempts)
 
-        return output_file, srt_path
\ No newline at end of file
+    if tts.cache:
+        hits, misses = tts.cache.hits - hits, tts.cache.misses - misses
+    return samples, tts.attempt_log, hits, misses
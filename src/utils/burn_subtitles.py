@@ -1,7 +1,9 @@
-import subprocess
 import os
 
-def burn_subtitles(video_path: str, srt_path: str, output_path: str = "temp/subtitled.mp4"):
+from .render import EncoderSettings, escape_filter_path
+from .tracing import run_subprocess
+
+def burn_subtitles(video_path: str, srt_path: str, output_path: str = "temp/subtitled.mp4", encoder: EncoderSettings = None):
     """
     Burn subtitles into a video from a list of srt.Subtitle objects.
 
@@ -9,6 +11,8 @@ def burn_subtitles(video_path: str, srt_path: str, output_path: str = "temp/subt
         video_path (str): Path to the input video.
         srt_path (str): Path to subtitle srt file.
         output_path (str): Path to save the output video with burned-in subtitles.
+        encoder (EncoderSettings, optional): Video encoder settings. Defaults to
+            libx264, veryfast, CRF 23.
 
     Returns:
         output_path (str): Path to output video
@@ -17,19 +21,18 @@ def burn_subtitles(video_path: str, srt_path: str, output_path: str = "temp/subt
         raise FileNotFoundError(f"Video not found: {video_path}")
     if not os.path.exists(srt_path):
         raise FileNotFoundError(f"Subtitles not found: {srt_path}")
+    encoder = encoder or EncoderSettings()
 
     # Burn subtitles into video
     cmd = [
         "ffmpeg", "-y",
         "-hide_banner", "-loglevel", "error",
         "-i", video_path,
-        "-vf", f"subtitles={srt_path}:charenc=UTF-8",
-        "-c:v", "libx264",
-        "-crf", "23",
-        "-preset", "veryfast",
+        "-vf", f"subtitles=filename='{escape_filter_path(srt_path)}':charenc=UTF-8",
+        *encoder.ffmpeg_args(),
         "-c:a", "copy",
         output_path
     ]
-    subprocess.run(cmd, check=True)
+    run_subprocess("burn_subtitles", cmd, output_path)
 
     return output_path
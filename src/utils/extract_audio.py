@@ -0,0 +1,86 @@
+import srt
+from typing import List, Tuple
+
+from .tracing import run_subprocess
+
+def choose_reference_window(
+    subtitles: List[srt.Subtitle],
+    max_seconds: float = 15.0,
+    min_cue_seconds: float = 1.0,
+) -> List[Tuple[float, float]]:
+    """
+    Pick the time ranges to use as a voice-cloning reference.
+
+    Subtitle cues mark where speech is known to occur, so the longest cues are
+    taken (longer cues are more likely to hold uninterrupted speech) until
+    `max_seconds` of audio is collected. The ranges are returned in timeline
+    order.
+
+    Args:
+        subtitles (List[srt.Subtitle]): Subtitles of the source video.
+        max_seconds (float, optional): Total reference length. Defaults to 15 seconds.
+        min_cue_seconds (float, optional): Shorter cues are ignored unless nothing
+            else is available. Defaults to 1 second.
+
+    Returns:
+        List[Tuple[float, float]]: (start, end) times in seconds. Falls back to the
+        first `max_seconds` of the video if there are no usable cues.
+    """
+    cues = [
+        (sub.start.total_seconds(), sub.end.total_seconds())
+        for sub in subtitles
+        if sub.end > sub.start
+    ]
+    long_cues = [cue for cue in cues if cue[1] - cue[0] >= min_cue_seconds] or cues
+    if not long_cues:
+        return [(0.0, max_seconds)]
+
+    windows = []
+    total = 0.0
+    for start, end in sorted(long_cues, key=lambda cue: cue[1] - cue[0], reverse=True):
+        end = min(end, start + max_seconds - total)
+        windows.append((start, end))
+        total += end - start
+        if total >= max_seconds:
+            break
+
+    return sorted(windows)
+
+def extract_reference_audio(
+    video_path: str,
+    windows: List[Tuple[float, float]],
+    output_path: str,
+    sample_rate: int = 22050,
+) -> str:
+    """
+    Extract only the given time ranges of a video's audio as one mono WAV.
+
+    ffmpeg seeks to each range and decodes just that part, so the cost is
+    independent of the length of the video.
+
+    Args:
+        video_path (str): Path to the input video.
+        windows (List[Tuple[float, float]]): (start, end) times in seconds.
+        output_path (str): Path of the WAV file to write.
+        sample_rate (int, optional): Output sample rate. Defaults to 22050 Hz,
+            the rate XTTS uses for speaker conditioning.
+
+    Returns:
+        str: `output_path`.
+    """
+    cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
+    for start, end in windows:
+        cmd += ["-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", video_path]
+
+    inputs = "".join(f"[{i}:a:0]" for i in range(len(windows)))
+    cmd += [
+        "-filter_complex", f"{inputs}concat=n={len(windows)}:v=0:a=1[a]",
+        "-map", "[a]",
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "-c:a", "pcm_s16le",
+        output_path,
+    ]
+    run_subprocess("extract_reference_audio", cmd, output_path)
+
+    return output_path
@@ -0,0 +1,41 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Digests of recently hashed files, keyed by (path, size, mtime), so a file
+# hashed by several stages of one job is read only once
+_digests = OrderedDict()
+_digests_lock = threading.Lock()
+_MAX_DIGESTS = 1024
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Hex SHA-256 of a file's contents, read in fixed-size chunks so large media
+    files are never loaded into memory at once. Unchanged files (same size
+    and modification time) are not read again within a process.
+
+    Args:
+        path (str): Path to the file.
+        chunk_size (int, optional): Bytes read per chunk. Defaults to 1 MB.
+
+    Returns:
+        str: Hex digest.
+    """
+    stat = os.stat(path)
+    key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+    with _digests_lock:
+        if key in _digests:
+            _digests.move_to_end(key)
+            return _digests[key]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+
+    with _digests_lock:
+        _digests[key] = digest.hexdigest()
+        while len(_digests) > _MAX_DIGESTS:
+            _digests.popitem(last=False)
+    return digest.hexdigest()
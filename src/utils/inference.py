@@ -0,0 +1,128 @@
+import os
+import contextlib
+
+from .startup import lazy_import
+
+PRECISIONS = ["fp32", "int8", "bf16"]
+
+def cpu_supports_bf16() -> bool:
+    """
+    Whether the CPU has native bf16 instructions (AVX512-BF16 or AMX). Without
+    them bf16 is emulated and slower than fp32.
+    """
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+class InferenceSettings:
+    """
+    Inference precision and threading for the translation and TTS models.
+
+    Attributes:
+        precision (str): "fp32" (default), "int8" for dynamic int8 quantization
+            of the `nn.Linear` layers (CPU only), or "bf16" for bf16 autocast
+            where the device supports it. Unsupported choices fall back to fp32.
+        threads (int): Intra-op threads per process, 0 keeps torch's default.
+        interop_threads (int): Inter-op threads per process, 0 keeps torch's default.
+    """
+
+    def __init__(self, precision: str = "fp32", threads: int = 0, interop_threads: int = 0):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision {precision!r}, expected one of {', '.join(PRECISIONS)}")
+        self.precision = precision
+        self.threads = threads
+        self.interop_threads = interop_threads
+        self._resolved = {}
+
+    @classmethod
+    def from_env(cls) -> "InferenceSettings":
+        """
+        Read settings from INFERENCE_PRECISION, INFERENCE_THREADS and INFERENCE_INTEROP_THREADS.
+        """
+        return cls(
+            precision=os.environ.get("INFERENCE_PRECISION", "fp32"),
+            threads=int(os.environ.get("INFERENCE_THREADS", 0)),
+            interop_threads=int(os.environ.get("INFERENCE_INTEROP_THREADS", 0)),
+        )
+
+    def resolve(self, device: str) -> str:
+        """
+        The precision actually used on `device`.
+        """
+        device = str(device)
+        if device not in self._resolved:
+            self._resolved[device] = self._resolve(device)
+        return self._resolved[device]
+
+    def _resolve(self, device: str) -> str:
+        if self.precision == "int8" and not str(device).startswith("cpu"):
+            print("int8 quantization is only available on CPU; using fp32.")
+            return "fp32"
+        if self.precision == "bf16":
+            torch = lazy_import("torch")
+            supported = (
+                torch.cuda.is_bf16_supported() if str(device).startswith("cuda")
+                else str(device).startswith("cpu") and cpu_supports_bf16()
+            )
+            if not supported:
+                print(f"bf16 is not supported natively on {device}; using fp32.")
+                return "fp32"
+        return self.precision
+
+    def variant(self, device: str) -> str:
+        """
+        Suffix identifying non-fp32 weights in model registry and cache keys.
+        """
+        precision = self.resolve(device)
+        return "" if precision == "fp32" else f"@{precision}"
+
+    def apply_threads(self):
+        """
+        Set torch's thread counts for this process, if configured.
+        """
+        torch = lazy_import("torch")
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        if self.interop_threads:
+            try:
+                torch.set_interop_threads(self.interop_threads)
+            except RuntimeError:
+                # Only possible before the first parallel work in the process
+                pass
+
+    def prepare(self, module, device: str):
+        """
+        Prepare a loaded network for inference: switch to eval mode and
+        quantize its linear layers in place for int8.
+
+        Returns:
+            The same module.
+        """
+        torch = lazy_import("torch")
+        self.apply_threads()
+        module.eval()
+        if self.resolve(device) == "int8":
+            torch.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        return module
+
+    def context(self, device: str):
+        """
+        Context manager to run inference in: `torch.inference_mode`, plus bf16
+        autocast for bf16.
+        """
+        torch = lazy_import("torch")
+        stack = contextlib.ExitStack()
+        stack.enter_context(torch.inference_mode())
+        if self.resolve(device) == "bf16":
+            stack.enter_context(torch.autocast("cuda" if str(device).startswith("cuda") else "cpu", dtype=torch.bfloat16))
+        return stack
+
+    def __getstate__(self):
+        # Pickled for TTS worker processes, which resolve again on their own
+        return {**self.__dict__, "_resolved": {}}
+
+    def __repr__(self) -> str:
+        return f"InferenceSettings(precision={self.precision!r}, threads={self.threads}, interop_threads={self.interop_threads})"
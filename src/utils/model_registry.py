@@ -0,0 +1,218 @@
+import os
+import gc
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Optional, Tuple
+
+def estimate_model_bytes(obj, max_depth: int = 3) -> int:
+    """
+    Estimate the memory held by the torch modules reachable from an object.
+
+    Wrappers such as a transformers pipeline or a Coqui `TTS` object keep their
+    networks a few attributes deep, so the object graph is walked up to
+    `max_depth` levels and every distinct parameter/buffer is counted once.
+
+    Args:
+        obj: Loaded model or model wrapper.
+        max_depth (int, optional): How many attribute levels to inspect.
+
+    Returns:
+        int: Estimated size in bytes (0 if torch is unavailable).
+    """
+    try:
+        import torch
+    except ImportError:
+        return 0
+
+    seen_objects = set()
+    seen_tensors = set()
+    total = 0
+
+    def visit(node, depth):
+        nonlocal total
+        if node is None or id(node) in seen_objects or depth > max_depth:
+            return
+        seen_objects.add(id(node))
+
+        if isinstance(node, torch.nn.Module):
+            for tensor in list(node.parameters()) + list(node.buffers()):
+                if id(tensor) not in seen_tensors:
+                    seen_tensors.add(id(tensor))
+                    total += tensor.numel() * tensor.element_size()
+            return
+
+        if isinstance(node, (list, tuple)):
+            children = node
+        elif isinstance(node, dict):
+            children = node.values()
+        elif hasattr(node, "__dict__"):
+            children = vars(node).values()
+        else:
+            return
+
+        for child in children:
+            visit(child, depth + 1)
+
+    visit(obj, 0)
+    return total
+
+class ModelRegistry:
+    """
+    Process-wide registry of warm models shared across requests.
+
+    Entries are keyed by (model name, device, checkpoint) and loaded lazily on
+    first use. When a memory budget is set, least recently used entries are
+    evicted until the estimated footprint fits. Loads are serialized per key, so
+    two overlapping requests never load the same weights twice.
+    """
+
+    def __init__(self, memory_budget_mb: Optional[float] = None):
+        """
+        Initialize an empty registry.
+
+        Args:
+            memory_budget_mb (float, optional): Upper bound on the estimated memory
+                of all cached models, in MB. `None` or 0 disables eviction.
+        """
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024) if memory_budget_mb else None
+        self._entries = OrderedDict()  # key -> (model, size in bytes)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._stats = {}
+
+    def _key_stats(self, key: Tuple) -> dict:
+        return self._stats.setdefault(key, {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "load_seconds": 0.0,
+            "hit_seconds": 0.0,
+            "bytes": 0,
+        })
+
+    def get(self, name: str, device: str, checkpoint: Optional[Hashable], loader: Callable[[], object]):
+        """
+        Return the cached model for a key, loading it with `loader` on a miss.
+
+        Args:
+            name (str): Model name (e.g. "Helsinki-NLP/opus-mt-en-de").
+            device (str): Device the model lives on ("cpu" or "cuda").
+            checkpoint (Hashable, optional): Checkpoint path or other variant
+                identifier. Use `None` when the name fully identifies the weights.
+            loader (Callable[[], object]): Zero-argument function that loads the model.
+
+        Returns:
+            object: The loaded model.
+        """
+        key = (name, device, checkpoint)
+        start = time.perf_counter()
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    stats = self._key_stats(key)
+                    stats["hits"] += 1
+                    stats["hit_seconds"] += time.perf_counter() - start
+                    return self._entries[key][0]
+
+            model = loader()
+            load_seconds = time.perf_counter() - start
+            size = estimate_model_bytes(model)
+
+            with self._lock:
+                self._entries[key] = (model, size)
+                stats = self._key_stats(key)
+                stats["misses"] += 1
+                stats["load_seconds"] += load_seconds
+                stats["bytes"] = size
+                self._evict(keep=key)
+
+        print(f"Loaded {name} on {device} in {load_seconds:.1f}s ({size / 2**20:.0f} MB).")
+        return model
+
+    def _evict(self, keep: Tuple):
+        """
+        Drop least recently used entries until the budget is met. Caller holds the lock.
+        """
+        if self.memory_budget is None:
+            return
+
+        evicted = False
+        while self.memory_bytes() > self.memory_budget:
+            victim = next((k for k in self._entries if k != keep), None)
+            if victim is None:
+                break
+            del self._entries[victim]
+            self._key_stats(victim)["evictions"] += 1
+            print(f"Evicted {victim[0]} on {victim[1]} from the model registry.")
+            evicted = True
+
+        if evicted:
+            gc.collect()
+            try:
+                import torch
+                if torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+            except ImportError:
+                pass
+
+    def preload(self, specs: Iterable[Tuple[str, str, Optional[Hashable], Callable[[], object]]]):
+        """
+        Load several models up front, e.g. at server startup.
+
+        Args:
+            specs (Iterable[tuple]): (name, device, checkpoint, loader) tuples,
+                as accepted by `get`.
+        """
+        for name, device, checkpoint, loader in specs:
+            self.get(name, device, checkpoint, loader)
+
+    def memory_bytes(self) -> int:
+        """
+        Estimated memory held by all cached models, in bytes.
+        """
+        return sum(size for _, size in self._entries.values())
+
+    def clear(self):
+        """
+        Drop every cached model.
+        """
+        with self._lock:
+            self._entries.clear()
+        gc.collect()
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counts and timings per key.
+
+        Returns:
+            dict: Maps "name|device|checkpoint" to a dict of counters and timings,
+            plus whether the entry is currently loaded.
+        """
+        with self._lock:
+            return {
+                "|".join(str(part) for part in key): dict(stats, loaded=key in self._entries)
+                for key, stats in self._stats.items()
+            }
+
+    def report(self) -> str:
+        """
+        Human-readable summary of the registry state.
+        """
+        lines = [f"Model registry: {len(self._entries)} loaded, {self.memory_bytes() / 2**20:.0f} MB"]
+        for key, stats in self.stats().items():
+            lines.append(
+                f"  {key}: {stats['hits']} hits ({stats['hit_seconds']:.3f}s), "
+                f"{stats['misses']} misses ({stats['load_seconds']:.1f}s load), "
+                f"{stats['evictions']} evictions"
+            )
+        return "\n".join(lines)
+
+# Shared by every request in this process. Budget is read from the environment so
+# deployments can size it per node without code changes.
+model_registry = ModelRegistry(float(os.environ.get("MODEL_MEMORY_BUDGET_MB", 0)) or None)
@@ -0,0 +1,225 @@
+import time
+import queue
+import threading
+import contextvars
+from typing import Callable, Iterable, List, Optional
+
+from .tracing import span
+
+class PipelineAborted(Exception):
+    """
+    Raised inside a stage when another stage of the same pipeline has failed.
+    """
+
+_DONE = object()
+
+class Stream:
+    """
+    Bounded queue connecting a producer stage to a consumer stage.
+
+    Iterating a stream yields items until the producer finishes. Time spent
+    blocked on a full queue (producer) or an empty one (consumer) is charged
+    to the respective stage, so per-stage busy time excludes waiting.
+    """
+
+    def __init__(self, pipeline: "Pipeline", producer: "Stage", maxsize: int):
+        self._pipeline = pipeline
+        self._queue = queue.Queue(maxsize)
+        self.producer = producer
+        self.consumer = None
+        self.items = 0
+
+    def _wait(self, operation, stage: Optional["Stage"]):
+        start = time.perf_counter()
+        try:
+            while True:
+                if self._pipeline.failed.is_set():
+                    raise PipelineAborted()
+                try:
+                    return operation()
+                except (queue.Full, queue.Empty):
+                    continue
+        finally:
+            if stage is not None:
+                stage.wait_seconds += time.perf_counter() - start
+
+    def put(self, item):
+        self._wait(lambda: self._queue.put(item, timeout=0.1), self.producer)
+        self.items += 1
+
+    def close(self):
+        self._wait(lambda: self._queue.put(_DONE, timeout=0.1), self.producer)
+
+    def __iter__(self):
+        while True:
+            item = self._wait(lambda: self._queue.get(timeout=0.1), self.consumer)
+            if item is _DONE:
+                return
+            yield item
+
+class Stage:
+    """
+    One unit of work in a pipeline, run on its own thread.
+
+    Attributes:
+        name (str): Stage name used in reports.
+        result: Return value of the stage function once finished.
+        output (Stream, optional): Stream the stage writes to, for producers.
+        wall_seconds (float): Time from start to finish.
+        wait_seconds (float): Time blocked on dependencies or streams.
+    """
+
+    def __init__(self, name: str, fn: Callable, after: Iterable["Stage"] = ()):
+        self.name = name
+        self.fn = fn
+        self.after = list(after)
+        self.result = None
+        self.output = None
+        self.error = None
+        self.wall_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.done = threading.Event()
+
+    @property
+    def busy_seconds(self) -> float:
+        return max(0.0, self.wall_seconds - self.wait_seconds)
+
+class Pipeline:
+    """
+    Minimal streaming pipeline engine.
+
+    Stages run concurrently on threads. Producers emit items into bounded
+    streams that consumers iterate while the producer is still running, and
+    stages can wait for other stages to finish first. Bounded queues keep memory
+    flat when a consumer is slower than its producer. If any stage raises, all
+    other stages are aborted and `run` re-raises the first error.
+
+    Example:
+        >>> pipe = Pipeline()
+        >>> cues = pipe.producer("translate", translator.iter_translate_srt, transcript)
+        >>> voice = pipe.task("condition", tts.set_voice, reference)
+        >>> audio = pipe.consumer("tts", tts.srt_to_audio, cues, after=[voice])
+        >>> pipe.run()
+        >>> print(pipe.report())
+    """
+
+    def __init__(self, maxsize: int = 32):
+        """
+        Args:
+            maxsize (int, optional): Capacity of each stream. Defaults to 32.
+        """
+        self.maxsize = maxsize
+        self.stages: List[Stage] = []
+        self.failed = threading.Event()
+        self.wall_seconds = 0.0
+
+    def task(self, name: str, fn: Callable, *args, after: Iterable[Stage] = (), **kwargs) -> Stage:
+        """
+        Add a stage that calls `fn(*args, **kwargs)` once its dependencies finish.
+        """
+        stage = Stage(name, lambda: fn(*args, **kwargs), after)
+        self.stages.append(stage)
+        return stage
+
+    def producer(self, name: str, fn: Callable, *args, after: Iterable[Stage] = (), **kwargs) -> Stream:
+        """
+        Add a stage that streams every item yielded by `fn(*args, **kwargs)`.
+
+        Returns:
+            Stream: The stage's output, to be passed to a consumer.
+        """
+        def produce():
+            for item in fn(*args, **kwargs):
+                stage.output.put(item)
+            stage.output.close()
+
+        stage = Stage(name, produce, after)
+        stage.output = Stream(self, stage, self.maxsize)
+        self.stages.append(stage)
+        return stage.output
+
+    def consumer(self, name: str, fn: Callable, stream: Stream, *args, after: Iterable[Stage] = (), **kwargs) -> Stage:
+        """
+        Add a stage that calls `fn(stream, *args, **kwargs)`, where `stream` is
+        iterated as items arrive.
+        """
+        stage = Stage(name, lambda: fn(stream, *args, **kwargs), after)
+        stream.consumer = stage
+        self.stages.append(stage)
+        return stage
+
+    def _run_stage(self, stage: Stage):
+        start = time.perf_counter()
+        try:
+            for dependency in stage.after:
+                wait_start = time.perf_counter()
+                while not dependency.done.wait(timeout=0.1):
+                    if self.failed.is_set():
+                        raise PipelineAborted()
+                stage.wait_seconds += time.perf_counter() - wait_start
+                if dependency.error is not None:
+                    raise PipelineAborted()
+            with span(stage.name, stage=True):
+                stage.result = stage.fn()
+        except BaseException as e:
+            stage.error = e
+            self.failed.set()
+        finally:
+            stage.wall_seconds = time.perf_counter() - start
+            stage.done.set()
+
+    def run(self):
+        """
+        Run all stages to completion.
+
+        Raises:
+            Exception: The first error raised by a stage.
+        """
+        start = time.perf_counter()
+        # Each stage runs in a copy of the caller's context, so it reports to
+        # the caller's tracer (and e.g. Gradio's progress tracking)
+        threads = [
+            threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(self._run_stage, stage),
+                name=f"stage-{stage.name}",
+                daemon=True,
+            )
+            for stage in self.stages
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.wall_seconds = time.perf_counter() - start
+
+        errors = [stage.error for stage in self.stages if stage.error is not None]
+        original = [e for e in errors if not isinstance(e, PipelineAborted)]
+        if original or errors:
+            raise (original or errors)[0]
+
+    def timings(self) -> dict:
+        """
+        Wall, busy and wait seconds per stage, plus items streamed by producers.
+        """
+        return {
+            stage.name: {
+                "wall_seconds": round(stage.wall_seconds, 3),
+                "busy_seconds": round(stage.busy_seconds, 3),
+                "wait_seconds": round(stage.wait_seconds, 3),
+                "items": stage.output.items if stage.output is not None else None,
+            }
+            for stage in self.stages
+        }
+
+    def report(self) -> str:
+        """
+        Human-readable per-stage timing summary.
+        """
+        lines = [f"Pipeline: {self.wall_seconds:.1f}s end to end"]
+        for name, timing in self.timings().items():
+            lines.append(
+                f"  {name}: {timing['wall_seconds']:.1f}s wall, "
+                f"{timing['busy_seconds']:.1f}s busy, {timing['wait_seconds']:.1f}s waiting"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,317 @@
+import os
+import functools
+import subprocess
+import ffmpeg
+from fractions import Fraction
+from typing import List, Optional, Tuple
+
+from .tracing import run_subprocess
+
+# Hardware H.264 encoders tried, in order, when the codec is "auto"
+HARDWARE_ENCODERS = ["h264_nvenc", "h264_qsv", "h264_videotoolbox"]
+
+@functools.lru_cache(maxsize=None)
+def encoder_available(codec: str) -> bool:
+    """
+    Check whether ffmpeg can actually encode with `codec` on this machine.
+
+    Being listed by `ffmpeg -encoders` is not enough for hardware encoders (the
+    device may be missing), so a one-frame test encode is run. The result is
+    cached for the lifetime of the process.
+    """
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", "color=black:size=256x256:duration=0.04",
+        "-frames:v", "1",
+        "-c:v", codec,
+        "-f", "null", "-",
+    ]
+    try:
+        return subprocess.run(cmd, capture_output=True, timeout=30).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+class EncoderSettings:
+    """
+    Video encoder settings shared by the rendering stages.
+
+    Attributes:
+        codec (str): ffmpeg encoder name, or "auto" to use the first working
+            hardware encoder and fall back to libx264.
+        preset (str): libx264 preset (ignored by hardware encoders).
+        crf (int): Constant quality target; mapped to the equivalent option of
+            hardware encoders.
+        threads (int): Encoder threads, 0 lets ffmpeg decide.
+    """
+
+    def __init__(self, codec: str = "libx264", preset: str = "veryfast", crf: int = 23, threads: int = 0):
+        self.codec = codec
+        self.preset = preset
+        self.crf = crf
+        self.threads = threads
+
+    @classmethod
+    def from_env(cls) -> "EncoderSettings":
+        """
+        Read settings from VIDEO_ENCODER, VIDEO_PRESET, VIDEO_CRF and VIDEO_THREADS.
+        """
+        return cls(
+            codec=os.environ.get("VIDEO_ENCODER", "libx264"),
+            preset=os.environ.get("VIDEO_PRESET", "veryfast"),
+            crf=int(os.environ.get("VIDEO_CRF", 23)),
+            threads=int(os.environ.get("VIDEO_THREADS", 0)),
+        )
+
+    def resolve_codec(self) -> str:
+        """
+        Concrete encoder to use, resolving "auto".
+        """
+        if self.codec != "auto":
+            return self.codec
+        return next((codec for codec in HARDWARE_ENCODERS if encoder_available(codec)), "libx264")
+
+    def ffmpeg_args(self) -> list:
+        """
+        ffmpeg output options for the video stream.
+        """
+        codec = self.resolve_codec()
+        if codec == "h264_nvenc":
+            args = ["-c:v", codec, "-preset", "p4", "-rc", "vbr", "-cq", str(self.crf)]
+        elif codec == "h264_qsv":
+            args = ["-c:v", codec, "-global_quality", str(self.crf)]
+        elif codec == "h264_videotoolbox":
+            args = ["-c:v", codec, "-q:v", str(max(1, min(100, 100 - 2 * self.crf)))]
+        else:
+            args = ["-c:v", codec, "-preset", self.preset, "-crf", str(self.crf)]
+
+        if self.threads:
+            args += ["-threads", str(self.threads)]
+        return args + ["-pix_fmt", "yuv420p"]
+
+def escape_filter_path(path: str) -> str:
+    """
+    Escape a file path for use as an ffmpeg filter option value.
+    """
+    return path.replace("\\", "/").replace(":", "\\:").replace("'", "\\'")
+
+def video_frame_rate(video_path: str) -> Fraction:
+    """
+    Exact frame rate of the first video stream (e.g. 30000/1001).
+    """
+    stream = next(s for s in ffmpeg.probe(video_path)['streams'] if s['codec_type'] == 'video')
+    return Fraction(stream['r_frame_rate'])
+
+def extension_filter(
+    translation_type: str,
+    video_duration: float,
+    duration_difference: float,
+    frame_rate: Optional[Fraction] = None,
+) -> str:
+    """
+    Build the video filter graph that extends a video by `duration_difference` seconds.
+
+    For dubbing, the last frame is frozen (tpad). For lip sync, the last segment
+    of the video is played in reverse (trim + reverse + concat), which keeps the
+    mouth moving naturally for Wav2Lip. The concat filter does not carry the
+    frame rate over, so it is set again from `frame_rate`; without it, the
+    output falls back to 25 fps.
+
+    Args:
+        translation_type (str): 'Dub' or 'LipSync'.
+        video_duration (float): Duration of the input video in seconds.
+        duration_difference (float): Seconds to add to the end of the video.
+        frame_rate (Fraction, optional): Frame rate of the input video.
+
+    Returns:
+        str: Filter graph reading from [0:v] and writing to [v].
+    """
+    if translation_type.lower() == 'dub':
+        return f"[0:v]tpad=stop_mode=clone:stop_duration={duration_difference:.3f}[v]"
+    elif translation_type.lower() == 'lipsync':
+        tail_start = max(0.0, video_duration - duration_difference)
+        return (
+            "[0:v]split[main][tail];"
+            f"[tail]trim=start={tail_start:.3f},setpts=PTS-STARTPTS,reverse[rev];"
+            "[main][rev]concat=n=2:v=1:a=0" + (f",fps={frame_rate}" if frame_rate else "") + "[v]"
+        )
+    else:
+        raise ValueError(f"Invalid translation type: {translation_type}.")
+
+def render_video(
+    video_path: str,
+    audio_path: str,
+    translation_type: str,
+    srt_path: Optional[str] = None,
+    output_path: str = "temp/output.mp4",
+    encoder: Optional[EncoderSettings] = None,
+    start: float = 0.0,
+    duration: Optional[float] = None,
+    keyframes: Optional[List[float]] = None,
+):
+    """
+    Replace the audio of a video, extend the video to the audio length and
+    optionally burn in subtitles, all in a single decode/encode pass.
+
+    If the audio is longer than the video, the video is extended (see
+    `extension_filter`). Otherwise the audio is padded with silence to the
+    video duration. The video is only re-encoded when it is extended,
+    subtitled or trimmed; otherwise its stream is copied.
+
+    Args:
+        video_path (str): Path to the original video.
+        audio_path (str): Path to the replacement audio.
+        translation_type (str): 'Dub' (freeze last frame) or 'LipSync' (reverse last segment).
+        srt_path (str, optional): Subtitles to burn in. If not provided, no subtitles.
+        output_path (str, optional): Path to save the rendered video.
+        encoder (EncoderSettings, optional): Video encoder settings. Defaults to
+            libx264, veryfast, CRF 23.
+        start (float, optional): Render only the part of the video from `start`
+            seconds. Defaults to 0.
+        duration (float, optional): Render only `duration` seconds of the video.
+            Defaults to the rest of the video. Trimmed renders are always
+            re-encoded so the cut is frame accurate.
+        keyframes (List[float], optional): Times (in seconds) at which to force
+            keyframes, so the output can later be split there without
+            re-encoding. Forces a re-encode.
+
+    Returns:
+        output_path (str): Path to output video
+    """
+    if not os.path.exists(video_path):
+        raise FileNotFoundError(f"Video not found: {video_path}")
+    if not os.path.exists(audio_path):
+        raise FileNotFoundError(f"Audio not found: {audio_path}")
+    if srt_path is not None and not os.path.exists(srt_path):
+        raise FileNotFoundError(f"Subtitles not found: {srt_path}")
+    encoder = encoder or EncoderSettings()
+
+    # Probe video and audio
+    video_duration = float(ffmpeg.probe(video_path)['format']['duration']) - start
+    if duration is not None:
+        video_duration = min(video_duration, duration)
+    trimmed = start > 0 or duration is not None
+    audio_duration = float(ffmpeg.probe(audio_path)['format']['duration'])
+    duration_difference = audio_duration - video_duration
+
+    # Assemble the video filter graph, ending in [v]
+    filters = []
+    if duration_difference > 0:
+        filters.append(extension_filter(translation_type, video_duration, duration_difference, video_frame_rate(video_path)))
+    else:
+        filters.append("[0:v]null[v]")
+    if srt_path is not None:
+        filters[-1] = filters[-1][:-len("[v]")] + "[ext]"
+        filters.append(f"[ext]subtitles=filename='{escape_filter_path(srt_path)}':charenc=UTF-8[v]")
+
+    cmd = [
+        "ffmpeg", "-y",
+        "-hide_banner", "-loglevel", "error",
+    ]
+    if trimmed:
+        # Input seeking: decoding starts at `start` and timestamps restart at 0
+        cmd += ["-ss", f"{start:.3f}", "-t", f"{video_duration:.3f}"]
+    cmd += [
+        "-i", video_path,
+        "-i", audio_path,
+    ]
+
+    if duration_difference > 0 or srt_path is not None or trimmed or keyframes:
+        cmd += ["-filter_complex", ";".join(filters), "-map", "[v]"] + encoder.ffmpeg_args()
+        if keyframes:
+            cmd += ["-force_key_frames", ",".join(f"{t:.6f}" for t in keyframes)]
+    else:
+        cmd += ["-map", "0:v:0", "-c:v", "copy"]
+
+    cmd += ["-map", "1:a:0"]
+    if duration_difference <= 0:
+        # Pad audio with silence to the video duration
+        cmd += ["-af", f"apad=whole_dur={video_duration:.3f}"]
+
+    cmd += [
+        "-c:a", "aac", "-b:a", "192k",
+        "-shortest",
+        output_path
+    ]
+    run_subprocess("render", cmd, output_path)
+
+    return output_path
+
+def render_multitrack(
+    video_path: str,
+    tracks: List[Tuple[str, str, Optional[str]]],
+    output_path: str = "temp/output.mp4",
+    encoder: Optional[EncoderSettings] = None,
+):
+    """
+    Mux one video with several translated audio tracks and subtitle streams,
+    e.g. one per target language, so players can switch between them.
+
+    The video is rendered once: if the longest audio is longer than the
+    video, its last frame is frozen (as for 'Dub' in `render_video`),
+    otherwise its stream is copied. Every audio track is padded with silence
+    to the output duration. Subtitles are added as soft (mov_text) streams,
+    since several languages cannot be burned in. The first track is the
+    default.
+
+    Args:
+        video_path (str): Path to the original video.
+        tracks (List[Tuple[str, str, Optional[str]]]): (ISO 639-2 language
+            code, audio path, subtitles path or None) per track.
+        output_path (str, optional): Path to save the rendered video.
+        encoder (EncoderSettings, optional): Video encoder settings, used when
+            the video is extended. Defaults to libx264, veryfast, CRF 23.
+
+    Returns:
+        output_path (str): Path to output video
+    """
+    if not os.path.exists(video_path):
+        raise FileNotFoundError(f"Video not found: {video_path}")
+    for _, audio_path, srt_path in tracks:
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"Audio not found: {audio_path}")
+        if srt_path is not None and not os.path.exists(srt_path):
+            raise FileNotFoundError(f"Subtitles not found: {srt_path}")
+    encoder = encoder or EncoderSettings()
+
+    video_duration = float(ffmpeg.probe(video_path)['format']['duration'])
+    audio_duration = max(float(ffmpeg.probe(audio_path)['format']['duration']) for _, audio_path, _ in tracks)
+    output_duration = max(video_duration, audio_duration)
+
+    cmd = [
+        "ffmpeg", "-y",
+        "-hide_banner", "-loglevel", "error",
+        "-i", video_path,
+    ]
+    for _, audio_path, _ in tracks:
+        cmd += ["-i", audio_path]
+    subtitled = [(language, srt_path) for language, _, srt_path in tracks if srt_path is not None]
+    for _, srt_path in subtitled:
+        cmd += ["-i", srt_path]
+
+    if audio_duration > video_duration:
+        cmd += ["-filter_complex", extension_filter('Dub', video_duration, audio_duration - video_duration), "-map", "[v]"]
+        cmd += encoder.ffmpeg_args()
+    else:
+        cmd += ["-map", "0:v:0", "-c:v", "copy"]
+
+    for i, (language, _, _) in enumerate(tracks):
+        cmd += [
+            "-map", f"{i + 1}:a:0",
+            f"-filter:a:{i}", f"apad=whole_dur={output_duration:.3f}",
+            f"-metadata:s:a:{i}", f"language={language}",
+            f"-disposition:a:{i}", "default" if i == 0 else "0",
+        ]
+    for i, (language, _) in enumerate(subtitled):
+        cmd += [
+            "-map", f"{len(tracks) + i + 1}:s:0",
+            f"-metadata:s:s:{i}", f"language={language}",
+            f"-disposition:s:{i}", "0",
+        ]
+
+    cmd += ["-c:a", "aac", "-b:a", "192k"]
+    if subtitled:
+        cmd += ["-c:s", "mov_text"]
+    cmd += ["-t", f"{output_duration:.3f}", output_path]
+    run_subprocess("render_multitrack", cmd, output_path)
+
+    return output_path
@@ -0,0 +1,129 @@
+import sys
+import json
+import time
+import importlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .model_registry import model_registry
+from .tracing import metrics_registry
+
+_process_start = time.perf_counter()
+_import_seconds = {}
+_import_lock = threading.Lock()
+_ready = threading.Event()
+
+def lazy_import(module_name: str):
+    """
+    Import a module on first use and record how long the import took.
+
+    Heavy backends (torch, transformers, Coqui TTS, lipsync) are imported
+    through this function where they are needed instead of at module load,
+    so the app starts without them and deployments only pay for the backends
+    they use.
+
+    Args:
+        module_name (str): Absolute module name, e.g. "transformers".
+
+    Returns:
+        module: The imported module.
+    """
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
+    with _import_lock:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        _import_seconds.setdefault(module_name, time.perf_counter() - start)
+    return module
+
+def record_import(name: str, seconds: float):
+    """
+    Record the time of an import not made through `lazy_import`.
+    """
+    _import_seconds.setdefault(name, seconds)
+
+def mark_ready():
+    """
+    Report the app as ready, e.g. once warm models are loaded.
+    """
+    _ready.set()
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+def startup_timings() -> dict:
+    """
+    Time since process start, seconds per recorded import and seconds per
+    model load.
+    """
+    return {
+        "uptime_seconds": round(time.perf_counter() - _process_start, 3),
+        "ready": is_ready(),
+        "imports": {name: round(seconds, 3) for name, seconds in _import_seconds.items()},
+        "model_loads": {
+            name: round(stats["load_seconds"], 3)
+            for name, stats in model_registry.stats().items()
+            if stats["misses"]
+        },
+    }
+
+def startup_report() -> str:
+    """
+    Human-readable startup-time breakdown.
+    """
+    timings = startup_timings()
+    lines = [f"Startup: {timings['uptime_seconds']:.1f}s since process start, {'ready' if timings['ready'] else 'not ready'}"]
+    lines.append("  Imports:")
+    for name, seconds in sorted(timings["imports"].items(), key=lambda item: -item[1]):
+        lines.append(f"    {name}: {seconds:.2f}s")
+    lines.append("  Model loads:")
+    for name, seconds in sorted(timings["model_loads"].items(), key=lambda item: -item[1]):
+        lines.append(f"    {name}: {seconds:.2f}s")
+    return "\n".join(lines)
+
+class _ReadinessHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._send(200, metrics_registry.prometheus_text().encode("utf-8"), "text/plain; version=0.0.4")
+            return
+        if self.path == "/live":
+            status, body = 200, {"live": True}
+        elif self.path == "/ready":
+            body = startup_timings()
+            status = 200 if body["ready"] else 503
+        else:
+            status, body = 404, {"error": "not found"}
+
+        self._send(status, json.dumps(body).encode("utf-8"), "application/json")
+
+    def _send(self, status: int, payload: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_readiness_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serve health checks on a background thread.
+
+    GET /live answers 200 as soon as the process is up. GET /ready answers 200
+    once `mark_ready` has been called and 503 before, with the startup timings
+    as JSON body. GET /metrics serves job metrics (stage and cue timings,
+    counters, peak memory) in Prometheus text format.
+
+    Args:
+        port (int): Port to listen on.
+        host (str, optional): Interface to bind. Defaults to all interfaces.
+
+    Returns:
+        ThreadingHTTPServer: The running server.
+    """
+    server = ThreadingHTTPServer((host, port), _ReadinessHandler)
+    threading.Thread(target=server.serve_forever, name="readiness", daemon=True).start()
+    return server
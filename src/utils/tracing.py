@@ -0,0 +1,332 @@
+import os
+import sys
+import json
+import time
+import threading
+import contextvars
+import subprocess
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+_current_tracer = contextvars.ContextVar("tracer", default=None)
+_current_span = contextvars.ContextVar("span", default=None)
+
+def _rss_bytes() -> Optional[int]:
+    """
+    Current resident set size of this process, or None if unknown.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        # Only the peak is available here
+        return _maxrss_bytes(resource.RUSAGE_SELF)
+    return None
+
+def _maxrss_bytes(who) -> int:
+    maxrss = resource.getrusage(who).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+class Span:
+    """
+    A timed operation, e.g. a pipeline stage, one TTS cue or one ffmpeg call.
+
+    Attributes:
+        name (str): Operation name, e.g. "tts.cue".
+        start (float): `time.perf_counter()` at the start.
+        end (float): `time.perf_counter()` at the end, None while running.
+        attrs (dict): Extra details (cue index, attempts, output bytes...).
+        parent (Span, optional): Enclosing span in the same context.
+        thread (str): Name of the thread the span ran on.
+    """
+
+    def __init__(self, name: str, start: float, attrs: dict, parent: Optional["Span"] = None, thread: Optional[str] = None):
+        self.name = name
+        self.start = start
+        self.end = None
+        self.attrs = attrs
+        self.parent = parent
+        self.thread = thread or threading.current_thread().name
+
+    @property
+    def seconds(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    @property
+    def key(self) -> str:
+        """
+        Name spans are aggregated under; subprocesses are told apart by their step.
+        """
+        return f"{self.name}.{self.attrs['step']}" if "step" in self.attrs else self.name
+
+class Tracer:
+    """
+    Collects spans, counters and memory samples for one job.
+
+    A tracer is activated for the current context with `with tracer:`. Code
+    anywhere below (stages, caches, ffmpeg calls) reports to it through the
+    module-level `span`, `record_span` and `count` functions, which do nothing
+    when no tracer is active. Contexts are copied to pipeline stage threads,
+    so their spans land in the same trace.
+
+    While active, a background thread samples the resident memory of the
+    process every `sample_seconds` to find the peak. That is the memory of the
+    whole process while the job ran, including models loaded before it and
+    any jobs running alongside it, not memory attributable to this job.
+
+    On exit, the trace is folded into the process-wide `metrics_registry`
+    served at /metrics.
+    """
+
+    def __init__(self, name: str = "job", sample_seconds: float = 0.25, max_samples: int = 10_000):
+        """
+        Args:
+            name (str, optional): Name of the root span. Defaults to "job".
+            sample_seconds (float, optional): Memory sampling interval. Defaults to 0.25 s.
+            max_samples (int, optional): Memory samples kept for the trace file;
+                the peak is tracked regardless. Defaults to 10,000.
+        """
+        self.name = name
+        self.sample_seconds = sample_seconds
+        self.max_samples = max_samples
+        self.spans: List[Span] = []
+        self.counters: Dict[str, float] = {}
+        self.memory_samples = []
+        self.process_peak_rss_bytes = 0
+        self.status = "ok"
+        self.root = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._tokens = None
+
+    def __enter__(self) -> "Tracer":
+        self.root = Span(self.name, time.perf_counter(), {})
+        self._tokens = (_current_tracer.set(self), _current_span.set(self.root))
+        self._sample()
+        self._sampler = threading.Thread(target=self._sample_loop, name="trace-memory", daemon=True)
+        self._sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._sampler.join()
+        self._sample()
+        self.root.end = time.perf_counter()
+        if exc_type is not None:
+            self.status = "failed"
+            self.root.attrs["error"] = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._tokens[1])
+        _current_tracer.reset(self._tokens[0])
+        metrics_registry.observe(self)
+
+    def _sample(self):
+        rss = _rss_bytes()
+        if rss is None:
+            return
+        with self._lock:
+            self.process_peak_rss_bytes = max(self.process_peak_rss_bytes, rss)
+            if len(self.memory_samples) < self.max_samples:
+                self.memory_samples.append((time.perf_counter(), rss))
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.sample_seconds):
+            self._sample()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def count(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def span_totals(self) -> dict:
+        """
+        Number of spans and total seconds per span name.
+        """
+        totals = {}
+        for s in self.spans:
+            entry = totals.setdefault(s.key, {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+            entry["count"] += 1
+            entry["seconds"] += s.seconds
+            entry["max_seconds"] = max(entry["max_seconds"], s.seconds)
+        return {
+            name: {key: round(value, 4) if isinstance(value, float) else value for key, value in entry.items()}
+            for name, entry in totals.items()
+        }
+
+    def summary(self) -> dict:
+        """
+        Compact, JSON-serializable view of the trace for job metrics.
+        """
+        summary = {
+            "wall_seconds": round(self.root.seconds, 3),
+            "spans": self.span_totals(),
+            "counters": dict(self.counters),
+            "process_peak_rss_bytes": self.process_peak_rss_bytes,
+        }
+        if resource is not None:
+            # Largest ffmpeg (or other) child process since the app started
+            summary["peak_child_rss_bytes"] = _maxrss_bytes(resource.RUSAGE_CHILDREN)
+        return summary
+
+    def to_chrome_trace(self) -> dict:
+        """
+        The trace in Chrome trace-event format, viewable in chrome://tracing
+        or https://ui.perfetto.dev.
+        """
+        pid = os.getpid()
+        threads = {}
+        def tid(name):
+            return threads.setdefault(name, len(threads) + 1)
+        def micros(t):
+            return round((t - self.root.start) * 1e6)
+
+        events = []
+        for s in [self.root] + self.spans:
+            events.append({
+                "name": s.key,
+                "ph": "X",
+                "ts": micros(s.start),
+                "dur": round(s.seconds * 1e6),
+                "pid": pid,
+                "tid": tid(s.thread),
+                "args": {key: value if isinstance(value, (int, float, str, bool, type(None))) else str(value)
+                         for key, value in s.attrs.items()},
+            })
+        for t, rss in self.memory_samples:
+            events.append({"name": "memory", "ph": "C", "ts": micros(t), "pid": pid, "args": {"rss_mb": round(rss / 2**20, 1)}})
+        for name, thread_id in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": self.summary()}
+
+    def write(self, path: str) -> str:
+        """
+        Write the trace as JSON (Chrome trace-event format).
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+        return path
+
+def current_tracer() -> Optional[Tracer]:
+    return _current_tracer.get()
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Time the enclosed block as a span of the active tracer. The span is
+    yielded so attributes can be added while it runs.
+    """
+    tracer = _current_tracer.get()
+    current = Span(name, time.perf_counter(), attrs, _current_span.get())
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+        if tracer is not None:
+            tracer.add(current)
+
+def record_span(name: str, start: float, end: float, **attrs):
+    """
+    Add a span timed elsewhere (e.g. work done in another process).
+    """
+    tracer = _current_tracer.get()
+    if tracer is not None:
+        recorded = Span(name, start, attrs, _current_span.get())
+        recorded.end = end
+        tracer.add(recorded)
+
+def count(name: str, value: float = 1):
+    """
+    Add `value` to a counter of the active tracer.
+    """
+    tracer = _current_tracer.get()
+    if tracer is not None:
+        tracer.count(name, value)
+
+def run_subprocess(step: str, cmd: list, output_path: Optional[str] = None, **kwargs) -> subprocess.CompletedProcess:
+    """
+    `subprocess.run(cmd, check=True)` as a "subprocess" span, counting the
+    size of `output_path` as bytes written.
+    """
+    with span("subprocess", step=step, program=os.path.basename(cmd[0])) as current:
+        result = subprocess.run(cmd, check=True, **kwargs)
+        if output_path is not None and os.path.exists(output_path):
+            current.attrs["output_bytes"] = os.path.getsize(output_path)
+            count("bytes_written", current.attrs["output_bytes"])
+    return result
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _metric_name(name: str) -> str:
+    return "".join(c if c.isalnum() or c == "_" else "_" for c in name)
+
+class MetricsRegistry:
+    """
+    Process-wide totals over all finished traces, in Prometheus text format.
+    """
+
+    def __init__(self, prefix: str = "video_translation"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.jobs = {}
+        self.span_seconds = {}
+        self.span_count = {}
+        self.counters = {}
+        self.process_peak_rss_bytes = 0
+
+    def observe(self, tracer: Tracer):
+        with self._lock:
+            self.jobs[tracer.status] = self.jobs.get(tracer.status, 0) + 1
+            for s in [tracer.root] + tracer.spans:
+                name = s.key
+                self.span_seconds[name] = self.span_seconds.get(name, 0.0) + s.seconds
+                self.span_count[name] = self.span_count.get(name, 0) + 1
+            for name, value in tracer.counters.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            self.process_peak_rss_bytes = max(self.process_peak_rss_bytes, tracer.process_peak_rss_bytes)
+
+    def prometheus_text(self) -> str:
+        p = self.prefix
+        with self._lock:
+            lines = [
+                f"# HELP {p}_jobs_total Traced jobs by status.",
+                f"# TYPE {p}_jobs_total counter",
+            ]
+            lines += [f'{p}_jobs_total{{status="{_escape_label(status)}"}} {n}' for status, n in sorted(self.jobs.items())]
+            lines += [
+                f"# HELP {p}_span_seconds Time spent per stage, cue and subprocess.",
+                f"# TYPE {p}_span_seconds summary",
+            ]
+            for name in sorted(self.span_seconds):
+                lines.append(f'{p}_span_seconds_sum{{span="{_escape_label(name)}"}} {self.span_seconds[name]:.6f}')
+                lines.append(f'{p}_span_seconds_count{{span="{_escape_label(name)}"}} {self.span_count[name]}')
+            for name, value in sorted(self.counters.items()):
+                metric = f"{p}_{_metric_name(name)}_total"
+                lines += [f"# TYPE {metric} counter", f"{metric} {value:g}"]
+            lines += [
+                f"# HELP {p}_process_peak_rss_bytes Highest resident memory of the process sampled while jobs ran.",
+                f"# TYPE {p}_process_peak_rss_bytes gauge",
+                f"{p}_process_peak_rss_bytes {self.process_peak_rss_bytes}",
+            ]
+            rss = _rss_bytes()
+            if rss is not None:
+                lines += [f"# TYPE {p}_rss_bytes gauge", f"{p}_rss_bytes {rss}"]
+        return "\n".join(lines) + "\n"
+
+metrics_registry = MetricsRegistry()
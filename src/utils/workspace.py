@@ -0,0 +1,101 @@
+import os
+import time
+import shutil
+import tempfile
+from typing import Optional
+
+class Workspace:
+    """
+    Job-scoped directories for intermediate and output files.
+
+    Every job gets a unique directory under `root`, so concurrent jobs never
+    overwrite each other's files. Intermediate files go to a scratch directory,
+    which may live on a RAM disk (e.g. /dev/shm), and is always removed when
+    the workspace is closed. Outputs are kept until `purge_stale` removes them
+    after `ttl_seconds`, or right away if the job fails.
+
+    Example:
+        >>> with Workspace() as ws:
+        ...     de_audio = ws.output("de_audio.wav")
+        ...     swapped = ws.scratch("swapped_audio.mp4")
+    """
+
+    def __init__(self, root: str = "temp", scratch_root: Optional[str] = None, ttl_seconds: float = 24 * 3600):
+        """
+        Create a new workspace.
+
+        Args:
+            root (str, optional): Directory holding the job directories. Defaults to "temp".
+            scratch_root (str, optional): Directory for scratch files, e.g. a tmpfs
+                mount. Defaults to the job directory itself.
+            ttl_seconds (float, optional): Age after which `purge_stale` removes
+                finished job directories. Defaults to 24 hours.
+        """
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(root, exist_ok=True)
+        self.path = tempfile.mkdtemp(prefix="job-", dir=root)
+        self.job_id = os.path.basename(self.path)
+        self.output_dir = os.path.join(self.path, "outputs")
+        os.makedirs(self.output_dir)
+
+        if scratch_root:
+            os.makedirs(scratch_root, exist_ok=True)
+            self.scratch_dir = tempfile.mkdtemp(prefix=f"{self.job_id}-", dir=scratch_root)
+        else:
+            self.scratch_dir = os.path.join(self.path, "scratch")
+            os.makedirs(self.scratch_dir)
+
+    @classmethod
+    def from_env(cls) -> "Workspace":
+        """
+        Create a workspace configured by WORKSPACE_ROOT, WORKSPACE_SCRATCH and
+        WORKSPACE_TTL_HOURS.
+        """
+        return cls(
+            root=os.environ.get("WORKSPACE_ROOT", "temp"),
+            scratch_root=os.environ.get("WORKSPACE_SCRATCH") or None,
+            ttl_seconds=float(os.environ.get("WORKSPACE_TTL_HOURS", 24)) * 3600,
+        )
+
+    def scratch(self, name: str) -> str:
+        """
+        Path for an intermediate file, removed when the workspace closes.
+        """
+        return os.path.join(self.scratch_dir, name)
+
+    def output(self, name: str) -> str:
+        """
+        Path for a file that outlives the job (returned to the user).
+        """
+        return os.path.join(self.output_dir, name)
+
+    def close(self):
+        """
+        Remove the scratch directory.
+        """
+        shutil.rmtree(self.scratch_dir, ignore_errors=True)
+
+    def purge_stale(self):
+        """
+        Remove other job directories under `root` older than `ttl_seconds`.
+        """
+        cutoff = time.time() - self.ttl_seconds
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if path == self.path or not name.startswith("job-") or not os.path.isdir(path):
+                continue
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self) -> "Workspace":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        # A failed job has no outputs worth keeping
+        if exc_type is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,77 @@
+import re
+import shutil
+import subprocess
+from fractions import Fraction
+
+import ffmpeg
+import pytest
+
+pytest.importorskip("torch")
+pytestmark = pytest.mark.skipif(
+    shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None,
+    reason="needs ffmpeg and ffprobe",
+)
+
+from src.jobs.chunked import ChunkedJob
+from src.jobs.manifest import JobManifest
+from src.utils.render import render_video
+
+TRANSCRIPT = """1
+00:00:00,500 --> 00:00:02,500
+First line
+
+2
+00:00:03,500 --> 00:00:05,500
+Second line
+"""
+
+def run(cmd):
+    subprocess.run(["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"] + cmd, check=True)
+
+def frame_times(path):
+    out = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-i", path, "-map", "0:v:0", "-vf", "showinfo", "-f", "null", "-"],
+        capture_output=True, text=True, check=True,
+    ).stderr
+    return [float(t) for t in re.findall(r"pts_time:([\d.]+)", out)]
+
+def test_finalize_joins_extended_and_plain_chunks_at_one_rate(tmp_path):
+    video, transcript = str(tmp_path / "video.mp4"), str(tmp_path / "video.srt")
+    run(["-f", "lavfi", "-i", "testsrc2=duration=6:size=160x120:rate=30000/1001",
+         "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", video])
+    with open(transcript, "w", encoding="utf-8") as f:
+        f.write(TRANSCRIPT)
+    manifest = JobManifest.create(str(tmp_path / "jobs"), video, transcript, {"translation_type": "LipSync"}, chunk_seconds=3)
+    assert len(manifest.chunks) == 2
+
+    # The speech of the first chunk overruns it by a second, so its video is
+    # extended by playing its end in reverse; the second chunk's speech fits
+    speech = [manifest.chunks[0]["end"] + 1.0, 1.5]
+    for chunk, seconds in zip(manifest.chunks, speech):
+        index = chunk["index"]
+        run(["-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}", "-ar", "24000", "-ac", "1",
+             manifest.artifact(index, "de_audio.wav")])
+        with open(manifest.artifact(index, "de_audio.srt"), "w", encoding="utf-8") as f:
+            f.write("1\n00:00:00,000 --> 00:00:01,000\nZeile\n")
+        render_video(
+            manifest.video_path, manifest.artifact(index, "de_audio.wav"), "LipSync",
+            output_path=manifest.artifact(index, "render.mp4"),
+            start=chunk["start"], duration=chunk["end"] - chunk["start"],
+        )
+        manifest.mark_done(index, "translate", srt="de_audio.srt")
+        manifest.mark_done(index, "tts", audio="de_audio.wav")
+        manifest.mark_done(index, "render", video="render.mp4")
+        manifest.mark_done(index, "lipsync", video="render.mp4")
+
+    ChunkedJob(manifest).finalize()
+
+    output = manifest.output("output.mp4")
+    video_stream = next(s for s in ffmpeg.probe(output)["streams"] if s["codec_type"] == "video")
+    frame_rate = Fraction(30000, 1001)
+    assert Fraction(video_stream["r_frame_rate"]) == frame_rate
+    times = frame_times(output)
+    assert max(b - a for a, b in zip(times, times[1:])) < 1.5 / frame_rate
+    expected = speech[0] + (6 - manifest.chunks[1]["start"])
+    assert abs(times[-1] + 1 / frame_rate - expected) <= 2 / frame_rate
+    audio = float(ffmpeg.probe(manifest.output("de_audio.wav"))["format"]["duration"])
+    assert abs(audio - expected) <= 2 / frame_rate
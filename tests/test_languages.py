@@ -0,0 +1,20 @@
+import pytest
+
+from src.translate import languages
+from src.translate.backends import helsinki
+
+@pytest.fixture
+def no_model_loading(monkeypatch):
+    monkeypatch.setattr(helsinki.model_registry, "get", lambda *args: None)
+
+def test_multi_target_models_get_their_target_token(no_model_loading):
+    assert languages.translator_for("de").model_name == "Helsinki-NLP/opus-mt-en-de"
+    arabic = languages.translator_for("ar")
+    assert arabic.model_name == "Helsinki-NLP/opus-mt-en-ar>>ara<<"
+    assert arabic._source("Hello.") == ">>ara<< Hello."
+    assert languages.translator_for("zh-cn")._source("Hello.") == ">>cmn_Hans<< Hello."
+
+def test_language_without_verified_model_needs_a_backend():
+    with pytest.raises(ValueError, match="register_translator"):
+        languages.translator_for("ja")
+    assert languages.iso639_2("ja") == "jpn"
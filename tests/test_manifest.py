@@ -0,0 +1,79 @@
+import os
+import json
+import time
+import datetime
+import srt
+
+from src.jobs import manifest as manifest_module
+from src.jobs.manifest import JobManifest, plan_chunks
+
+def cue(index, start, end):
+    return srt.Subtitle(
+        index=index,
+        start=datetime.timedelta(seconds=start),
+        end=datetime.timedelta(seconds=end),
+        content=f"Line {index}",
+    )
+
+def make_job(path):
+    os.makedirs(os.path.join(path, "locks"))
+    with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "job_id": "test",
+            "video": "inputs/video.mp4",
+            "transcript": "inputs/transcript.srt",
+            "options": {"translation_type": "Dub"},
+            "chunks": [{"index": 0, "start": 0.0, "end": 10.0, "cues": [0, 1]}],
+        }, f)
+    return JobManifest(path)
+
+def test_plan_chunks_without_cues_covers_the_video():
+    assert plan_chunks([], 1234.5, chunk_seconds=600) == [
+        {"index": 0, "start": 0.0, "end": 1234.5, "cues": [0, 0]},
+    ]
+
+def test_plan_chunks_never_splits_a_long_cue():
+    chunks = plan_chunks([cue(1, 5, 900)], 1000, chunk_seconds=600)
+    assert chunks == [{"index": 0, "start": 0.0, "end": 1000, "cues": [0, 1]}]
+
+def test_plan_chunks_splits_at_cue_starts():
+    subtitles = [cue(1, 0, 5), cue(2, 700, 705), cue(3, 1300, 1305)]
+    chunks = plan_chunks(subtitles, 1400, chunk_seconds=600)
+    assert [(c["start"], c["end"], c["cues"]) for c in chunks] == [
+        (0.0, 700, [0, 1]),
+        (700, 1300, [1, 2]),
+        (1300, 1400, [2, 3]),
+    ]
+
+def test_live_lease_is_not_taken_over(tmp_path):
+    manifest = make_job(str(tmp_path / "job"))
+    assert manifest.claim("chunk-0000", "worker-1")
+    assert not manifest.claim("chunk-0000", "worker-2")
+
+def test_expired_lease_is_taken_over(tmp_path):
+    manifest = make_job(str(tmp_path / "job"))
+    assert manifest.claim("chunk-0000", "worker-1")
+
+    # A lock not refreshed for longer than STALE_LOCK_SECONDS is abandoned
+    lock_path = manifest._lock_path("chunk-0000")
+    expired = time.time() - manifest_module.STALE_LOCK_SECONDS - 1
+    os.utime(lock_path, (expired, expired))
+    assert manifest.claim("chunk-0000", "worker-2")
+    with open(lock_path, "r", encoding="utf-8") as f:
+        assert json.load(f)["worker"] == "worker-2"
+
+def test_lease_of_dead_local_process_expires_right_away(tmp_path, monkeypatch):
+    manifest = make_job(str(tmp_path / "job"))
+    assert manifest.claim("chunk-0000", "worker-1")
+
+    lock_path = manifest._lock_path("chunk-0000")
+    with open(lock_path, "r", encoding="utf-8") as f:
+        owner = json.load(f)
+    owner["pid"] = os.getpid() + 1
+    with open(lock_path, "w", encoding="utf-8") as f:
+        json.dump(owner, f)
+
+    def kill(pid, signal):
+        raise ProcessLookupError(pid)
+    monkeypatch.setattr(manifest_module.os, "kill", kill)
+    assert manifest.claim("chunk-0000", "worker-2")
@@ -0,0 +1,50 @@
+import shutil
+import subprocess
+from fractions import Fraction
+
+import ffmpeg
+import pytest
+
+from src.utils.render import render_video, video_frame_rate
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None,
+    reason="needs ffmpeg and ffprobe",
+)
+
+def make_video(path, seconds, rate="30000/1001"):
+    subprocess.run([
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=duration={seconds}:size=160x120:rate={rate}",
+        "-c:v", "libx264", "-pix_fmt", "yuv420p", str(path),
+    ], check=True)
+    return str(path)
+
+def make_audio(path, seconds):
+    subprocess.run([
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+        "-ar", "24000", "-ac", "1", str(path),
+    ], check=True)
+    return str(path)
+
+def video_stream(path):
+    return next(s for s in ffmpeg.probe(path)["streams"] if s["codec_type"] == "video")
+
+@pytest.mark.parametrize("translation_type", ["Dub", "LipSync"])
+def test_extension_keeps_the_source_frame_rate(tmp_path, translation_type):
+    video = make_video(tmp_path / "video.mp4", 4)
+    audio = make_audio(tmp_path / "audio.wav", 5)
+    output = render_video(video, audio, translation_type, output_path=str(tmp_path / "output.mp4"))
+
+    assert video_frame_rate(output) == Fraction(30000, 1001)
+    # One frame per 1/29.97 s of the audio the video was extended to
+    assert abs(int(video_stream(output)["nb_frames"]) - round(5 * 30000 / 1001)) <= 1
+
+def test_trimmed_extension_keeps_the_source_frame_rate(tmp_path):
+    video = make_video(tmp_path / "video.mp4", 6)
+    audio = make_audio(tmp_path / "audio.wav", 3)
+    output = render_video(video, audio, "LipSync", output_path=str(tmp_path / "output.mp4"), start=2.0, duration=2.0)
+
+    assert video_frame_rate(output) == Fraction(30000, 1001)
+    assert abs(int(video_stream(output)["nb_frames"]) - round(3 * 30000 / 1001)) <= 1
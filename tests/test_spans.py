@@ -0,0 +1,91 @@
+import re
+import shutil
+import subprocess
+from fractions import Fraction
+
+import ffmpeg
+import pytest
+
+from src.lipsync.spans import lipsync_spoken_segments, plan_render_segments, segment_boundaries
+from src.utils.render import render_video, video_frame_rate
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None,
+    reason="needs ffmpeg and ffprobe",
+)
+
+SUBTITLES = """1
+00:00:02,000 --> 00:00:04,000
+Erste Zeile
+
+2
+00:00:09,000 --> 00:00:13,500
+Zweite Zeile
+"""
+
+class ReencodingLipSync:
+    """
+    Stands in for WarmLipSync: re-encodes each segment at `output_fps`,
+    as Wav2Lip does, without touching the frames.
+    """
+
+    mux_audio = True
+    match_frames = False
+    output_fps = None
+
+    def sync(self, face, audio_file, outfile):
+        subprocess.run([
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-i", face, "-map", "0:v:0", "-r", self.output_fps,
+            "-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-pix_fmt", "yuv420p",
+            outfile,
+        ], check=True)
+        return outfile
+
+def frame_times(path):
+    out = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-i", path, "-map", "0:v:0", "-vf", "showinfo", "-f", "null", "-"],
+        capture_output=True, text=True, check=True,
+    ).stderr
+    return [float(t) for t in re.findall(r"pts_time:([\d.]+)", out)]
+
+def run(cmd):
+    subprocess.run(["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"] + cmd, check=True)
+
+def test_spoken_segments_stay_in_sync_with_extended_video(tmp_path):
+    video, audio, srt_path = str(tmp_path / "video.mp4"), str(tmp_path / "audio.wav"), str(tmp_path / "audio.srt")
+    run(["-f", "lavfi", "-i", "testsrc2=duration=12:size=160x120:rate=30000/1001",
+         "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", video])
+    run(["-f", "lavfi", "-i", "sine=frequency=440:duration=14", "-ar", "24000", "-ac", "1", audio])
+    with open(srt_path, "w", encoding="utf-8") as f:
+        f.write(SUBTITLES)
+
+    frame_rate = video_frame_rate(video)
+    segments = plan_render_segments(srt_path, 12.0, audio, frame_rate)
+    rendered = render_video(
+        video, audio, "LipSync", output_path=str(tmp_path / "render.mp4"),
+        keyframes=segment_boundaries(segments, frame_rate),
+    )
+    output = lipsync_spoken_segments(
+        ReencodingLipSync(), rendered, audio, segments, frame_rate, str(tmp_path / "output.mp4"), str(tmp_path / "segments"),
+    )
+
+    # One frame per 1/29.97 s of the 14 s audio, evenly spaced
+    stream = next(s for s in ffmpeg.probe(output)["streams"] if s["codec_type"] == "video")
+    assert Fraction(stream["r_frame_rate"]) == Fraction(30000, 1001)
+    assert abs(int(stream["nb_frames"]) - 14 * frame_rate) <= 1
+    times = frame_times(output)
+    assert len(times) == int(stream["nb_frames"])
+    assert max(b - a for a, b in zip(times, times[1:])) < 1.5 / frame_rate
+    assert abs(times[-1] + 1 / frame_rate - 14) <= 1 / frame_rate
+
+def test_spoken_segments_reject_another_frame_rate(tmp_path):
+    video, audio = str(tmp_path / "video.mp4"), str(tmp_path / "audio.wav")
+    run(["-f", "lavfi", "-i", "testsrc2=duration=2:size=160x120:rate=25", "-c:v", "libx264", "-pix_fmt", "yuv420p", video])
+    run(["-f", "lavfi", "-i", "sine=frequency=440:duration=2", "-ar", "24000", "-ac", "1", audio])
+
+    with pytest.raises(ValueError):
+        lipsync_spoken_segments(
+            ReencodingLipSync(), video, audio, [(0, 60, True)], Fraction(30000, 1001),
+            str(tmp_path / "output.mp4"), str(tmp_path / "segments"),
+        )
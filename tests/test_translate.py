@@ -0,0 +1,32 @@
+from src.translate.backends.base import Translator
+from src.translate.translate import TranscriptTranslator
+
+class RecordingTranslator(Translator):
+    model_name = "recording"
+
+    def __init__(self):
+        self.calls = []
+
+    def translate(self, text):
+        return text.upper()
+
+    def translate_batch(self, texts, batch_size=32):
+        self.calls.append(list(texts))
+        return super().translate_batch(texts, batch_size)
+
+def write_srt(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        for i, line in enumerate(lines):
+            f.write(f"{i + 1}\n00:00:{i // 10:02d},{i % 10 * 100:03d} --> 00:00:{i // 10:02d},{i % 10 * 100 + 50:03d}\n{line}\n\n")
+    return str(path)
+
+def test_iter_translate_srt_reads_ahead_and_keeps_order(tmp_path):
+    lines = [f"line {i}" for i in range(300)]
+    backend = RecordingTranslator()
+    translator = TranscriptTranslator(translator=backend)
+
+    subtitles = list(translator.iter_translate_srt(write_srt(tmp_path / "input.srt", lines), batch_size=10, read_ahead=4))
+
+    assert [sub.content for sub in subtitles] == [line.upper() for line in lines]
+    # A single batch first, so TTS can start early, then windows of four batches
+    assert [len(call) for call in backend.calls] == [10] + [40] * 7 + [10]